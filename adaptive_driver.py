@@ -0,0 +1,167 @@
+"""Adaptive time-step driver for `SodiumPlant`.
+
+`SodiumPlant.step` evaluates wear-dependent quantities once per step, so its
+error grows with dt. This driver controls that error with step doubling:
+every step is taken once with dt and once as two dt/2 halves, the difference
+in cumulative Na and cost estimates the local error, and dt grows or shrinks
+to keep the accumulated error within a tolerance over the whole run.
+
+On top of the error control, dt is also cut back
+- when the electrical `constraint_reason` changes inside a step, so regime
+  switches (current, voltage, power limit) are resolved to `dt_min_hours`,
+- so that a step ends at the electrode maintenance threshold instead of
+  overshooting it.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from electrical_model import ElectricalState, compute_electrical_state
+from plant_model import SodiumPlant, StepRecord
+from wear_segments import maintenance_amp_hours
+
+
+@dataclass
+class AdaptiveConfig:
+    """Tolerances and limits for the adaptive driver."""
+
+    # Allowed error on the cumulative totals at the end of the run:
+    # absolute tolerance plus relative_tolerance times the total itself.
+    na_tolerance_kg: float = 0.1
+    cost_tolerance: float = 0.1
+    relative_tolerance: float = 1.0e-4
+
+    dt_initial_hours: float = 1.0
+    dt_min_hours: float = 1.0e-3
+    dt_max_hours: float = 24.0 * 7
+
+    # Step-size controller: dt_new = dt * clip(safety * ratio**-0.5, shrink_limit, growth_limit)
+    safety: float = 0.9
+    growth_limit: float = 4.0
+    shrink_limit: float = 0.2
+
+
+@dataclass
+class AdaptiveRunResult:
+    """Accepted steps and error bookkeeping of an adaptive run."""
+
+    steps: List[Dict[str, float]] = field(default_factory=list)
+    rejected_steps: int = 0
+    na_error_estimate_kg: float = 0.0
+    cost_error_estimate: float = 0.0
+
+
+def _electrical_state(plant: SodiumPlant, current_a: float) -> ElectricalState:
+    multiplier = plant.state.electrode_state.effective_resistance_multiplier(plant.cfg.electrodes)
+    return compute_electrical_state(
+        requested_current_a=current_a,
+        config=plant.cfg.electrical,
+        effective_cell_resistance_ohm=plant.cfg.electrical.cell_resistance_ohm * multiplier,
+    )
+
+
+def _constraint_reason(plant: SodiumPlant, current_a: float) -> str:
+    if plant.state.electrode_state.in_maintenance:
+        return "maintenance"
+    return _electrical_state(plant, current_a).constraint_reason
+
+
+def _error_cost(trial: SodiumPlant, plant: SodiumPlant) -> float:
+    """
+    Cumulative cost of a trial fork without the demand charge added in the
+    trial step. Demand charges bill the rise of the period's peak, which
+    telescopes over the steps whatever their size, so they are not a
+    discretisation error to control.
+    """
+    cost = trial.state.cumulative_cost
+    if trial.tariff is None:
+        return cost
+    start_peak = plant.demand.peak_kw if trial.demand.period == plant.demand.period else 0.0
+    return cost - trial.tariff.demand_charge_per_kw * (trial.demand.peak_kw - start_peak)
+
+
+def run_adaptive(
+    plant: SodiumPlant,
+    current_a: float,
+    total_hours: float,
+    cfg: AdaptiveConfig | None = None,
+) -> AdaptiveRunResult:
+    """Advance `plant` by `total_hours` at `current_a` with adaptive steps."""
+    cfg = cfg or AdaptiveConfig()
+    result = AdaptiveRunResult()
+    end_time = plant.state.time_hours + total_hours
+    maintenance_ah = maintenance_amp_hours(plant.cfg)
+    dt = min(cfg.dt_initial_hours, cfg.dt_max_hours)
+
+    while end_time - plant.state.time_hours > 1e-12:
+        remaining = end_time - plant.state.time_hours
+        es = plant.state.electrode_state
+
+        # Nothing evolves during maintenance: finish in a single step.
+        if es.in_maintenance:
+            step = plant.step(requested_current_a=current_a, dt_hours=remaining)
+            result.steps.append({**step, "dt_hours": remaining, "na_error_kg": 0.0, "cost_error": 0.0})
+            break
+
+        dt = min(dt, remaining)
+
+        # Land on the maintenance threshold rather than stepping across it.
+        reason_before = _constraint_reason(plant, current_a)
+        if not math.isinf(maintenance_ah):
+            actual = _electrical_state(plant, current_a).actual_current_a
+            if actual > 0:
+                hours_left = (maintenance_ah - es.cumulative_amp_hours) / actual
+                dt = min(dt, max(hours_left, cfg.dt_min_hours))
+
+        # Step doubling: one full step against two half steps.
+        full = plant.fork()
+        full.step(requested_current_a=current_a, dt_hours=dt)
+        halves = plant.fork()
+        first, second = StepRecord(), StepRecord()
+        halves.step_into(current_a, 0.5 * dt, first)
+        halves.step_into(current_a, 0.5 * dt, second)
+
+        na_error = abs(full.state.cumulative_na_produced_kg - halves.state.cumulative_na_produced_kg)
+        cost_error = abs(_error_cost(full, plant) - _error_cost(halves, plant))
+        # Each step may use its share of the run's error budget.
+        share = dt / total_hours
+        na_allowed = cfg.na_tolerance_kg + cfg.relative_tolerance * abs(halves.state.cumulative_na_produced_kg)
+        cost_allowed = cfg.cost_tolerance + cfg.relative_tolerance * abs(halves.state.cumulative_cost)
+        ratio = max(
+            na_error / max(na_allowed * share, 1e-300),
+            cost_error / max(cost_allowed * share, 1e-300),
+        )
+        switched = _constraint_reason(halves, current_a) != reason_before
+
+        if dt > cfg.dt_min_hours and (ratio > 1.0 or switched):
+            result.rejected_steps += 1
+            factor = 0.5 if switched and ratio <= 1.0 else max(cfg.shrink_limit, cfg.safety * ratio ** -0.5)
+            dt = max(cfg.dt_min_hours, dt * factor)
+            continue
+
+        # Accept the more accurate two-half-step result; the demand meter
+        # carries the billed peak forward.
+        plant.state = halves.state
+        plant.demand = halves.demand
+        if plant.stats is not None:
+            plant.stats.record(first, 0.5 * dt)
+            plant.stats.record(second, 0.5 * dt)
+        result.steps.append({**second.as_dict(), "dt_hours": dt, "na_error_kg": na_error, "cost_error": cost_error})
+        result.na_error_estimate_kg += na_error
+        result.cost_error_estimate += cost_error
+
+        growth = cfg.growth_limit if ratio == 0.0 else min(cfg.growth_limit, cfg.safety * ratio ** -0.5)
+        dt = min(cfg.dt_max_hours, max(cfg.dt_min_hours, dt * max(growth, cfg.shrink_limit)))
+
+    return result
+
+
+if __name__ == "__main__":
+    plant = SodiumPlant()
+    run = run_adaptive(plant, current_a=10_000.0, total_hours=24.0 * 30)
+    print(f"Accepted steps: {len(run.steps)}, rejected: {run.rejected_steps}")
+    print(f"Total Na:       {plant.state.cumulative_na_produced_kg:,.2f} kg (est. error {run.na_error_estimate_kg:.3f} kg)")
+    print(f"Total cost:     ${plant.state.cumulative_cost:,.2f} (est. error {run.cost_error_estimate:.3f})")
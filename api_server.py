@@ -12,18 +12,85 @@ Endpoints (JSON):
         body: { "steps": int }   # optional, default 1
         advances the simulation by steps * dt_hours
         returns the latest step result
+
+    POST /api/advance
+        body: { "hours": float }
+        jumps the simulation forward analytically at the current setpoint
+        (constant cost regardless of duration) and returns the segment totals;
+        with a schedule, one jump per constant piece of the schedule
+
+    POST /api/schedule
+        body: { "segments": [...], "default_current_a": float, "repeat_hours": float | null }
+        follow a setpoint schedule (see `setpoint_schedule`) instead of the
+        constant current
+
+    DELETE /api/schedule
+        back to the constant current
+
+    POST /api/realtime/start
+        body: { "speed": float }   # simulated seconds per wall-clock second
+        advance the plant on the server at `speed` x real time, batching
+        steps when behind; /api/step, /api/advance and /api/restore are
+        refused (409) while it runs unpaused
+
+    POST /api/realtime/pause, /api/realtime/resume, /api/realtime/stop
+    POST /api/realtime/rate
+        body: { "speed": float }
+    GET  /api/realtime
+        pacing status and the latest step
+
+    POST /api/whatif
+        body: { "hours": float, "setpoints": [float, ...] }
+        forks the current plant once per setpoint and fast-forwards each
+        branch by `hours`; the live plant is not modified
+
+    POST /api/production_estimate
+        body: { "current_a": float, "na_kg": [float, ...] | "naoh_kg": [float, ...],
+                "maintenance_outage_hours": float }
+        hours, DC energy, cost and electrode changes needed to produce each
+        target from the current plant state (wear, limits and maintenance
+        included); the live plant is not modified
+
+    POST /api/solve_current
+        body: { "mode": "voltage" | "power", "targets": [float, ...], "basis": "dc" | "ac" }
+        requested current (and resulting electrical state) reaching each
+        target cell voltage or power at the plant's present electrode wear,
+        with every limit applied; targets beyond the limits are clamped
+
+    GET  /api/operating_envelope
+        operating map of the current plant config: electrical state and
+        constraint region on a (requested current x cell resistance) grid
+        over the electrode life, with the analytic limit boundaries
+
+    GET  /api/snapshot
+        returns { "snapshot": base64 } of the current plant state and config
+
+    POST /api/restore
+        body: { "snapshot": base64 }
+        restores the plant from a snapshot
 """
 
 from __future__ import annotations
 
-from dataclasses import asdict
-from typing import Any, Dict, Optional
+import asyncio
+import base64
+import binascii
+import math
+from dataclasses import asdict, replace
+from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import FastAPI
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-
-from plant_model import PlantConfig, SodiumPlant
+from pydantic import BaseModel, model_validator
+
+from electrical_model import current_for_power, current_for_voltage
+from operating_envelope import OperatingEnvelope
+from plant_model import PlantConfig, SodiumPlant, StepRecord
+from production_estimator import estimate_production
+from realtime_pacer import PacedSimulation
+from setpoint_schedule import SetpointSchedule
 from sodium_logic import time_hours_for_naoh_mass
 
 
@@ -36,6 +103,63 @@ class StepRequest(BaseModel):
     steps: int = 1
 
 
+class AdvanceRequest(BaseModel):
+    hours: float
+
+
+class RateRequest(BaseModel):
+    speed: float = 60.0
+
+
+class WhatIfRequest(BaseModel):
+    hours: float
+    setpoints: List[float]
+
+
+class SegmentRequest(BaseModel):
+    """One schedule segment: constant `current_a`, or a ramp `from_current_a` -> `to_current_a`."""
+
+    start_hours: float
+    end_hours: float
+    current_a: Optional[float] = None
+    from_current_a: Optional[float] = None
+    to_current_a: Optional[float] = None
+
+    @model_validator(mode="after")
+    def _check(self) -> "SegmentRequest":
+        if self.end_hours <= self.start_hours:
+            raise ValueError("end_hours must be after start_hours")
+        ramp = (self.from_current_a, self.to_current_a)
+        if self.current_a is None and None in ramp:
+            raise ValueError("give current_a, or both from_current_a and to_current_a")
+        if self.current_a is not None and ramp != (None, None):
+            raise ValueError("give current_a or from_current_a/to_current_a, not both")
+        return self
+
+
+class ScheduleRequest(BaseModel):
+    segments: List[SegmentRequest] = []
+    default_current_a: float = 0.0
+    repeat_hours: Optional[float] = None
+
+
+class EstimateRequest(BaseModel):
+    current_a: float
+    na_kg: Optional[List[float]] = None
+    naoh_kg: Optional[List[float]] = None
+    maintenance_outage_hours: float = 72.0
+
+
+class SolveCurrentRequest(BaseModel):
+    mode: Literal["voltage", "power"]
+    targets: List[float]
+    basis: Literal["dc", "ac"] = "dc"
+
+
+class RestoreRequest(BaseModel):
+    snapshot: str
+
+
 class TimeRequest(BaseModel):
     current_a: float
     naoh_mass_kg: float
@@ -68,7 +192,14 @@ def health() -> Dict[str, Any]:
 _plant: Optional[SodiumPlant] = None
 _current_a: float = 10_000.0
 _dt_hours: float = 1.0
+_schedule: Optional[SetpointSchedule] = None
+_pacer: Optional[PacedSimulation] = None
 
+# Handlers that touch `_plant` hold `_plant_lock`, as does every tick of the
+# pacer. CPU-heavy work runs in the threadpool so the event loop keeps
+# serving requests meanwhile: on the live plant, under the lock, when it
+# changes the plant, otherwise on a fork taken under the lock.
+_plant_lock = asyncio.Lock()
 
 def _ensure_plant() -> SodiumPlant:
     global _plant
@@ -77,31 +208,273 @@ def _ensure_plant() -> SodiumPlant:
     return _plant
 
 
+def _ensure_not_paced() -> None:
+    """Manual stepping would race the real-time task."""
+    if _pacer is not None and _pacer.running and not _pacer.paused:
+        raise HTTPException(status_code=409, detail="real-time mode is running; pause or stop it first")
+
+
+def _require_pacer() -> PacedSimulation:
+    if _pacer is None or not _pacer.running:
+        raise HTTPException(status_code=409, detail="real-time mode is not running")
+    return _pacer
+
+
 @app.post("/api/reset")
-def reset(req: ResetRequest) -> Dict[str, Any]:
-    """Reset plant state and set operating point."""
-    global _plant, _current_a, _dt_hours
-    _plant = SodiumPlant(PlantConfig())
-    _current_a = req.current_a
-    _dt_hours = req.dt_hours
+async def reset(req: ResetRequest) -> Dict[str, Any]:
+    """Reset plant state and set operating point (stops real-time mode)."""
+    global _plant, _current_a, _dt_hours, _schedule, _pacer
+    async with _plant_lock:
+        if _pacer is not None:
+            await _pacer.stop()
+            _pacer = None
+        _plant = SodiumPlant(PlantConfig())
+        _current_a = req.current_a
+        _dt_hours = req.dt_hours
+        _schedule = None
     return {"status": "ok", "current_a": _current_a, "dt_hours": _dt_hours}
 
 
 @app.post("/api/step")
-def step(req: StepRequest) -> Dict[str, Any]:
+async def step(req: StepRequest) -> Dict[str, Any]:
     """Advance the simulation by N steps and return the last result."""
-    plant = _ensure_plant()
+    async with _plant_lock:
+        _ensure_not_paced()
+        return await run_in_threadpool(_run_steps, _ensure_plant(), max(1, req.steps), _current_a, _dt_hours, _schedule)
+
+
+def _run_steps(
+    plant: SodiumPlant,
+    steps: int,
+    current_a: float,
+    dt_hours: float,
+    schedule: Optional[SetpointSchedule],
+) -> Dict[str, Any]:
+    """`steps` steps in one vectorised run; the last one as `SodiumPlant.step` returns it."""
+    if schedule is None:
+        columns = plant.run(np.full(steps, current_a), dt_hours)
+    else:
+        columns = plant.run_schedule(schedule, dt_hours, steps)
+    if columns["time_hours"].size == 0:
+        return {}
+    record = StepRecord()
+    record.load_row(columns)
+    return record.as_dict()
+
+
+@app.post("/api/advance")
+async def advance(req: AdvanceRequest) -> Dict[str, Any]:
+    """Fast-forward the simulation by `hours` using closed-form integration."""
+    if req.hours <= 0:
+        return {}
+    async with _plant_lock:
+        _ensure_not_paced()
+        return await run_in_threadpool(_advance, _ensure_plant(), req.hours, _current_a, _schedule)
+
+
+def _advance(
+    plant: SodiumPlant,
+    hours: float,
+    current_a: float,
+    schedule: Optional[SetpointSchedule],
+) -> Dict[str, Any]:
+    """One `advance` at the constant current, or one per constant piece of the schedule."""
+    if schedule is None:
+        return plant.advance(hours=hours, current_a=current_a)
+    start = plant.state.time_hours
+    edges, currents = schedule.piecewise_constant(start, start + hours)
     result: Dict[str, Any] = {}
-    for _ in range(max(1, req.steps)):
-        result = plant.step(requested_current_a=_current_a, dt_hours=_dt_hours)
+    for piece_hours, piece_current_a in zip(edges[1:] - edges[:-1], currents):
+        result = plant.advance(hours=float(piece_hours), current_a=float(piece_current_a)) or result
     return result
 
 
+@app.post("/api/schedule")
+async def set_schedule(req: ScheduleRequest) -> Dict[str, Any]:
+    """Follow a setpoint schedule instead of the constant current."""
+    global _schedule
+    try:
+        _schedule = SetpointSchedule.from_dict(req.model_dump(exclude_none=True))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if _pacer is not None:
+        _pacer.schedule = _schedule
+    return {"status": "ok", "segments": len(_schedule.segments), "repeat_hours": _schedule.repeat_hours}
+
+
+@app.delete("/api/schedule")
+async def clear_schedule() -> Dict[str, Any]:
+    """Return to the constant current set by /api/reset."""
+    global _schedule
+    _schedule = None
+    if _pacer is not None:
+        _pacer.schedule = None
+    return {"status": "ok", "current_a": _current_a}
+
+
+@app.post("/api/realtime/start")
+async def realtime_start(req: RateRequest) -> Dict[str, Any]:
+    """Advance the plant on the server at `speed` x real time."""
+    global _pacer
+    if _pacer is not None and _pacer.running:
+        raise HTTPException(status_code=409, detail="real-time mode is already running")
+    try:
+        _pacer = PacedSimulation(
+            _ensure_plant(), _current_a, _dt_hours, speed=req.speed, schedule=_schedule, lock=_plant_lock
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    _pacer.start()
+    return _pacer.status()
+
+
+@app.post("/api/realtime/pause")
+async def realtime_pause() -> Dict[str, Any]:
+    pacer = _require_pacer()
+    async with _plant_lock:
+        pacer.pause()
+        return pacer.status()
+
+
+@app.post("/api/realtime/resume")
+async def realtime_resume() -> Dict[str, Any]:
+    pacer = _require_pacer()
+    async with _plant_lock:
+        pacer.resume()
+        return pacer.status()
+
+
+@app.post("/api/realtime/rate")
+async def realtime_rate(req: RateRequest) -> Dict[str, Any]:
+    pacer = _require_pacer()
+    async with _plant_lock:
+        try:
+            pacer.set_speed(req.speed)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return pacer.status()
+
+
+@app.post("/api/realtime/stop")
+async def realtime_stop() -> Dict[str, Any]:
+    global _pacer
+    pacer = _require_pacer()
+    async with _plant_lock:
+        await pacer.stop()
+        _pacer = None
+    return {"status": "ok", "time_hours": pacer.plant.state.time_hours}
+
+
+@app.get("/api/realtime")
+async def realtime_status() -> Dict[str, Any]:
+    if _pacer is None:
+        return {"running": False}
+    async with _plant_lock:
+        return _pacer.status()
+
+
+@app.post("/api/whatif")
+async def whatif(req: WhatIfRequest) -> Dict[str, Any]:
+    """Compare futures from the current state, one branch per setpoint."""
+    async with _plant_lock:
+        base = _ensure_plant().fork()
+
+    def branches() -> List[Dict[str, Any]]:
+        return [base.fork().advance(hours=req.hours, current_a=current_a) for current_a in req.setpoints]
+
+    return {"time_hours": base.state.time_hours, "branches": await run_in_threadpool(branches)}
+
+
+@app.post("/api/production_estimate")
+async def production_estimate(req: EstimateRequest) -> Dict[str, Any]:
+    """Wear-aware time and cost to reach production targets from the current state."""
+    async with _plant_lock:
+        plant = _ensure_plant().fork()
+    try:
+        estimate = await run_in_threadpool(
+            estimate_production,
+            plant,
+            current_a=req.current_a,
+            na_kg=req.na_kg,
+            naoh_kg=req.naoh_kg,
+            maintenance_outage_hours=req.maintenance_outage_hours,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    def finite(values: Any) -> List[Optional[float]]:
+        # Unreachable targets come back as inf, which JSON cannot carry.
+        return [v if math.isfinite(v) else None for v in values.tolist()]
+
+    return {
+        "time_hours": plant.state.time_hours,
+        "na_kg": estimate.na_kg.tolist(),
+        "hours": finite(estimate.hours),
+        "producing_hours": finite(estimate.producing_hours),
+        "energy_kwh": finite(estimate.energy_kwh),
+        "cost": finite(estimate.cost),
+        "revenue": finite(estimate.revenue),
+        "maintenance_events": estimate.maintenance_events.tolist(),
+    }
+
+
+@app.post("/api/solve_current")
+async def solve_current(req: SolveCurrentRequest) -> Dict[str, Any]:
+    """Current for target voltages or powers at the present electrode wear."""
+    async with _plant_lock:
+        plant = _ensure_plant()
+        ecfg = plant.cfg.electrical
+        es = plant.state.electrode_state
+        resistance = ecfg.cell_resistance_ohm * es.effective_resistance_multiplier(plant.cfg.electrodes)
+    if req.mode == "voltage":
+        elec = current_for_voltage(req.targets, ecfg, resistance)
+    else:
+        elec = current_for_power(req.targets, ecfg, resistance, basis=req.basis)
+    return {
+        "targets": req.targets,
+        "requested_current_a": elec.requested_current_a.tolist(),
+        "actual_current_a": elec.actual_current_a.tolist(),
+        "cell_voltage_v": elec.cell_voltage_v.tolist(),
+        "dc_power_kw": elec.dc_power_kw.tolist(),
+        "ac_power_kw": elec.ac_power_kw.tolist(),
+        "constraint_reason": elec.constraint_reason.tolist(),
+    }
+
+
+@app.get("/api/operating_envelope")
+async def operating_envelope() -> Dict[str, Any]:
+    """Operating map of the plant's electrical model (cached per config)."""
+    async with _plant_lock:
+        cfg = _ensure_plant().cfg
+    return await run_in_threadpool(lambda: OperatingEnvelope.for_plant(cfg).as_dict())
+
+
+@app.get("/api/snapshot")
+async def snapshot() -> Dict[str, Any]:
+    """Binary snapshot of the plant, base64-encoded."""
+    async with _plant_lock:
+        data = _ensure_plant().snapshot()
+    return {"snapshot": base64.b64encode(data).decode("ascii")}
+
+
+@app.post("/api/restore")
+async def restore(req: RestoreRequest) -> Dict[str, Any]:
+    """Restore the plant from a snapshot produced by /api/snapshot."""
+    async with _plant_lock:
+        _ensure_not_paced()
+        plant = _ensure_plant()
+        try:
+            plant.restore(base64.b64decode(req.snapshot, validate=True))
+        except (ValueError, binascii.Error) as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return {"status": "ok", "time_hours": plant.state.time_hours}
+
+
 @app.get("/api/state")
-def state() -> Dict[str, Any]:
+async def state() -> Dict[str, Any]:
     """Return a simplified snapshot of the plant state."""
-    plant = _ensure_plant()
-    st = plant.state
+    async with _plant_lock:
+        st = replace(_ensure_plant().state)
     return {
         "time_hours": st.time_hours,
         "cumulative_na_kg": st.cumulative_na_produced_kg,
@@ -110,6 +483,7 @@ def state() -> Dict[str, Any]:
         "cumulative_h2_kg": st.cumulative_h2_kg,
         "cumulative_revenue": st.cumulative_revenue,
         "cumulative_cost": st.cumulative_cost,
+        "cell_temp_c": st.cell_temp_c,
         "current_a": _current_a,
         "dt_hours": _dt_hours,
     }
@@ -28,7 +28,7 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
-from plant_model import PlantConfig, SodiumPlant
+from plant_model import PlantConfig, SodiumPlant, StepRecord
 
 
 @dataclass
@@ -137,21 +137,25 @@ class MainWindow(QMainWindow):
         )
         self.output.append("")
 
+        record = StepRecord()
         for i in range(steps):
-            result = plant.step(
+            if not plant.step_into(
                 requested_current_a=scenario.current_a,
                 dt_hours=scenario.dt_hours,
-            )
-            if not result:
+                out=record,
+            ):
+                continue
+            if record.in_maintenance:
+                self.output.append(f"step {i+1:3d} | t={record.time_hours:.2f} h | electrodes in maintenance")
                 continue
 
             line = (
                 f"step {i+1:3d} | "
-                f"t={result['time_hours']:.2f} h | "
-                f"I={result['actual_current_a']:,.0f} A | "
-                f"V={result['cell_voltage_v']:.2f} V | "
-                f"Na_step={result['na_collected_kg']:.4f} kg | "
-                f"Na_cum={result['cumulative_na_kg']:.2f} kg"
+                f"t={record.time_hours:.2f} h | "
+                f"I={record.actual_current_a:,.0f} A | "
+                f"V={record.cell_voltage_v:.2f} V | "
+                f"Na_step={record.na_collected_kg:.4f} kg | "
+                f"Na_cum={record.cumulative_na_kg:.2f} kg"
             )
             self.output.append(line)
 
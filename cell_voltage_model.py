@@ -0,0 +1,271 @@
+"""Nonlinear cell voltage: decomposition potential, electrode kinetics, ohmic drop.
+
+`electrical_model` treats the cell voltage as linear in the current and, when
+the power limit binds, scales the current down without recomputing the
+voltage. Here the cell voltage is
+
+    V(I, T) = E_dec + eta_anode(I, T) + eta_cathode(I, T) + I * R(T)
+
+with symmetric Butler-Volmer overpotentials (Tafel lines at high current),
+
+    eta = R_gas * T / (alpha * F) * asinh(I / (2 * I0)),
+
+and an ohmic resistance that follows the melt conductivity (Arrhenius),
+
+    R(T) = R_ref * exp(E_a / R_gas * (1 / T - 1 / T_ref)).
+
+`compute_electrical_state_tafel` applies the limits of an `ElectricalConfig`
+self-consistently: the actual current is the largest current, up to the
+request and `max_dc_current_a`, at which V(I) <= `max_cell_voltage_v` and
+the AC power I * V(I) / efficiency <= `max_power_kw`, each found by a
+vectorised Newton iteration with analytic derivatives (safeguarded by a
+bracket). V(I) is increasing, so both limits are monotone in I. Below
+`min_cell_voltage_v` the supply holds the minimum voltage, as in the linear
+model.
+
+It has the signature of `compute_electrical_state_array` (bind the cell and
+temperature with `functools.partial`), so `solve_requested_current` inverts
+it for target voltages or powers.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from electrical_model import (
+    REASON_CURRENT_LIMIT,
+    REASON_NONE,
+    REASON_POWER_LIMIT,
+    REASON_VOLTAGE_LIMIT,
+    ElectricalConfig,
+    ElectricalStateArray,
+)
+from sodium_logic import FARADAY_CONSTANT
+
+GAS_CONSTANT = 8.314462618  # J/(mol K)
+
+
+@dataclass
+class TafelCellConfig:
+    """Electrochemistry of one cell; the ohmic resistance is `cell_resistance_ohm`."""
+
+    decomposition_potential_v: float = 2.2    # reversible potential of the cell reaction
+    anode_exchange_current_a: float = 500.0   # exchange current density x electrode area
+    anode_transfer_coefficient: float = 0.5
+    cathode_exchange_current_a: float = 2_000.0
+    cathode_transfer_coefficient: float = 0.5
+    # Ohmic resistance is given at the reference temperature.
+    reference_temp_c: float = 600.0
+    ohmic_activation_energy_j_per_mol: float = 15_000.0
+
+
+def cell_voltage(
+    current_a: np.ndarray | float,
+    cell: TafelCellConfig,
+    ohmic_resistance_ohm: np.ndarray | float,
+    cell_temp_c: np.ndarray | float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cell voltage V(I) and its derivative dV/dI at the cell temperature."""
+    return _voltage(np.asarray(current_a, dtype=float), cell, *_coefficients(cell, ohmic_resistance_ohm, cell_temp_c))
+
+
+def _coefficients(
+    cell: TafelCellConfig, ohmic_resistance_ohm: np.ndarray | float, cell_temp_c: np.ndarray | float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Butler-Volmer slopes R T / (alpha F) and the ohmic resistance at T."""
+    temp_k = np.asarray(cell_temp_c, dtype=float) + 273.15
+    thermal_v = GAS_CONSTANT * temp_k / FARADAY_CONSTANT
+    ref_k = cell.reference_temp_c + 273.15
+    resistance = np.asarray(ohmic_resistance_ohm, dtype=float) * np.exp(
+        cell.ohmic_activation_energy_j_per_mol / GAS_CONSTANT * (1.0 / temp_k - 1.0 / ref_k)
+    )
+    return (
+        thermal_v / cell.anode_transfer_coefficient,
+        thermal_v / cell.cathode_transfer_coefficient,
+        resistance,
+    )
+
+
+def _voltage(
+    current: np.ndarray,
+    cell: TafelCellConfig,
+    b_anode: np.ndarray,
+    b_cathode: np.ndarray,
+    resistance: np.ndarray,
+    slope: bool = True,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    i0a, i0c = cell.anode_exchange_current_a, cell.cathode_exchange_current_a
+    voltage = (
+        cell.decomposition_potential_v
+        + b_anode * np.arcsinh(current / (2.0 * i0a))
+        + b_cathode * np.arcsinh(current / (2.0 * i0c))
+        + current * resistance
+    )
+    if not slope:
+        return voltage, None
+    squared = current * current
+    dv = b_anode / np.sqrt(squared + 4.0 * i0a * i0a) + b_cathode / np.sqrt(squared + 4.0 * i0c * i0c) + resistance
+    return voltage, dv
+
+
+def _limit_current(
+    target: np.ndarray,
+    upper: np.ndarray,
+    power: bool,
+    cell: TafelCellConfig,
+    coefficients: tuple[np.ndarray, np.ndarray, np.ndarray],
+    rtol: float = 1e-9,
+    max_iterations: int = 50,
+) -> np.ndarray:
+    """
+    Current in [0, upper] at which V(I) (or, with `power`, I * V(I) in W)
+    equals `target`, given that it exceeds the target at `upper`.
+
+    Newton from `upper`: V(I) is concave in I >= 0, so the first step lands
+    at or below the root and the iteration then rises monotonically onto it.
+    A bracket guards the power case and rounding; steps leaving it bisect.
+    Convergence is quadratic, so once a step is below `rtol` the one it
+    yields is already at rounding level and the iteration stops there.
+    """
+    lo = np.zeros(target.shape)
+    hi = upper.copy()
+    x = upper.copy()
+    # Newton converges in a handful of steps everywhere, so all points are
+    # iterated together; indexing out the converged ones would cost more.
+    for _ in range(max_iterations):
+        v, dv = _voltage(x, cell, *coefficients)
+        f, df = (x * v, v + x * dv) if power else (v, dv)
+        f -= target
+        above = f > 0
+        lo = np.where(above, lo, x)
+        hi = np.where(above, x, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x - f / df
+        x_new = np.where((df > 0) & (step >= lo) & (step <= hi), step, 0.5 * (lo + hi))
+        converged = np.all(np.abs(x_new - x) <= rtol * np.maximum(np.abs(x), 1.0))
+        x = x_new
+        if converged:
+            break
+    # Never end above the limit.
+    return np.minimum(x, hi)
+
+
+def compute_electrical_state_tafel(
+    requested_current_a: np.ndarray | float,
+    config: ElectricalConfig,
+    effective_cell_resistance_ohm: np.ndarray | float | None = None,
+    cell: TafelCellConfig | None = None,
+    cell_temp_c: np.ndarray | float | None = None,
+) -> ElectricalStateArray:
+    """
+    Electrical state with the nonlinear cell voltage and self-consistent
+    limits. `effective_cell_resistance_ohm` (default `cell_resistance_ohm`)
+    is the ohmic resistance at the reference temperature, wear included;
+    `cell_temp_c` defaults to the reference temperature.
+    """
+    cell = cell or TafelCellConfig()
+    r = effective_cell_resistance_ohm if effective_cell_resistance_ohm is not None else config.cell_resistance_ohm
+    temp = cell.reference_temp_c if cell_temp_c is None else cell_temp_c
+    requested, resistance, temp = np.broadcast_arrays(
+        np.asarray(requested_current_a, dtype=float), np.asarray(r, dtype=float), np.asarray(temp, dtype=float)
+    )
+    shape = requested.shape
+    requested, resistance, temp = requested.ravel(), resistance.ravel(), temp.ravel()
+
+    coefficients = _coefficients(cell, resistance, temp)
+
+    # 1) Apply current limit
+    current = np.minimum(requested, config.max_dc_current_a)
+    code = np.where(current < requested, REASON_CURRENT_LIMIT, REASON_NONE)
+    voltage, _ = _voltage(current, cell, *coefficients, slope=False)
+
+    # 2) Upper voltage limit: the current at which V reaches the maximum
+    # (none if even zero current needs more than the maximum).
+    high = voltage > config.max_cell_voltage_v
+    if high.any():
+        v_max = np.broadcast_to(np.asarray(config.max_cell_voltage_v, dtype=float), shape).ravel()[high]
+        reachable = v_max > cell.decomposition_potential_v
+        subset = tuple(c[high] for c in coefficients)
+        limited = np.where(
+            reachable,
+            _limit_current(
+                np.where(reachable, v_max, cell.decomposition_potential_v + 1.0),
+                np.maximum(current[high], 0.0),
+                False,
+                cell,
+                subset,
+            ),
+            0.0,
+        )
+        current[high] = limited
+        voltage[high] = np.where(reachable, _voltage(limited, cell, *subset, slope=False)[0], v_max)
+        code = np.where(high, REASON_VOLTAGE_LIMIT, code)
+
+    # 3) Lower voltage limit: the supply holds the minimum voltage.
+    low = voltage < config.min_cell_voltage_v
+    voltage = np.where(low, config.min_cell_voltage_v, voltage)
+    code = np.where(low, REASON_VOLTAGE_LIMIT, code)
+
+    # 4) Power limit: the current at which the AC power reaches the rating,
+    # with the voltage recomputed at that current.
+    eta = np.maximum(config.rectifier_efficiency, 1e-6)
+    p_max_w = np.broadcast_to(np.asarray(config.max_power_kw * eta * 1000.0, dtype=float), shape).ravel()
+    over = current * voltage > p_max_w
+    if over.any():
+        # Where the minimum voltage holds, power is linear in the current.
+        subset = tuple(c[over] for c in coefficients)
+        limited = np.where(
+            low[over],
+            p_max_w[over] / np.where(low[over], voltage[over], 1.0),
+            _limit_current(p_max_w[over], current[over], True, cell, subset),
+        )
+        current[over] = limited
+        v_limited, _ = _voltage(limited, cell, *subset, slope=False)
+        voltage[over] = np.maximum(v_limited, np.broadcast_to(config.min_cell_voltage_v, shape).ravel()[over])
+        code = np.where(over, REASON_POWER_LIMIT, code)
+
+    dc_power_kw = current * voltage / 1000.0
+    code = code.astype(np.int8).reshape(shape)
+    return ElectricalStateArray(
+        requested_current_a=requested.reshape(shape),
+        actual_current_a=current.reshape(shape),
+        cell_voltage_v=voltage.reshape(shape),
+        dc_power_kw=dc_power_kw.reshape(shape),
+        ac_power_kw=(dc_power_kw / eta).reshape(shape),
+        constrained=code != REASON_NONE,
+        constraint_code=code,
+    )
+
+
+if __name__ == "__main__":
+    import functools
+    import time
+
+    from electrical_model import CONSTRAINT_REASONS, compute_electrical_state_array, solve_requested_current
+
+    ecfg = ElectricalConfig()
+    cell = TafelCellConfig()
+    currents = np.array([5_000.0, 20_000.0, 40_000.0, 80_000.0])
+    for temp_c in (550.0, 600.0, 650.0):
+        state = compute_electrical_state_tafel(currents, ecfg, cell=cell, cell_temp_c=temp_c)
+        rows = ", ".join(
+            f"{i:,.0f} A -> {v:.2f} V ({CONSTRAINT_REASONS[c]})"
+            for i, v, c in zip(state.actual_current_a, state.cell_voltage_v, state.constraint_code)
+        )
+        print(f"{temp_c:.0f} °C: {rows}")
+
+    model = functools.partial(compute_electrical_state_tafel, cell=cell, cell_temp_c=600.0)
+    solved = solve_requested_current(300.0, "dc_power_kw", ecfg, model=model)
+    print(f"300 kW DC needs {float(solved.requested_current_a):,.0f} A at {float(solved.cell_voltage_v):.3f} V")
+
+    rng = np.random.default_rng(0)
+    batch = rng.uniform(0.0, 120_000.0, 1_000_000)
+    resistance = ecfg.cell_resistance_ohm * rng.uniform(1.0, 2.0, batch.size)
+    t0 = time.perf_counter()
+    compute_electrical_state_array(batch, ecfg, resistance)
+    t1 = time.perf_counter()
+    compute_electrical_state_tafel(batch, ecfg, resistance, cell=cell)
+    t2 = time.perf_counter()
+    print(f"1e6 points: linear {t1 - t0:.3f} s, nonlinear {t2 - t1:.3f} s")
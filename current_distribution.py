@@ -0,0 +1,312 @@
+"""Current distribution across the electrode face, with local wear.
+
+`ElectrodeState` treats the electrode as one lump. Here the face is a grid
+of cells (rows x columns), each connected
+
+- through the melt to the counter electrode, with a local conductance that
+  falls as that cell wears (`effective_resistance_multiplier_array` of the
+  cell's amp-hours per unit area), and
+- to its four neighbours through the in-plane (sheet) resistance of the plate.
+
+Current enters the plate at the busbar edge(s), held at the cell voltage.
+Perimeter cells carry extra fringing conductance, so current crowds at the
+edges and near the busbar, and those cells wear first.
+
+The node potentials solve a sparse linear system (graph Laplacian of the
+plate plus the diagonal of through-conductances). Wear only changes the
+diagonal and does so slowly, so
+
+- the potentials are held between solves: each step updates the local
+  currents as g_i * phi_i with the present conductances;
+- they are solved again once some conductance has moved by more than
+  `resolve_tolerance` since the last solve, by conjugate gradients
+  preconditioned with the cached LU factorization (a few triangular solves);
+- the system is refactored only once some conductance has moved by more than
+  `refactor_tolerance` since the factorization.
+
+The factorization of the fresh face is kept for reuse after every electrode
+replacement.
+
+Conductances are scaled so that a fresh face has the lumped resistance
+`cell_resistance_ohm`; `effective_cell_resistance_ohm` is what to pass to
+`compute_electrical_state` as the face wears.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator, cg, splu
+
+from electrical_model import ElectricalConfig, compute_electrical_state
+from electrode_model import ElectrodeConfig, effective_resistance_multiplier_array
+
+_EDGES = ("top", "bottom", "left", "right")
+
+
+@dataclass
+class CurrentDistributionConfig:
+    """Grid and geometry of the electrode face (dimensionless)."""
+
+    rows: int = 100
+    columns: int = 100
+    aspect_ratio: float = 1.0            # face width / height
+    # In-plane resistance of the plate per square, relative to the through
+    # resistance of the whole (fresh) face.
+    sheet_resistance_ratio: float = 0.3
+    # Fringing at the edges: local through conductance is raised by
+    # edge_enhancement * exp(-distance / edge_width) per edge (distance as a
+    # fraction of the face height).
+    edge_enhancement: float = 0.5
+    edge_width: float = 0.05
+    busbar_edges: Tuple[str, ...] = ("top",)
+    # Largest relative change of a local conductance before the potentials
+    # are solved again (with the cached factorization), and before refactoring.
+    resolve_tolerance: float = 0.01
+    refactor_tolerance: float = 0.2
+
+    def __post_init__(self) -> None:
+        if self.rows < 1 or self.columns < 1 or self.rows * self.columns < 2:
+            raise ValueError("the grid needs at least two cells")
+        if self.aspect_ratio <= 0 or self.sheet_resistance_ratio <= 0 or self.edge_width <= 0:
+            raise ValueError("aspect_ratio, sheet_resistance_ratio and edge_width must be positive")
+        unknown = set(self.busbar_edges) - set(_EDGES)
+        if unknown or not self.busbar_edges:
+            raise ValueError(f"busbar_edges must be a non-empty subset of {_EDGES}")
+
+
+class ElectrodeFace:
+    """Spatial electrode wear: local amp-hours and current share per cell."""
+
+    def __init__(
+        self,
+        config: CurrentDistributionConfig,
+        electrodes: ElectrodeConfig,
+        cell_resistance_ohm: float,
+    ) -> None:
+        self.config = config
+        self.electrodes = electrodes
+        self.cell_resistance_ohm = float(cell_resistance_ohm)
+        rows, cols = config.rows, config.columns
+        self.n_cells = rows * cols
+        self.local_amp_hours = np.zeros(self.n_cells)
+        self.refactorizations = 0
+
+        # Unit-height face; every cell has the same area.
+        dx, dy = config.aspect_ratio / cols, 1.0 / rows
+        r, c = np.divmod(np.arange(self.n_cells), cols)
+        x, y = (c + 0.5) * dx, (r + 0.5) * dy
+        distances = (x, config.aspect_ratio - x, y, 1.0 - y)
+        fringe = sum(np.exp(-d / config.edge_width) for d in distances)
+        g_fresh = (1.0 + config.edge_enhancement * fringe) / self.n_cells
+
+        # Plate Laplacian: horizontal links conduct dy/dx per square, vertical dx/dy.
+        index = np.arange(self.n_cells).reshape(rows, cols)
+        links = [
+            (index[:, :-1].ravel(), index[:, 1:].ravel(), dy / dx / config.sheet_resistance_ratio),
+            (index[:-1, :].ravel(), index[1:, :].ravel(), dx / dy / config.sheet_resistance_ratio),
+        ]
+        i = np.concatenate([a for a, _, _ in links])
+        j = np.concatenate([b for _, b, _ in links])
+        w = np.concatenate([np.full(a.size, g) for a, _, g in links])
+        off = sp.coo_matrix((-w, (i, j)), shape=(self.n_cells,) * 2)
+        laplacian = (off + off.T).tocsr()
+        laplacian = laplacian - sp.diags(np.asarray(laplacian.sum(axis=1)).ravel())
+
+        fed = np.zeros(self.n_cells, dtype=bool)
+        for edge in config.busbar_edges:
+            fed |= {"top": r == 0, "bottom": r == rows - 1, "left": c == 0, "right": c == cols - 1}[edge]
+        self._fed = fed
+        self._free = np.flatnonzero(~fed)
+        # Free nodes: (L_ff + diag(g_f)) phi_f = -L_fb * 1, busbar nodes at 1.
+        self._laplacian_free = laplacian[self._free][:, self._free].tocsc()
+        self._rhs = -np.asarray(laplacian[self._free][:, np.flatnonzero(fed)].sum(axis=1)).ravel()
+
+        # Scale all conductances so the fresh face has `cell_resistance_ohm`;
+        # scaling leaves the distribution unchanged.
+        phi = self._factor_and_solve(g_fresh)
+        self._scale = float(g_fresh @ phi) * self.cell_resistance_ohm
+        self._g_fresh = g_fresh
+        self._fresh = (self._lu, phi)
+        self.reset_after_maintenance()
+        self.refactorizations = 1
+
+    @classmethod
+    def for_plant(cls, cfg: "PlantConfig", config: CurrentDistributionConfig | None = None) -> "ElectrodeFace":  # noqa: F821
+        return cls(config or CurrentDistributionConfig(), cfg.electrodes, cfg.electrical.cell_resistance_ohm)
+
+    def _system(self, g: np.ndarray) -> sp.csc_matrix:
+        return (self._laplacian_free + sp.diags(g[self._free])).tocsc()
+
+    def _factor_and_solve(self, g: np.ndarray) -> np.ndarray:
+        self._lu = splu(self._system(g))
+        self._g_factored = g.copy()
+        self.refactorizations += 1
+        phi = np.ones(self.n_cells)
+        phi[self._free] = self._lu.solve(self._rhs)
+        return phi
+
+    def _resolve(self, g: np.ndarray) -> np.ndarray:
+        """Potentials at `g` by conjugate gradients preconditioned with the cached LU."""
+        lu = self._lu
+        preconditioner = LinearOperator(lu.shape, matvec=lu.solve, dtype=float)
+        phi = self._phi.copy()
+        phi[self._free], info = cg(self._system(g), self._rhs, x0=phi[self._free], rtol=1e-10, M=preconditioner)
+        if info != 0:
+            return self._factor_and_solve(g)
+        return phi
+
+    # ------------------------------------------------------------------ #
+    # State
+    # ------------------------------------------------------------------ #
+    def _update(self, force: bool = False) -> None:
+        """Local conductances from wear; potentials re-solved once they drift too far."""
+        multiplier = effective_resistance_multiplier_array(self.local_amp_hours * self.n_cells, self.electrodes)
+        g = self._g_fresh / multiplier
+        if force or np.max(np.abs(g - self._g_solved) / self._g_solved) > self.config.resolve_tolerance:
+            if np.max(np.abs(g - self._g_factored) / self._g_factored) > self.config.refactor_tolerance:
+                self._phi = self._factor_and_solve(g)
+            else:
+                self._phi = self._resolve(g)
+            self._g_solved = g
+        self._local_current = g * self._phi
+        self._total = float(self._local_current.sum())
+
+    def solve(self) -> None:
+        """Solve the potentials at the present wear, regardless of `resolve_tolerance`."""
+        self._update(force=True)
+
+    def step(self, current_a: float, dt_hours: float) -> None:
+        """Pass `current_a` through the face for `dt_hours`, wearing each cell by its share."""
+        if dt_hours <= 0 or current_a <= 0:
+            return
+        self.local_amp_hours += (current_a * dt_hours / self._total) * self._local_current
+        self._update()
+
+    def reset_after_maintenance(self) -> None:
+        """Fresh electrodes; the fresh factorization is reused."""
+        self.local_amp_hours[:] = 0.0
+        self._lu, self._phi = self._fresh
+        self._g_factored = self._g_solved = self._g_fresh
+        self._update()
+
+    # ------------------------------------------------------------------ #
+    # Reports
+    # ------------------------------------------------------------------ #
+    @property
+    def effective_cell_resistance_ohm(self) -> float:
+        """Lumped resistance of the face, for `compute_electrical_state`."""
+        return self._scale / self._total
+
+    @property
+    def current_share(self) -> np.ndarray:
+        """Fraction of the cell current through each grid cell, (rows, columns)."""
+        return (self._local_current / self._total).reshape(self.config.rows, self.config.columns)
+
+    @property
+    def total_amp_hours(self) -> float:
+        return float(self.local_amp_hours.sum())
+
+    def local_life_fraction(self) -> np.ndarray:
+        """Remaining life of each grid cell (its amp-hours per unit area), (rows, columns)."""
+        limit = self.electrodes.amp_hours_limit
+        if limit <= 0:
+            return np.ones((self.config.rows, self.config.columns))
+        life = np.clip(1.0 - self.local_amp_hours * self.n_cells / limit, 0.0, 1.0)
+        return life.reshape(self.config.rows, self.config.columns)
+
+    def remaining_life_fraction(self) -> float:
+        """Life of the most worn cell, which sets when the electrode is spent."""
+        return float(self.local_life_fraction().min())
+
+    def peak_density_ratio(self) -> float:
+        """Highest local current density over the face mean."""
+        return float(self._local_current.max() / self._total * self.n_cells)
+
+    def hot_spots(self, count: int = 5) -> List[Dict[str, float]]:
+        """The `count` cells with the highest current density, densest first."""
+        count = min(int(count), self.n_cells)
+        top = np.argpartition(self._local_current, -count)[-count:]
+        top = top[np.argsort(self._local_current[top])[::-1]]
+        life = self.local_life_fraction().ravel()
+        rows, cols = np.divmod(top, self.config.columns)
+        return [
+            {
+                "row": int(r),
+                "column": int(c),
+                "density_ratio": float(self._local_current[k] / self._total * self.n_cells),
+                "life_fraction": float(life[k]),
+            }
+            for r, c, k in zip(rows, cols, top)
+        ]
+
+    # ------------------------------------------------------------------ #
+    # Driver
+    # ------------------------------------------------------------------ #
+    def run(self, requested_profile: np.ndarray, dt_hours: float, electrical: ElectricalConfig) -> Dict[str, np.ndarray]:
+        """
+        Step through a requested-current profile, feeding the face's lumped
+        resistance to `compute_electrical_state` every step and wearing the
+        face with the actual current. The face is replaced (reset) as soon as
+        its most worn cell reaches `min_life_fraction_for_operation`.
+        """
+        requested = np.asarray(requested_profile, dtype=float).ravel()
+        n = requested.size
+        columns = {
+            "actual_current_a": np.empty(n),
+            "cell_voltage_v": np.empty(n),
+            "effective_cell_resistance_ohm": np.empty(n),
+            "peak_density_ratio": np.empty(n),
+            "replaced": np.zeros(n, dtype=bool),
+        }
+        limit = self.electrodes.amp_hours_limit
+        # Local amp-hours per unit area at which the worst cell is spent.
+        spent = (1.0 - self.electrodes.min_life_fraction_for_operation) * limit / self.n_cells
+        for k in range(n):
+            resistance = self.effective_cell_resistance_ohm
+            state = compute_electrical_state(float(requested[k]), electrical, resistance)
+            columns["actual_current_a"][k] = state.actual_current_a
+            columns["cell_voltage_v"][k] = state.cell_voltage_v
+            columns["effective_cell_resistance_ohm"][k] = resistance
+            columns["peak_density_ratio"][k] = self.peak_density_ratio()
+            self.step(state.actual_current_a, dt_hours)
+            if limit > 0 and self.local_amp_hours.max() >= spent:
+                self.reset_after_maintenance()
+                columns["replaced"][k] = True
+        return columns
+
+
+if __name__ == "__main__":
+    import time
+
+    from plant_model import PlantConfig
+
+    cfg = PlantConfig(electrodes=ElectrodeConfig(amp_hours_limit=2.0e8))
+    face = ElectrodeFace.for_plant(cfg)
+    print(f"Fresh: R = {face.effective_cell_resistance_ohm:.3e} ohm, peak density x{face.peak_density_ratio():.2f}")
+
+    face.step(50_000.0, 2_000.0)
+    lumped = 1.0 + face.total_amp_hours / cfg.electrodes.amp_hours_limit * (
+        cfg.electrodes.resistance_multiplier_at_end_of_life - 1.0
+    )
+    print(
+        f"After 1e8 Ah: R = {face.effective_cell_resistance_ohm:.3e} ohm "
+        f"(lumped model {cfg.electrical.cell_resistance_ohm * lumped:.3e}), "
+        f"worst-cell life {face.remaining_life_fraction():.2f}"
+    )
+    for spot in face.hot_spots(3):
+        print(f"  hot spot row {spot['row']}, col {spot['column']}: x{spot['density_ratio']:.2f}, life {spot['life_fraction']:.2f}")
+
+    face.reset_after_maintenance()
+    hours = 10 * 8_760
+    profile = np.full(hours, 50_000.0)
+    t0 = time.perf_counter()
+    result = face.run(profile, 1.0, cfg.electrical)
+    t1 = time.perf_counter()
+    print(
+        f"{face.config.rows}x{face.config.columns} grid, {hours:,} hourly steps in {t1 - t0:.1f} s: "
+        f"{int(result['replaced'].sum())} replacements, {face.refactorizations} factorizations"
+    )
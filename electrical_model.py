@@ -7,11 +7,13 @@ power, and constraint flags.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Literal
+from dataclasses import dataclass, fields, replace
+from typing import Callable, Literal, Sequence
 
+import numpy as np
 
-@dataclass
+
+@dataclass(frozen=True)
 class ElectricalConfig:
     """Configuration for the DC supply and cell."""
 
@@ -32,7 +34,7 @@ class ElectricalConfig:
     rectifier_efficiency: float = 0.96
 
 
-@dataclass
+@dataclass(slots=True)
 class ElectricalState:
     """Result of attempting to supply a given current."""
 
@@ -111,8 +113,320 @@ def compute_electrical_state(
     )
 
 
+# Integer codes used by the array path for `constraint_reason`.
+CONSTRAINT_REASONS = ("none", "current_limit", "power_limit", "voltage_limit")
+REASON_NONE = 0
+REASON_CURRENT_LIMIT = 1
+REASON_POWER_LIMIT = 2
+REASON_VOLTAGE_LIMIT = 3
+
+
+@dataclass
+class ElectricalStateArray:
+    """Columnar counterpart of `ElectricalState` for a batch of operating points."""
+
+    requested_current_a: np.ndarray
+    actual_current_a: np.ndarray
+    cell_voltage_v: np.ndarray
+    dc_power_kw: np.ndarray
+    ac_power_kw: np.ndarray
+    constrained: np.ndarray
+    constraint_code: np.ndarray  # index into CONSTRAINT_REASONS
+
+    def __len__(self) -> int:
+        return len(self.actual_current_a)
+
+    @property
+    def constraint_reason(self) -> np.ndarray:
+        """`constraint_code` decoded to the scalar path's reason strings."""
+        return np.asarray(CONSTRAINT_REASONS)[self.constraint_code]
+
+    def row(self, index: int | tuple) -> ElectricalState:
+        """One operating point as the `ElectricalState` the scalar path returns."""
+        return ElectricalState(
+            requested_current_a=float(self.requested_current_a[index]),
+            actual_current_a=float(self.actual_current_a[index]),
+            cell_voltage_v=float(self.cell_voltage_v[index]),
+            dc_power_kw=float(self.dc_power_kw[index]),
+            ac_power_kw=float(self.ac_power_kw[index]),
+            constrained=bool(self.constrained[index]),
+            constraint_reason=CONSTRAINT_REASONS[int(self.constraint_code[index])],
+        )
+
+
+def stack_electrical_configs(configs: Sequence[ElectricalConfig]) -> ElectricalConfig:
+    """One `ElectricalConfig` whose fields are arrays, element i from `configs[i]`."""
+    if not configs:
+        raise ValueError("need at least one config")
+    return ElectricalConfig(
+        **{f.name: np.array([getattr(cfg, f.name) for cfg in configs], dtype=float) for f in fields(ElectricalConfig)}
+    )
+
+
+def compute_electrical_state_array(
+    requested_current_a: np.ndarray,
+    config: ElectricalConfig | Sequence[ElectricalConfig],
+    effective_cell_resistance_ohm: np.ndarray | float | None = None,
+) -> ElectricalStateArray:
+    """
+    Vectorised `compute_electrical_state` over arrays of operating points.
+
+    The limit cascade is the same as the scalar path and is applied with
+    masks, so every element matches the scalar result exactly. Config fields
+    may themselves be arrays (one value per element) and are broadcast; a
+    sequence of configs is stacked with `stack_electrical_configs`.
+    """
+    if not isinstance(config, ElectricalConfig):
+        config = stack_electrical_configs(config)
+    requested = np.asarray(requested_current_a, dtype=float)
+
+    # 1) Apply current limit
+    actual_current = np.minimum(requested, config.max_dc_current_a)
+    code = np.where(actual_current < requested, REASON_CURRENT_LIMIT, REASON_NONE)
+
+    # 2) Linear scaling around base point plus ohmic term
+    r_cell = effective_cell_resistance_ohm if effective_cell_resistance_ohm is not None else config.cell_resistance_ohm
+    base_current = np.asarray(config.base_current_a, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaling = np.where(base_current > 0, actual_current / base_current, 1.0)
+    v_cell = config.base_cell_voltage_v * scaling + actual_current * r_cell
+
+    # 3) Enforce voltage limits
+    low = v_cell < config.min_cell_voltage_v
+    high = ~low & (v_cell > config.max_cell_voltage_v)
+    v_cell = np.where(low, config.min_cell_voltage_v, np.where(high, config.max_cell_voltage_v, v_cell))
+    code = np.where(low | high, REASON_VOLTAGE_LIMIT, code)
+
+    # 4) Compute power and enforce power limit
+    dc_power_kw = (actual_current * v_cell) / 1000.0
+    ac_power_kw = dc_power_kw / np.maximum(config.rectifier_efficiency, 1e-6)
+
+    # Reduce current proportionally to respect power limit.
+    over = ac_power_kw > config.max_power_kw
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(over, config.max_power_kw / ac_power_kw, 1.0)
+    actual_current = np.where(over, actual_current * scale, actual_current)
+    dc_power_kw = np.where(over, dc_power_kw * scale, dc_power_kw)
+    ac_power_kw = np.where(over, config.max_power_kw, ac_power_kw)
+    code = np.where(over, REASON_POWER_LIMIT, code).astype(np.int8)
+
+    return ElectricalStateArray(
+        requested_current_a=np.broadcast_to(requested, actual_current.shape),
+        actual_current_a=actual_current,
+        cell_voltage_v=v_cell,
+        dc_power_kw=dc_power_kw,
+        ac_power_kw=ac_power_kw,
+        constrained=code != REASON_NONE,
+        constraint_code=code,
+    )
+
+
+def unclipped_voltage_coefficients(
+    config: ElectricalConfig, resistance_ohm: np.ndarray | float
+) -> tuple[np.ndarray, float]:
+    """Unclipped cell voltage as v0 + slope * I; returns (slope, v0)."""
+    resistance = np.asarray(resistance_ohm, dtype=float)
+    base_current = np.asarray(config.base_current_a, dtype=float)
+    if base_current.ndim == 0:
+        if base_current > 0:
+            return config.base_cell_voltage_v / config.base_current_a + resistance, 0.0
+        return resistance, config.base_cell_voltage_v
+    # Per-element configs
+    linear = base_current > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(linear, config.base_cell_voltage_v / base_current + resistance, resistance)
+    return slope, np.where(linear, 0.0, config.base_cell_voltage_v)
+
+
+def regime_breakpoints(config: ElectricalConfig, resistance_ohm: np.ndarray | float) -> np.ndarray:
+    """
+    Requested currents at which the limit regime can change, solved
+    analytically for each cell resistance; shape (..., 6), NaN or inf where a
+    boundary does not exist. Columns: current limit, voltage at
+    `min_cell_voltage_v` and the power limit while clipped there, the same
+    for `max_cell_voltage_v`, and the power limit on the unclipped branch.
+    """
+    slope, v0 = unclipped_voltage_coefficients(config, resistance_ohm)
+    eta = max(config.rectifier_efficiency, 1e-6)
+    p_dc = config.max_power_kw * eta * 1000.0
+    columns = [np.broadcast_to(config.max_dc_current_a, slope.shape)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for v in (config.min_cell_voltage_v, config.max_cell_voltage_v):
+            # Voltage limit: v0 + slope * I = V
+            columns.append((v - v0) / slope)
+            # Power limit while the voltage is clipped at V
+            columns.append(np.broadcast_to(p_dc / v, slope.shape))
+        # Power limit on the unclipped branch: slope * I**2 + v0 * I = P_dc
+        columns.append((-v0 + np.sqrt(v0 * v0 + 4.0 * slope * p_dc)) / (2.0 * slope))
+    return np.stack(np.broadcast_arrays(*columns), axis=-1).astype(float)
+
+
+# --------------------------------------------------------------------------- #
+# Inverse solvers: target voltage or power -> requested current
+# --------------------------------------------------------------------------- #
+#
+# Cell voltage and power are non-decreasing in the requested current, so a
+# target has a smallest requested current in [0, max_dc_current_a] whose state
+# comes closest to it. Targets beyond what the limits allow are clamped: the
+# result is then the smallest current reaching the limit, and the returned
+# state (from the forward model) shows which limit binds.
+
+
+def current_for_voltage(
+    target_voltage_v: np.ndarray | float,
+    config: ElectricalConfig,
+    effective_cell_resistance_ohm: np.ndarray | float | None = None,
+) -> ElectricalStateArray:
+    """Smallest requested current giving `target_voltage_v`, with its state (closed form)."""
+    r = effective_cell_resistance_ohm if effective_cell_resistance_ohm is not None else config.cell_resistance_ohm
+    target = np.asarray(target_voltage_v, dtype=float)
+    slope, v0 = unclipped_voltage_coefficients(config, r)
+    # Highest reachable voltage; at the minimum voltage even zero current is
+    # on the clipped branch.
+    v_reach = np.clip(v0 + slope * config.max_dc_current_a, config.min_cell_voltage_v, config.max_cell_voltage_v)
+    v = np.minimum(target, v_reach)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        current = np.where(
+            (v > config.min_cell_voltage_v) & (slope > 0), (v - v0) / slope, 0.0
+        )
+    current = np.clip(current, 0.0, config.max_dc_current_a)
+    return compute_electrical_state_array(current, config, effective_cell_resistance_ohm=r)
+
+
+def current_for_power(
+    target_power_kw: np.ndarray | float,
+    config: ElectricalConfig,
+    effective_cell_resistance_ohm: np.ndarray | float | None = None,
+    basis: Literal["dc", "ac"] = "dc",
+) -> ElectricalStateArray:
+    """
+    Smallest requested current giving `target_power_kw` of DC (cell) or AC
+    (grid) power, with its state. DC power is linear in the current while a
+    voltage limit clips the voltage and quadratic in between, so each piece
+    inverts in closed form.
+    """
+    if basis not in ("dc", "ac"):
+        raise ValueError("basis must be 'dc' or 'ac'")
+    r = effective_cell_resistance_ohm if effective_cell_resistance_ohm is not None else config.cell_resistance_ohm
+    eta = np.maximum(config.rectifier_efficiency, 1e-6)
+    p_dc = np.asarray(target_power_kw, dtype=float)
+    if basis == "ac":
+        p_dc = p_dc * eta
+    watts = 1000.0 * np.clip(p_dc, 0.0, config.max_power_kw * eta)
+
+    slope, v0 = unclipped_voltage_coefficients(config, r)
+    v_min, v_max = config.min_cell_voltage_v, config.max_cell_voltage_v
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Voltage clipped at the minimum, at the maximum, or unclipped:
+        # slope * I**2 + v0 * I = W (stable root, also for slope == 0).
+        low = watts / v_min
+        high = watts / v_max
+        middle = 2.0 * watts / (v0 + np.sqrt(v0 * v0 + 4.0 * slope * watts))
+        current = np.where(
+            (v_min > 0) & (v0 + slope * low <= v_min),
+            low,
+            np.where(v0 + slope * high >= v_max, high, middle),
+        )
+    current = np.clip(np.where(watts > 0, current, 0.0), 0.0, config.max_dc_current_a)
+    return compute_electrical_state_array(current, config, effective_cell_resistance_ohm=r)
+
+
+def solve_requested_current(
+    target: np.ndarray | float,
+    quantity: Literal["cell_voltage_v", "dc_power_kw", "ac_power_kw", "actual_current_a"],
+    config: ElectricalConfig,
+    effective_cell_resistance_ohm: np.ndarray | float | None = None,
+    model: Callable[..., ElectricalStateArray] = compute_electrical_state_array,
+    rtol: float = 1e-12,
+    max_iterations: int = 100,
+) -> ElectricalStateArray:
+    """
+    Smallest requested current at which `quantity` of `model` reaches
+    `target`, for any forward model with the signature of
+    `compute_electrical_state_array` in which `quantity` is non-decreasing in
+    the requested current.
+
+    Newton steps (derivative by forward difference) inside a bracket that
+    shrinks every iteration; a step leaving the bracket, or a flat stretch
+    such as a clipped voltage, falls back to bisection.
+    """
+    r = effective_cell_resistance_ohm if effective_cell_resistance_ohm is not None else config.cell_resistance_ohm
+    target, r = np.broadcast_arrays(np.asarray(target, dtype=float), np.asarray(r, dtype=float))
+    shape = target.shape
+    target, r = target.ravel(), r.ravel()
+
+    # Per-element config fields follow the elements still being solved.
+    per_element = {
+        f.name: np.broadcast_to(np.asarray(getattr(config, f.name), dtype=float), shape).ravel()
+        for f in fields(ElectricalConfig)
+        if np.ndim(getattr(config, f.name))
+    }
+
+    def evaluate(current: np.ndarray, index: np.ndarray) -> np.ndarray:
+        cfg = replace(config, **{name: values[index] for name, values in per_element.items()}) if per_element else config
+        return getattr(model(current, cfg, effective_cell_resistance_ohm=r[index]), quantity)
+
+    everything = np.arange(target.size)
+    lo = np.zeros(target.size)
+    hi = np.broadcast_to(np.asarray(config.max_dc_current_a, dtype=float), shape).ravel().copy()
+    f_lo, f_hi = evaluate(lo, everything), evaluate(hi, everything)
+    # Clamp to the reachable range. From here on f(lo) < target <= f(hi):
+    # the answer is the smallest x in (lo, hi] with f(x) >= target (to
+    # within the tolerance).
+    target = np.minimum(target, f_hi)
+    open_ = np.flatnonzero(target > f_lo)
+    solved = lo.copy()
+    solved[open_] = hi[open_]
+
+    x = 0.5 * (lo + hi)
+    for _ in range(max_iterations):
+        if not open_.size:
+            break
+        xo = x[open_]
+        f = evaluate(xo, open_) - target[open_]
+        tolerance = rtol * np.maximum(np.abs(target[open_]), 1.0)
+        reached = f >= -tolerance
+        lo_o = np.where(reached, lo[open_], xo)
+        hi_o = np.where(reached, xo, hi[open_])
+        h = 1e-7 * np.maximum(np.abs(xo), 1.0)
+        slope = (evaluate(xo + h, open_) - target[open_] - f) / h
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = xo - f / slope
+        # Flat to within the tolerance (e.g. a clipped voltage, or the power
+        # limit, which is flat up to rounding).
+        rising = slope * h > tolerance
+        inside = rising & (newton > lo_o) & (newton < hi_o)
+        x_new = np.where(inside, newton, 0.5 * (lo_o + hi_o))
+        lo[open_], hi[open_] = lo_o, hi_o
+
+        # A root on a rising stretch is the smallest one; on a flat stretch
+        # keep bisecting down to where it starts.
+        root = (np.abs(f) <= tolerance) & rising
+        narrow = hi_o - lo_o <= rtol * np.maximum(hi_o, 1.0)
+        solved[open_[root]] = xo[root]
+        solved[open_[narrow & ~root]] = hi_o[narrow & ~root]
+        x[open_] = x_new
+        open_ = open_[~(root | narrow)]
+    solved[open_] = hi[open_]
+    return model(solved.reshape(shape), config, effective_cell_resistance_ohm=r.reshape(shape))
+
+
 if __name__ == "__main__":
     cfg = ElectricalConfig()
     state = compute_electrical_state(80_000.0, cfg)
     print(state)
 
+    currents = np.array([20_000.0, 60_000.0, 120_000.0])
+    batch = compute_electrical_state_array(currents, [cfg, ElectricalConfig(max_power_kw=300.0), cfg])
+    for i, reason in enumerate(batch.constraint_reason):
+        print(f"{currents[i]:>9,.0f} A -> {batch.actual_current_a[i]:>9,.0f} A ({reason})")
+    assert batch.row(0) == compute_electrical_state(currents[0], cfg)
+
+    for target_kw in (100.0, 300.0, 1_000.0):
+        solved = current_for_power(target_kw, cfg)
+        print(
+            f"{target_kw:>7,.0f} kW DC -> request {float(solved.requested_current_a):>9,.0f} A, "
+            f"{float(solved.dc_power_kw):,.1f} kW ({CONSTRAINT_REASONS[int(solved.constraint_code)]})"
+        )
+    print(f"7.5 V -> request {float(current_for_voltage(7.5, cfg).requested_current_a):,.0f} A")
+
@@ -8,8 +8,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+import numpy as np
 
-@dataclass
+
+@dataclass(frozen=True)
 class ElectrodeConfig:
     """Configuration parameters for electrode wear and performance."""
 
@@ -24,7 +26,7 @@ class ElectrodeConfig:
     efficiency_at_end_of_life: float = 0.75
 
 
-@dataclass
+@dataclass(slots=True)
 class ElectrodeState:
     """Dynamic state of an electrode set in the cell."""
 
@@ -67,6 +69,33 @@ class ElectrodeState:
         self.in_maintenance = False
 
 
+# --------------------------------------------------------------------------- #
+# Array helpers
+# --------------------------------------------------------------------------- #
+# Same formulas as the `ElectrodeState` methods, evaluated over an array of
+# cumulative amp-hours. Config fields may be arrays (one value per element).
+
+
+def remaining_life_fraction_array(cumulative_amp_hours: np.ndarray, cfg: ElectrodeConfig) -> np.ndarray:
+    limit = np.asarray(cfg.amp_hours_limit, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = 1.0 - (np.asarray(cumulative_amp_hours, dtype=float) / limit)
+    return np.where(limit <= 0, 1.0, np.maximum(0.0, np.minimum(1.0, frac)))
+
+
+def effective_resistance_multiplier_array(cumulative_amp_hours: np.ndarray, cfg: ElectrodeConfig) -> np.ndarray:
+    life = remaining_life_fraction_array(cumulative_amp_hours, cfg)
+    end_mult = cfg.resistance_multiplier_at_end_of_life
+    return 1.0 + (1.0 - life) * (end_mult - 1.0)
+
+
+def effective_efficiency_array(cumulative_amp_hours: np.ndarray, cfg: ElectrodeConfig) -> np.ndarray:
+    life = remaining_life_fraction_array(cumulative_amp_hours, cfg)
+    eff_new = cfg.efficiency_at_new
+    eff_end = cfg.efficiency_at_end_of_life
+    return eff_end + (eff_new - eff_end) * life
+
+
 if __name__ == "__main__":
     cfg = ElectrodeConfig()
     st = ElectrodeState()
@@ -0,0 +1,182 @@
+"""Discrete-event simulation around `SodiumPlant`.
+
+Instead of marching with a fixed dt, the simulation keeps a priority queue of
+future events and jumps straight from one event to the next with the
+closed-form `SodiumPlant.advance`. Events are:
+
+- ``setpoint``          change of the requested current (also queued from a
+                        `SetpointSchedule` by `schedule_profile`),
+- ``tariff``            change of the electricity price (the flat price, or
+                        the attached `Tariff`'s price from then on),
+- ``end_of_life``       electrodes reach `min_life_fraction_for_operation`,
+- ``maintenance_end``   electrodes replaced after the configured outage.
+
+End-of-life times are solved analytically from the current state and
+setpoint, so threshold crossings are located exactly rather than at step
+boundaries, and the cost of a run scales with the number of events.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List
+
+from plant_model import SodiumPlant
+from setpoint_schedule import SetpointSchedule
+from wear_segments import ConstantCurrentSegment, maintenance_amp_hours
+
+
+@dataclass(order=True)
+class Event:
+    """A scheduled event; ordered by time, then by insertion order."""
+
+    time_hours: float
+    seq: int
+    kind: str = field(compare=False)
+    payload: Dict[str, Any] = field(compare=False, default_factory=dict)
+
+
+class EventDrivenSimulation:
+    """Event scheduler that drives a `SodiumPlant` between events."""
+
+    def __init__(
+        self,
+        plant: SodiumPlant | None = None,
+        current_a: float = 10_000.0,
+        maintenance_outage_hours: float = 72.0,
+    ) -> None:
+        self.plant = plant or SodiumPlant()
+        self.current_a = current_a
+        self.maintenance_outage_hours = maintenance_outage_hours
+
+        self._queue: List[Event] = []
+        self._seq = 0
+        # Bumped whenever the wear trajectory changes; stale end-of-life
+        # events carry an older generation and are dropped when popped.
+        self._generation = 0
+        if self.plant.state.electrode_state.in_maintenance:
+            # A plant handed over mid-outage gets the full outage from now.
+            self.schedule(self.time_hours + maintenance_outage_hours, "maintenance_end")
+        self._schedule_end_of_life()
+
+    @property
+    def time_hours(self) -> float:
+        return self.plant.state.time_hours
+
+    # ------------------------------------------------------------------ #
+    # Scheduling
+    # ------------------------------------------------------------------ #
+    def schedule(self, time_hours: float, kind: str, **payload: Any) -> None:
+        """Push an event onto the queue."""
+        if time_hours < self.time_hours:
+            raise ValueError("cannot schedule an event in the past")
+        heapq.heappush(self._queue, Event(time_hours, self._seq, kind, payload))
+        self._seq += 1
+
+    def schedule_setpoint(self, time_hours: float, current_a: float) -> None:
+        self.schedule(time_hours, "setpoint", current_a=current_a)
+
+    def schedule_tariff(self, time_hours: float, power_cost_per_kwh: float) -> None:
+        self.schedule(time_hours, "tariff", power_cost_per_kwh=power_cost_per_kwh)
+
+    def schedule_profile(self, profile: SetpointSchedule, end_time_hours: float, ramp_pieces: int = 8) -> None:
+        """
+        Queue setpoint events that follow `profile` until `end_time_hours`.
+
+        Constant parts become one setpoint each; ramps are split into
+        `ramp_pieces` setpoints carrying their exact average current.
+        """
+        edges, currents = profile.piecewise_constant(self.time_hours, end_time_hours, ramp_pieces)
+        for time_hours, current_a in zip(edges[:-1], currents):
+            self.schedule_setpoint(float(time_hours), float(current_a))
+
+    def _schedule_end_of_life(self) -> None:
+        self._generation += 1
+        es = self.plant.state.electrode_state
+        if es.in_maintenance:
+            return
+        limit_ah = maintenance_amp_hours(self.plant.cfg)
+        if math.isinf(limit_ah):
+            return
+        segment = ConstantCurrentSegment(self.plant.cfg, self.current_a, es.cumulative_amp_hours)
+        if not segment.wears:
+            return
+        hours = max(0.0, float(segment.hours_to(max(limit_ah, es.cumulative_amp_hours))))
+        self.schedule(self.time_hours + hours, "end_of_life", generation=self._generation)
+
+    # ------------------------------------------------------------------ #
+    # Main loop
+    # ------------------------------------------------------------------ #
+    def run_until(self, end_time_hours: float) -> List[Dict[str, Any]]:
+        """
+        Process events up to `end_time_hours` and return the event log.
+
+        Each log entry records the event and the plant totals at that time.
+        """
+        log: List[Dict[str, Any]] = []
+        while self._queue and self._queue[0].time_hours <= end_time_hours:
+            event = heapq.heappop(self._queue)
+            if event.kind == "end_of_life" and event.payload["generation"] != self._generation:
+                continue
+            self._advance_to(event.time_hours)
+            self._handle(event)
+            log.append(self._log_entry(event))
+        self._advance_to(end_time_hours)
+        return log
+
+    def _advance_to(self, time_hours: float) -> None:
+        hours = time_hours - self.time_hours
+        if hours > 0:
+            self.plant.advance(hours=hours, current_a=self.current_a)
+
+    def _handle(self, event: Event) -> None:
+        es = self.plant.state.electrode_state
+        if event.kind == "setpoint":
+            self.current_a = event.payload["current_a"]
+            self._schedule_end_of_life()
+        elif event.kind == "tariff":
+            price = event.payload["power_cost_per_kwh"]
+            if self.plant.tariff is not None:
+                self.plant.tariff = self.plant.tariff.with_price_from(self.time_hours, price)
+            else:
+                self.plant.cfg = replace(self.plant.cfg, power_cost_per_kwh=price)
+        elif event.kind == "end_of_life":
+            # `advance` stopped exactly at the threshold; make the flag explicit
+            # in case rounding left the last amp-hour a hair short of it.
+            es.in_maintenance = True
+            self._generation += 1
+            self.schedule(self.time_hours + self.maintenance_outage_hours, "maintenance_end")
+        elif event.kind == "maintenance_end":
+            es.reset_after_maintenance()
+            self._schedule_end_of_life()
+        else:
+            raise ValueError(f"unknown event kind: {event.kind}")
+
+    def _log_entry(self, event: Event) -> Dict[str, Any]:
+        st = self.plant.state
+        entry: Dict[str, Any] = {"time_hours": st.time_hours, "event": event.kind}
+        entry.update({k: v for k, v in event.payload.items() if k != "generation"})
+        entry.update(
+            {
+                "current_a": self.current_a,
+                "in_maintenance": st.electrode_state.in_maintenance,
+                "cumulative_amp_hours": st.electrode_state.cumulative_amp_hours,
+                "cumulative_na_kg": st.cumulative_na_produced_kg,
+                "cumulative_revenue": st.cumulative_revenue,
+                "cumulative_cost": st.cumulative_cost,
+            }
+        )
+        return entry
+
+
+if __name__ == "__main__":
+    sim = EventDrivenSimulation(current_a=10_000.0, maintenance_outage_hours=48.0)
+    sim.schedule_setpoint(24.0 * 30, 20_000.0)
+    sim.schedule_tariff(24.0 * 180, 0.15)
+    events = sim.run_until(5 * 8760.0)
+    for entry in events[:8]:
+        print(f"t={entry['time_hours']:9.1f} h | {entry['event']:<16} | Na cum={entry['cumulative_na_kg']:,.1f} kg")
+    print(f"... {len(events)} events over {sim.time_hours:,.0f} h")
+    print(f"Total Na: {sim.plant.state.cumulative_na_produced_kg:,.1f} kg")
@@ -0,0 +1,196 @@
+"""Monte Carlo uncertainty analysis over `PlantConfig` parameters.
+
+Uncertain inputs (electrode life, end-of-life efficiency, cell resistance,
+power and sodium prices, ...) are described by `ParameterDistribution`s on
+dotted config paths. Samples are split into chunks; each chunk draws its
+parameters from its own `SeedSequence`-spawned stream and is simulated as
+one `PlantEnsemble`, so a chunk is a single vectorised run. Chunks are
+farmed out to a process pool and the percentile bands are re-computed and
+yielded as chunks complete. Results are reproducible for a given seed and
+chunk size, independent of the number of workers.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from plant_ensemble import PlantEnsemble
+from plant_model import PlantConfig
+
+
+@dataclass
+class ParameterDistribution:
+    """
+    Distribution of one config field, addressed by dotted path.
+
+    kind / params:
+        "normal"      (mean, std)
+        "lognormal"   (mean, sigma) of the underlying normal
+        "uniform"     (low, high)
+        "triangular"  (low, mode, high)
+    """
+
+    path: str
+    kind: str
+    params: Tuple[float, ...]
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if self.kind == "normal":
+            return rng.normal(*self.params, size=size)
+        if self.kind == "lognormal":
+            return rng.lognormal(*self.params, size=size)
+        if self.kind == "uniform":
+            return rng.uniform(*self.params, size=size)
+        if self.kind == "triangular":
+            return rng.triangular(*self.params, size=size)
+        raise ValueError(f"unknown distribution kind: {self.kind}")
+
+
+@dataclass
+class MonteCarloConfig:
+    """Sampling, scenario and execution settings."""
+
+    n_samples: int = 10_000
+    chunk_size: int = 2_000
+    seed: int = 0
+
+    # Scenario: constant current over a fixed horizon
+    current_a: float = 10_000.0
+    total_hours: float = 24.0 * 30
+    dt_hours: float = 1.0
+    report_every_steps: int = 24
+
+    percentiles: Tuple[float, ...] = (5.0, 25.0, 50.0, 75.0, 95.0)
+    max_workers: int | None = None  # None: one per CPU; 0 or 1: run in-process
+
+    def __post_init__(self) -> None:
+        if self.n_samples < 1:
+            raise ValueError("n_samples must be at least 1")
+        if self.chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+
+@dataclass
+class MonteCarloUpdate:
+    """Percentile bands over the samples finished so far."""
+
+    samples_done: int
+    times_hours: np.ndarray
+    percentiles: Tuple[float, ...]
+    # metric -> array of shape (len(percentiles), len(times_hours))
+    bands: Dict[str, np.ndarray] = field(default_factory=dict)
+    # percentiles of hours until maintenance (inf: not reached in the horizon)
+    time_to_maintenance_hours: np.ndarray = field(default_factory=lambda: np.empty(0))
+    fraction_reaching_maintenance: float = 0.0
+
+
+def _simulate_chunk(
+    base: PlantConfig,
+    distributions: Sequence[ParameterDistribution],
+    seed: np.random.SeedSequence,
+    size: int,
+    cfg: MonteCarloConfig,
+) -> Dict[str, np.ndarray]:
+    """Sample one chunk of configs and simulate it as a single ensemble."""
+    rng = np.random.default_rng(seed)
+    overrides = {d.path: d.sample(rng, size) for d in distributions}
+    ensemble = PlantEnsemble.from_parameters(base, **overrides) if overrides else PlantEnsemble(base, size)
+
+    steps = int(cfg.total_hours / cfg.dt_hours)
+    report = max(1, cfg.report_every_steps)
+    na = np.empty((size, steps // report))
+    margin = np.empty_like(na)
+    time_to_maintenance = np.full(size, np.inf)
+
+    for i in range(steps):
+        was_in_maintenance = ensemble.in_maintenance
+        ensemble.step(cfg.current_a, cfg.dt_hours)
+        tripped = ensemble.in_maintenance & ~was_in_maintenance
+        time_to_maintenance[tripped] = ensemble.time_hours[tripped]
+        if (i + 1) % report == 0:
+            col = (i + 1) // report - 1
+            na[:, col] = ensemble.cumulative_na_produced_kg
+            margin[:, col] = ensemble.cumulative_revenue - ensemble.cumulative_cost
+
+    return {"cumulative_na_kg": na, "cumulative_margin": margin, "time_to_maintenance_hours": time_to_maintenance}
+
+
+def iter_monte_carlo(
+    base: PlantConfig,
+    distributions: Sequence[ParameterDistribution],
+    cfg: MonteCarloConfig | None = None,
+) -> Iterator[MonteCarloUpdate]:
+    """Run the Monte Carlo study, yielding updated bands as chunks finish."""
+    cfg = cfg or MonteCarloConfig()
+    sizes = [min(cfg.chunk_size, cfg.n_samples - start) for start in range(0, cfg.n_samples, cfg.chunk_size)]
+    seeds = np.random.SeedSequence(cfg.seed).spawn(len(sizes))
+
+    steps = int(cfg.total_hours / cfg.dt_hours)
+    report = max(1, cfg.report_every_steps)
+    times = cfg.dt_hours * report * np.arange(1, steps // report + 1)
+
+    finished: List[Dict[str, np.ndarray]] = []
+
+    def update() -> MonteCarloUpdate:
+        merged = {key: np.concatenate([r[key] for r in finished]) for key in finished[0]}
+        ttm = merged["time_to_maintenance_hours"]
+        return MonteCarloUpdate(
+            samples_done=ttm.size,
+            times_hours=times,
+            percentiles=cfg.percentiles,
+            bands={
+                key: np.percentile(merged[key], cfg.percentiles, axis=0)
+                for key in ("cumulative_na_kg", "cumulative_margin")
+            },
+            # No interpolation, so "never within the horizon" stays inf.
+            time_to_maintenance_hours=np.percentile(ttm, cfg.percentiles, method="inverted_cdf"),
+            fraction_reaching_maintenance=float(np.mean(np.isfinite(ttm))),
+        )
+
+    if cfg.max_workers is not None and cfg.max_workers <= 1:
+        for seed, size in zip(seeds, sizes):
+            finished.append(_simulate_chunk(base, distributions, seed, size, cfg))
+            yield update()
+        return
+
+    with ProcessPoolExecutor(max_workers=cfg.max_workers) as pool:
+        futures = [
+            pool.submit(_simulate_chunk, base, distributions, seed, size, cfg)
+            for seed, size in zip(seeds, sizes)
+        ]
+        for future in as_completed(futures):
+            finished.append(future.result())
+            yield update()
+
+
+def run_monte_carlo(
+    base: PlantConfig,
+    distributions: Sequence[ParameterDistribution],
+    cfg: MonteCarloConfig | None = None,
+) -> MonteCarloUpdate:
+    """Run the study to completion and return the final bands."""
+    result = None
+    for result in iter_monte_carlo(base, distributions, cfg):
+        pass
+    return result
+
+
+if __name__ == "__main__":
+    distributions = [
+        ParameterDistribution("electrodes.amp_hours_limit", "normal", (1.0e6, 1.0e5)),
+        ParameterDistribution("electrodes.efficiency_at_end_of_life", "uniform", (0.70, 0.80)),
+        ParameterDistribution("electrical.cell_resistance_ohm", "lognormal", (np.log(1.0e-4), 0.2)),
+        ParameterDistribution("power_cost_per_kwh", "triangular", (0.08, 0.12, 0.20)),
+        ParameterDistribution("sodium_price_per_kg", "normal", (3.5, 0.3)),
+    ]
+    mc = MonteCarloConfig(n_samples=20_000, chunk_size=2_500, total_hours=24.0 * 7)
+    for update in iter_monte_carlo(PlantConfig(), distributions, mc):
+        median_na = update.bands["cumulative_na_kg"][mc.percentiles.index(50.0), -1]
+        print(f"{update.samples_done:6d} samples | median Na after {update.times_hours[-1]:.0f} h: {median_na:,.1f} kg")
+    p5, p95 = update.bands["cumulative_margin"][[0, -1], -1]
+    print(f"Margin 5-95%: ${p5:,.0f} .. ${p95:,.0f}")
+    print(f"Reaching maintenance: {update.fraction_reaching_maintenance:.1%}")
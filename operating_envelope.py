@@ -0,0 +1,240 @@
+"""Operating envelope: the electrical model tabulated over current and resistance.
+
+Over a run the requested current and the (wear-dependent) cell resistance
+stay in a bounded 2D domain. `OperatingEnvelope` evaluates the electrical
+model once on a (requested current x cell resistance) grid and answers
+later queries by bilinear interpolation. The same tables, with the region
+of each grid point and the analytic limit boundaries, form the operating map
+served to the UI.
+
+The current axis contains, besides a uniform grid, every regime boundary
+(`electrical_model.regime_breakpoints`) of every grid resistance, so each
+grid column is split exactly where a limit starts to bind. Interpolation is
+used only inside cells whose four corners lie in the same region; queries in
+cells crossed by a boundary, or outside the table, are evaluated exactly.
+
+Envelopes are cached per config (by value), so repeated requests for the
+same plant reuse one table. For the linear cell model in `electrical_model`
+the closed form is itself only a few array operations and remains faster
+than a lookup, so the plant keeps evaluating it directly; the table is for
+the operating map and for costlier models with the same interface.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+from dataclasses import astuple
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from electrical_model import (
+    CONSTRAINT_REASONS,
+    ElectricalConfig,
+    ElectricalStateArray,
+    compute_electrical_state_array,
+    regime_breakpoints,
+    unclipped_voltage_coefficients,
+)
+
+# Interpolated columns of `ElectricalStateArray`.
+_FIELDS = ("actual_current_a", "cell_voltage_v", "dc_power_kw", "ac_power_kw")
+
+
+class OperatingEnvelope:
+    """Electrical state on a (requested current x cell resistance) grid."""
+
+    def __init__(
+        self,
+        config: ElectricalConfig,
+        resistance_range_ohm: Tuple[float, float] | None = None,
+        max_current_a: float | None = None,
+        n_current: int = 257,
+        n_resistance: int = 33,
+    ) -> None:
+        self.config = config
+        if resistance_range_ohm is None:
+            # Fresh electrodes up to the default end-of-life multiplier.
+            resistance_range_ohm = (config.cell_resistance_ohm, 2.0 * config.cell_resistance_ohm)
+        r_lo, r_hi = (float(r) for r in resistance_range_ohm)
+        if r_hi < r_lo:
+            raise ValueError("resistance range must not be decreasing")
+        if r_hi == r_lo:
+            # No resistance growth: a sliver around the single resistance.
+            r_hi = r_lo + 1e-6 * max(abs(r_lo), 1e-12)
+        i_hi = float(config.max_dc_current_a if max_current_a is None else max_current_a)
+        if not i_hi > 0:
+            raise ValueError("max_current_a must be positive")
+
+        self.resistance_ohm = np.linspace(r_lo, r_hi, max(int(n_resistance), 2))
+        points = regime_breakpoints(config, self.resistance_ohm).ravel()
+        points = points[np.isfinite(points) & (points > 0.0) & (points < i_hi)]
+        self.requested_current_a = np.unique(np.concatenate((np.linspace(0.0, i_hi, max(int(n_current), 2)), points)))
+
+        # Bucket index over a uniform grid of the current axis: the first
+        # node of each bucket, so a lookup needs no binary search.
+        ii = self.requested_current_a
+        self._bucket_width = i_hi / (4 * (ii.size - 1))
+        self._bucket_node = np.searchsorted(ii, self._bucket_width * np.arange(4 * (ii.size - 1) + 1), side="right") - 1
+        self._max_nodes_per_bucket = int(np.max(np.diff(self._bucket_node), initial=0))
+
+        elec = compute_electrical_state_array(
+            self.requested_current_a[:, None], config, effective_cell_resistance_ohm=self.resistance_ohm[None, :]
+        )
+        self.tables = {name: getattr(elec, name) for name in _FIELDS}
+        self.constraint_code = elec.constraint_code
+
+        # Per cell: bilinear coefficients of every field, c0 + c1*ti + c2*tr + c3*ti*tr
+        # (flattened cell index i * (n_resistance - 1) + j), and whether all
+        # four corners share one region.
+        stacked = np.stack([self.tables[name] for name in _FIELDS], axis=-1)
+        f00, f10, f01, f11 = stacked[:-1, :-1], stacked[1:, :-1], stacked[:-1, 1:], stacked[1:, 1:]
+        coefficients = np.stack((f00, f10 - f00, f01 - f00, f11 - f10 - f01 + f00), axis=-1)
+        coefficients = coefficients.reshape(-1, len(_FIELDS), 4)
+        # One contiguous array per field and coefficient: gathers from them
+        # are much cheaper than strided slices of one (cells, 4, 4) gather.
+        self._coefficients = [[np.ascontiguousarray(coefficients[:, k, m]) for m in range(4)] for k in range(len(_FIELDS))]
+        region = self._regions(self.requested_current_a[:, None], self.resistance_ohm[None, :], elec)
+        corner = region[:-1, :-1]
+        self._single_region = (
+            (corner == region[1:, :-1]) & (corner == region[:-1, 1:]) & (corner == region[1:, 1:])
+        ).ravel()
+        self._cell_code = elec.constraint_code[:-1, :-1].ravel()
+
+    @classmethod
+    def for_plant(cls, cfg: Any, **kwargs: Any) -> "OperatingEnvelope":
+        """Envelope over a plant's electrode life (`cfg` is a `PlantConfig`)."""
+        r = cfg.electrical.cell_resistance_ohm
+        end = cfg.electrodes.resistance_multiplier_at_end_of_life
+        return operating_envelope(cfg.electrical, (r * min(1.0, end), r * max(1.0, end)), **kwargs)
+
+    def _regions(self, requested: np.ndarray, resistance: np.ndarray, elec: ElectricalStateArray) -> np.ndarray:
+        """Constraint code refined by the voltage clip side (low/high), as one id."""
+        cfg = self.config
+        slope, v0 = unclipped_voltage_coefficients(cfg, resistance)
+        v = v0 + slope * np.minimum(requested, cfg.max_dc_current_a)
+        clip = np.where(v < cfg.min_cell_voltage_v, 1, np.where(v > cfg.max_cell_voltage_v, 2, 0))
+        return elec.constraint_code.astype(np.int64) * 3 + clip
+
+    # ------------------------------------------------------------------ #
+    # Lookup
+    # ------------------------------------------------------------------ #
+    def lookup(
+        self,
+        requested_current_a: np.ndarray | float,
+        effective_cell_resistance_ohm: np.ndarray | float | None = None,
+    ) -> ElectricalStateArray:
+        """
+        `compute_electrical_state_array` by table lookup: bilinear inside
+        single-region cells, exact where the query is outside the table or
+        shares a cell with a limit boundary. Regions are always exact.
+        """
+        r = self.config.cell_resistance_ohm if effective_cell_resistance_ohm is None else effective_cell_resistance_ohm
+        requested, resistance = np.broadcast_arrays(
+            np.asarray(requested_current_a, dtype=float), np.asarray(r, dtype=float)
+        )
+        shape = requested.shape
+        requested, resistance = requested.ravel(), resistance.ravel()
+        ii, rr = self.requested_current_a, self.resistance_ohm
+        n_r = rr.size - 1
+        bucket = np.clip((requested / self._bucket_width).astype(np.int64), 0, self._bucket_node.size - 1)
+        i = np.minimum(self._bucket_node[bucket], ii.size - 2)
+        for _ in range(self._max_nodes_per_bucket):
+            i += (requested >= ii[i + 1]) & (i < ii.size - 2)
+        # The resistance axis is uniform: index by arithmetic.
+        r_step = (rr[-1] - rr[0]) / n_r
+        tr = (resistance - rr[0]) / r_step
+        j = np.clip(tr.astype(np.int64), 0, n_r - 1)
+        tr -= j
+        ti = (requested - ii[i]) / (ii[i + 1] - ii[i])
+        cell = i * n_r + j
+
+        inside = (requested >= ii[0]) & (requested <= ii[-1]) & (resistance >= rr[0]) & (resistance <= rr[-1])
+        uniform = inside & self._single_region[cell]
+        values = {}
+        for name, (c0, c1, c2, c3) in zip(_FIELDS, self._coefficients):
+            values[name] = c0[cell] + c1[cell] * ti + (c2[cell] + c3[cell] * ti) * tr
+        code = self._cell_code[cell]
+
+        exact = ~uniform
+        if exact.any():
+            elec = compute_electrical_state_array(requested[exact], self.config, resistance[exact])
+            for name in _FIELDS:
+                values[name][exact] = getattr(elec, name)
+            code[exact] = elec.constraint_code
+
+        code = code.reshape(shape)
+        return ElectricalStateArray(
+            requested_current_a=requested.reshape(shape),
+            constraint_code=code,
+            constrained=code != 0,
+            **{name: value.reshape(shape) for name, value in values.items()},
+        )
+
+    # ------------------------------------------------------------------ #
+    # Operating map
+    # ------------------------------------------------------------------ #
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-ready operating map: grid axes, tables, regions and boundaries."""
+
+        def finite(values: np.ndarray) -> Any:
+            # Missing boundaries come back as NaN or inf, which JSON cannot carry.
+            return [v if math.isfinite(v) else None for v in values.tolist()]
+
+        boundaries = regime_breakpoints(self.config, self.resistance_ohm)
+        names = ("current_limit", "min_voltage", "power_at_min_voltage", "max_voltage", "power_at_max_voltage", "power")
+        return {
+            "requested_current_a": self.requested_current_a.tolist(),
+            "resistance_ohm": self.resistance_ohm.tolist(),
+            **{name: table.tolist() for name, table in self.tables.items()},
+            "constraint_code": self.constraint_code.tolist(),
+            "constraint_reasons": list(CONSTRAINT_REASONS),
+            "boundaries_a": {name: finite(boundaries[:, k]) for k, name in enumerate(names)},
+        }
+
+
+def operating_envelope(
+    config: ElectricalConfig,
+    resistance_range_ohm: Tuple[float, float] | None = None,
+    max_current_a: float | None = None,
+    n_current: int = 257,
+    n_resistance: int = 33,
+) -> OperatingEnvelope:
+    """Cached `OperatingEnvelope`; configs equal in value share one table."""
+    key = astuple(config)
+    return _cached_envelope(key, resistance_range_ohm, max_current_a, n_current, n_resistance)
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_envelope(
+    key: Tuple[float, ...],
+    resistance_range_ohm: Tuple[float, float] | None,
+    max_current_a: float | None,
+    n_current: int,
+    n_resistance: int,
+) -> OperatingEnvelope:
+    return OperatingEnvelope(ElectricalConfig(*key), resistance_range_ohm, max_current_a, n_current, n_resistance)
+
+
+if __name__ == "__main__":
+    import time
+
+    from plant_model import PlantConfig
+
+    cfg = PlantConfig()
+    envelope = OperatingEnvelope.for_plant(cfg)
+    print(f"Grid: {envelope.requested_current_a.size} currents x {envelope.resistance_ohm.size} resistances")
+
+    rng = np.random.default_rng(0)
+    currents = rng.uniform(0.0, cfg.electrical.max_dc_current_a, 1_000_000)
+    resistance = cfg.electrical.cell_resistance_ohm * rng.uniform(1.0, 2.0, currents.size)
+    t0 = time.perf_counter()
+    table = envelope.lookup(currents, resistance)
+    t1 = time.perf_counter()
+    exact = compute_electrical_state_array(currents, cfg.electrical, resistance)
+    t2 = time.perf_counter()
+    error = np.max(np.abs(table.dc_power_kw - exact.dc_power_kw) / np.maximum(exact.dc_power_kw, 1e-9))
+    print(f"Lookup {t1 - t0:.3f} s vs exact {t2 - t1:.3f} s for 1e6 points; max relative DC power error {error:.2e}")
+    print(f"Regions identical: {np.array_equal(table.constraint_code, exact.constraint_code)}")
+    assert operating_envelope(cfg.electrical) is operating_envelope(PlantConfig().electrical)
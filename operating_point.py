@@ -0,0 +1,220 @@
+"""Operating-point optimisation: the requested current that maximises margin.
+
+Two objectives are supported, both evaluated for all candidate currents at
+once with the array electrical and electrode models:
+
+- `optimize_margin_rate`: instantaneous margin per hour at a given electrode
+  wear state,
+- `optimize_electrode_cycle`: average margin per hour over a whole electrode
+  life at constant requested current, including the maintenance outage and
+  optionally the choice of when to replace the electrodes.
+
+Margin per hour is piecewise in the requested current: a concave quadratic
+while no limit binds (revenue is linear in current, cost goes with I * V and
+V is linear in I), linear while a voltage limit clips V, and flat once the
+current or power limit binds. The maximum of each piece is at its
+stationary point or an end, so the candidate grid is augmented with those
+points (computed analytically) and the optimum over the candidates is the
+true optimum, not just the best grid point.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict
+
+import numpy as np
+
+from electrical_model import (
+    CONSTRAINT_REASONS,
+    compute_electrical_state_array,
+    regime_breakpoints,
+    unclipped_voltage_coefficients,
+)
+from electrode_model import effective_efficiency_array, effective_resistance_multiplier_array
+from plant_model import PlantConfig
+from sodium_logic import FARADAY_CONSTANT, MOLAR_MASS_SODIUM, VALENCY
+from wear_segments import maintenance_amp_hours
+
+# Theoretical Na (kg) per amp-hour at 100 % efficiency.
+KG_NA_PER_AMP_HOUR = 3600.0 * MOLAR_MASS_SODIUM / (VALENCY * FARADAY_CONSTANT) / 1000.0
+
+
+@dataclass
+class OperatingOptimum:
+    """Best instantaneous operating point and the full trade-off curve."""
+
+    requested_current_a: float
+    actual_current_a: float
+    cell_voltage_v: float
+    margin_per_hour: float
+    constraint_reason: str
+    # One entry per candidate requested current, sorted by current.
+    curve: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
+@dataclass
+class CycleOptimum:
+    """Best constant current (and replacement point) over one electrode life."""
+
+    requested_current_a: float
+    replacement_amp_hours: float
+    margin_per_hour: float  # averaged over the cycle, outage included
+    margin_per_cycle: float
+    cycle_hours: float
+    # One entry per candidate requested current, at its best replacement point.
+    curve: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
+def _revenue_per_amp_hour(cfg: PlantConfig, efficiency: np.ndarray) -> np.ndarray:
+    f_collected = cfg.compile().f_collected
+    return KG_NA_PER_AMP_HOUR * efficiency * f_collected * cfg.sodium_price_per_kg
+
+
+def candidate_currents(
+    cfg: PlantConfig,
+    resistance_ohm: np.ndarray | float,
+    revenue_per_amp_hour: np.ndarray | float,
+    n_points: int = 1001,
+) -> np.ndarray:
+    """
+    Requested-current candidates: a uniform grid on [0, max_dc_current_a]
+    plus every regime boundary and unconstrained stationary point for the
+    given cell resistances and revenues per amp-hour.
+    """
+    ecfg = cfg.electrical
+    i_max = ecfg.max_dc_current_a
+    r = np.atleast_1d(np.asarray(resistance_ohm, dtype=float))
+    a = np.atleast_1d(np.asarray(revenue_per_amp_hour, dtype=float))
+    slope, v0 = unclipped_voltage_coefficients(ecfg, r)
+
+    points = [np.linspace(0.0, i_max, n_points), [i_max], regime_breakpoints(ecfg, r)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Stationary point of a * I - price * I * (v0 + slope * I) / 1000
+        if cfg.power_cost_per_kwh > 0:
+            points.append(((1000.0 * a[:, None] / cfg.power_cost_per_kwh - v0) / (2.0 * slope[None, :])).ravel())
+
+    ii = np.concatenate([np.ravel(p) for p in points])
+    ii = ii[np.isfinite(ii)]
+    return np.unique(np.clip(ii, 0.0, i_max))
+
+
+def optimize_margin_rate(
+    cfg: PlantConfig | None = None,
+    cumulative_amp_hours: float = 0.0,
+    n_points: int = 1001,
+) -> OperatingOptimum:
+    """Requested current maximising margin per hour at the given electrode wear."""
+    cfg = cfg or PlantConfig()
+    ecfg = cfg.electrical
+    ah = np.asarray(cumulative_amp_hours, dtype=float)
+    resistance = ecfg.cell_resistance_ohm * effective_resistance_multiplier_array(ah, cfg.electrodes)
+    revenue_per_ah = _revenue_per_amp_hour(cfg, effective_efficiency_array(ah, cfg.electrodes))
+
+    currents = candidate_currents(cfg, resistance, revenue_per_ah, n_points)
+    elec = compute_electrical_state_array(currents, ecfg, effective_cell_resistance_ohm=resistance)
+    revenue = revenue_per_ah * elec.actual_current_a
+    cost = elec.dc_power_kw * cfg.power_cost_per_kwh
+    margin = revenue - cost
+
+    # argmax keeps the lowest requested current among equal margins
+    # (past the power limit the extra request buys nothing).
+    best = int(np.argmax(margin))
+    return OperatingOptimum(
+        requested_current_a=float(currents[best]),
+        actual_current_a=float(elec.actual_current_a[best]),
+        cell_voltage_v=float(elec.cell_voltage_v[best]),
+        margin_per_hour=float(margin[best]),
+        constraint_reason=CONSTRAINT_REASONS[elec.constraint_code[best]],
+        curve={
+            "requested_current_a": currents,
+            "actual_current_a": elec.actual_current_a,
+            "cell_voltage_v": elec.cell_voltage_v,
+            "ac_power_kw": elec.ac_power_kw,
+            "constraint_code": elec.constraint_code,
+            "revenue_per_hour": revenue,
+            "cost_per_hour": cost,
+            "margin_per_hour": margin,
+        },
+    )
+
+
+def optimize_electrode_cycle(
+    cfg: PlantConfig | None = None,
+    outage_hours: float = 72.0,
+    replacement_cost: float = 0.0,
+    optimize_replacement: bool = False,
+    n_points: int = 1001,
+    n_life_points: int = 201,
+) -> CycleOptimum:
+    """
+    Constant requested current maximising average margin per hour over an
+    electrode life (fresh electrodes to replacement, plus `outage_hours`).
+
+    Electrodes are replaced at the configured maintenance threshold, or, with
+    `optimize_replacement`, at the best of `n_life_points` wear levels up to
+    `amp_hours_limit`. Integrals over the life use the trapezoid rule on
+    those wear levels, which is exact between regime switches.
+    """
+    cfg = cfg or PlantConfig()
+    ecfg, electrodes = cfg.electrical, cfg.electrodes
+    end_ah = electrodes.amp_hours_limit if optimize_replacement else maintenance_amp_hours(cfg)
+    if not np.isfinite(end_ah) or end_ah <= 0:
+        raise ValueError("electrode life must be finite and positive to optimise a cycle")
+
+    ah = np.linspace(0.0, end_ah, n_life_points)
+    resistance = ecfg.cell_resistance_ohm * effective_resistance_multiplier_array(ah, electrodes)
+    revenue_per_ah = _revenue_per_amp_hour(cfg, effective_efficiency_array(ah, electrodes))
+
+    # Breakpoints move with wear; take them at both ends of the life.
+    currents = candidate_currents(cfg, resistance[[0, -1]], revenue_per_ah[[0, -1]], n_points)
+    currents = currents[currents > 0]
+    elec = compute_electrical_state_array(currents[:, None], ecfg, effective_cell_resistance_ohm=resistance[None, :])
+
+    # Integrands per amp-hour, shape (currents, wear levels).
+    margin_per_ah = revenue_per_ah[None, :] - elec.cell_voltage_v / 1000.0 * cfg.power_cost_per_kwh
+    with np.errstate(divide="ignore"):
+        hours_per_ah = 1.0 / elec.actual_current_a
+    d_ah = np.diff(ah)
+    cum_margin = np.cumsum(0.5 * (margin_per_ah[:, 1:] + margin_per_ah[:, :-1]) * d_ah, axis=1)
+    cum_hours = np.cumsum(0.5 * (hours_per_ah[:, 1:] + hours_per_ah[:, :-1]) * d_ah, axis=1)
+
+    rate = (cum_margin - replacement_cost) / (cum_hours + outage_hours)
+    if optimize_replacement:
+        best_end = np.argmax(rate, axis=1)
+    else:
+        best_end = np.full(currents.size, ah.size - 2)
+    rows = np.arange(currents.size)
+    curve = {
+        "requested_current_a": currents,
+        "replacement_amp_hours": ah[best_end + 1],
+        "margin_per_hour": rate[rows, best_end],
+        "margin_per_cycle": cum_margin[rows, best_end] - replacement_cost,
+        "cycle_hours": cum_hours[rows, best_end] + outage_hours,
+    }
+
+    best = int(np.argmax(curve["margin_per_hour"]))
+    return CycleOptimum(
+        requested_current_a=float(currents[best]),
+        replacement_amp_hours=float(curve["replacement_amp_hours"][best]),
+        margin_per_hour=float(curve["margin_per_hour"][best]),
+        margin_per_cycle=float(curve["margin_per_cycle"][best]),
+        cycle_hours=float(curve["cycle_hours"][best]),
+        curve=curve,
+    )
+
+
+if __name__ == "__main__":
+    cfg = PlantConfig()
+    point = optimize_margin_rate(cfg)
+    print(
+        f"Best instantaneous: request {point.requested_current_a:,.0f} A -> "
+        f"{point.actual_current_a:,.0f} A at {point.cell_voltage_v:.2f} V "
+        f"({point.constraint_reason}), margin ${point.margin_per_hour:,.2f}/h"
+    )
+    cycle = optimize_electrode_cycle(cfg, outage_hours=24.0, replacement_cost=500.0, optimize_replacement=True)
+    print(
+        f"Best cycle: request {cycle.requested_current_a:,.0f} A, replace at "
+        f"{cycle.replacement_amp_hours:,.0f} Ah, {cycle.cycle_hours:,.0f} h/cycle, "
+        f"margin ${cycle.margin_per_hour:,.2f}/h"
+    )
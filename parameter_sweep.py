@@ -0,0 +1,260 @@
+"""Design-of-experiments sweeps over `Scenario` and `PlantConfig` fields.
+
+A design is a dict mapping dotted field paths to equally long value arrays,
+one entry per point:
+
+- ``scenario.<field>`` sets a `process_mvp.Scenario` field (current, horizon, dt;
+  a base scenario with a `schedule` runs it instead of the constant current),
+- any other path sets a `PlantConfig` field, e.g. ``electrical.max_power_kw``
+  or ``power_cost_per_kwh``.
+
+Designs come from `grid_design` (full factorial), `latin_hypercube_design` or
+`sobol_design`. `run_sweep` evaluates every point in a process pool and
+caches each point's summary on disk under a hash of the compiled
+`PlantKernel` plus the scenario, so re-running a sweep with an added axis or
+level only computes the new points. The result is one columnar table.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from plant_ensemble import replace_path
+from plant_model import PlantConfig, SodiumPlant, StepRecord
+from process_mvp import Scenario
+
+# Bump when the summary definition changes, to invalidate old cache entries.
+_CACHE_VERSION = 2
+
+SUMMARY_FIELDS = (
+    "total_na_kg",
+    "total_naoh_kg",
+    "total_revenue",
+    "total_cost",
+    "total_margin",
+    "margin_per_hour",
+    "ac_energy_kwh",
+    "final_amp_hours",
+    "hours_to_maintenance",
+    "constrained_fraction",
+)
+
+
+# ---------------------------------------------------------------------- #
+# Designs
+# ---------------------------------------------------------------------- #
+def grid_design(axes: Mapping[str, Sequence[float]]) -> Dict[str, np.ndarray]:
+    """Full factorial design over the given levels of each axis."""
+    names = list(axes)
+    points = list(itertools.product(*(axes[name] for name in names)))
+    return {name: np.array([p[i] for p in points]) for i, name in enumerate(names)}
+
+
+def latin_hypercube_design(
+    bounds: Mapping[str, Tuple[float, float]], n_points: int, seed: int = 0
+) -> Dict[str, np.ndarray]:
+    """Latin hypercube sample of `n_points` within (low, high) bounds per axis."""
+    rng = np.random.default_rng(seed)
+    design = {}
+    for name, (low, high) in bounds.items():
+        strata = (rng.permutation(n_points) + rng.random(n_points)) / n_points
+        design[name] = low + strata * (high - low)
+    return design
+
+
+def sobol_design(bounds: Mapping[str, Tuple[float, float]], n_points: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Scrambled Sobol sample within (low, high) bounds per axis (requires scipy)."""
+    try:
+        from scipy.stats import qmc
+    except ImportError as exc:
+        raise ImportError("sobol_design requires scipy") from exc
+
+    names = list(bounds)
+    unit = qmc.Sobol(d=len(names), scramble=True, seed=seed).random(n_points)
+    return {
+        name: bounds[name][0] + unit[:, i] * (bounds[name][1] - bounds[name][0])
+        for i, name in enumerate(names)
+    }
+
+
+# ---------------------------------------------------------------------- #
+# Point evaluation
+# ---------------------------------------------------------------------- #
+def point_inputs(
+    design: Mapping[str, np.ndarray],
+    index: int,
+    base_scenario: Scenario,
+    base_config: PlantConfig,
+) -> Tuple[Scenario, PlantConfig]:
+    """Scenario and config of one design point."""
+    scenario, cfg = base_scenario, base_config
+    for path, values in design.items():
+        value = values[index]
+        parts = path.split(".")
+        if parts[0] == "scenario":
+            name = parts[1]
+            scenario = replace(scenario, **{name: type(getattr(scenario, name))(value)})
+        else:
+            cfg = replace_path(cfg, parts, float(value))
+    return scenario, cfg
+
+
+def _scenario_fields(scenario: Scenario) -> Dict[str, object]:
+    """JSON-safe scenario fields, with a schedule as its compiled breakpoints."""
+    fields = asdict(replace(scenario, schedule=None))
+    schedule = scenario.schedule
+    if schedule is not None:
+        fields["schedule"] = {
+            "knots": schedule.knots.tolist(),
+            "values": schedule.values.tolist(),
+            "slopes": schedule.slopes.tolist(),
+            "repeat_hours": schedule.repeat_hours,
+        }
+    return fields
+
+
+def cache_key(scenario: Scenario, cfg: PlantConfig) -> str:
+    """Hash of the compiled config and the scenario."""
+    text = json.dumps([_CACHE_VERSION, cfg.compile().digest(), _scenario_fields(scenario)], sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def evaluate_point(scenario: Scenario, cfg: PlantConfig) -> Dict[str, float]:
+    """Run one scenario on a fresh plant and summarise it."""
+    plant = SodiumPlant(cfg)
+    steps = int(scenario.total_hours / scenario.dt_hours)
+    dt = scenario.dt_hours
+    # A schedule overrides the constant current, as in `run_mvp`.
+    if scenario.schedule is None:
+        currents = np.full(steps, float(scenario.current_a))
+    else:
+        currents = scenario.schedule.step_currents(plant.state.time_hours, dt, steps)
+
+    if scenario.exact_wear:
+        record = StepRecord()
+        energy, constrained, last_producing = 0.0, 0, math.nan
+        for current_a in currents:
+            if not plant.step_into(float(current_a), dt, record, exact_wear=True) or record.in_maintenance:
+                continue
+            energy += record.ac_power_kw * dt
+            constrained += bool(record.constrained)
+            last_producing = record.time_hours
+    else:
+        columns = plant.run(currents, dt)
+        producing = ~columns["in_maintenance"]
+        energy = float(np.sum(columns["ac_power_kw"][producing]) * dt)
+        constrained = int(np.count_nonzero(columns["constrained"][producing] > 0))
+        last_producing = float(columns["time_hours"][producing][-1]) if producing.any() else math.nan
+
+    # A fresh plant never resets, so once in maintenance it entered it at
+    # the end of its last producing step.
+    maintenance_at = last_producing if plant.state.electrode_state.in_maintenance else math.nan
+
+    st = plant.state
+    hours = st.time_hours
+    margin = st.cumulative_revenue - st.cumulative_cost
+    return {
+        "total_na_kg": st.cumulative_na_produced_kg,
+        "total_naoh_kg": st.cumulative_naoh_kg,
+        "total_revenue": st.cumulative_revenue,
+        "total_cost": st.cumulative_cost,
+        "total_margin": margin,
+        "margin_per_hour": margin / hours if hours > 0 else 0.0,
+        "ac_energy_kwh": energy,
+        "final_amp_hours": st.electrode_state.cumulative_amp_hours,
+        "hours_to_maintenance": maintenance_at,
+        "constrained_fraction": constrained / steps if steps else 0.0,
+    }
+
+
+def _evaluate(inputs: Tuple[Scenario, PlantConfig]) -> Dict[str, float]:
+    return evaluate_point(*inputs)
+
+
+# ---------------------------------------------------------------------- #
+# Sweep runner
+# ---------------------------------------------------------------------- #
+def run_sweep(
+    design: Mapping[str, np.ndarray],
+    base_scenario: Scenario | None = None,
+    base_config: PlantConfig | None = None,
+    cache_dir: str | Path | None = ".sweep_cache",
+    max_workers: int | None = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every design point and return a columnar table.
+
+    Columns are the design axes, the `SUMMARY_FIELDS`, and a boolean
+    `cached` column. `cache_dir=None` disables the cache; `max_workers` of
+    0 or 1 evaluates in-process.
+    """
+    base_scenario = base_scenario or Scenario()
+    base_config = base_config or PlantConfig()
+    design = {name: np.asarray(values) for name, values in design.items()}
+    sizes = {values.size for values in design.values()}
+    if len(sizes) > 1:
+        raise ValueError("all design axes must have the same length")
+    n = sizes.pop() if sizes else 0
+
+    cache = Path(cache_dir) if cache_dir is not None else None
+    if cache is not None:
+        cache.mkdir(parents=True, exist_ok=True)
+
+    inputs = [point_inputs(design, i, base_scenario, base_config) for i in range(n)]
+    keys = [cache_key(*point) for point in inputs]
+    summaries: List[Dict[str, float] | None] = [None] * n
+    cached = np.zeros(n, dtype=bool)
+
+    if cache is not None:
+        for i, key in enumerate(keys):
+            path = cache / f"{key}.json"
+            if path.exists():
+                summaries[i] = json.loads(path.read_text())
+                cached[i] = True
+
+    todo = [i for i in range(n) if summaries[i] is None]
+    if max_workers is not None and max_workers <= 1:
+        computed = [_evaluate(inputs[i]) for i in todo]
+    else:
+        chunksize = max(1, len(todo) // (4 * (max_workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            computed = list(pool.map(_evaluate, (inputs[i] for i in todo), chunksize=chunksize))
+
+    for i, summary in zip(todo, computed):
+        summaries[i] = summary
+        if cache is not None:
+            (cache / f"{keys[i]}.json").write_text(json.dumps(summary))
+
+    table: Dict[str, np.ndarray] = dict(design)
+    for name in SUMMARY_FIELDS:
+        table[name] = np.array([s[name] for s in summaries], dtype=float)
+    table["cached"] = cached
+    return table
+
+
+if __name__ == "__main__":
+    design = grid_design(
+        {
+            "scenario.current_a": [20_000.0, 40_000.0, 60_000.0],
+            "electrical.max_power_kw": [200.0, 300.0],
+            "power_cost_per_kwh": [0.08, 0.12],
+        }
+    )
+    table = run_sweep(design, Scenario(total_hours=24.0 * 7), max_workers=1)
+    best = int(np.argmax(table["total_margin"]))
+    print(f"Points: {table['total_margin'].size}, cached: {int(table['cached'].sum())}")
+    print(
+        f"Best: I={table['scenario.current_a'][best]:,.0f} A, "
+        f"P_max={table['electrical.max_power_kw'][best]:.0f} kW, "
+        f"price={table['power_cost_per_kwh'][best]:.2f} -> margin ${table['total_margin'][best]:,.2f}"
+    )
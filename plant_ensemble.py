@@ -0,0 +1,249 @@
+"""Ensemble engine: many independent plants advanced together with NumPy.
+
+Each plant is one element of a set of parallel arrays (struct-of-arrays):
+configuration parameters, electrode wear, maintenance flags and cumulative
+totals. A single `step` call advances every plant with broadcasted array
+maths and gives, per plant, exactly the numbers `SodiumPlant.step` would.
+"""
+
+from __future__ import annotations
+
+from dataclasses import fields, is_dataclass, replace
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from electrical_model import compute_electrical_state_array
+from electrode_model import (
+    ElectrodeState,
+    effective_efficiency_array,
+    effective_resistance_multiplier_array,
+    remaining_life_fraction_array,
+)
+from plant_model import STEP_FIELDS, PlantConfig, PlantState, sodium_loss_fractions_array
+from sodium_logic import calculate_finances, calculate_sodium_production
+from thermal_model import relax_temperature_array
+
+
+def stack_configs(configs: Sequence[Any]) -> Any:
+    """
+    Stack a sequence of (possibly nested) config dataclasses into one.
+
+    The result has the same type as the inputs, with every numeric leaf
+    field replaced by a 1-D array holding one value per config.
+    """
+    first = configs[0]
+    values = {}
+    for f in fields(first):
+        items = [getattr(c, f.name) for c in configs]
+        if is_dataclass(items[0]):
+            values[f.name] = stack_configs(items)
+        else:
+            values[f.name] = np.asarray(items, dtype=float)
+    return replace(first, **values)
+
+
+def _broadcast_config(cfg: Any, size: int) -> Any:
+    """Broadcast every leaf field of a nested config to shape (size,)."""
+    values = {}
+    for f in fields(cfg):
+        value = getattr(cfg, f.name)
+        if is_dataclass(value):
+            values[f.name] = _broadcast_config(value, size)
+        else:
+            values[f.name] = np.broadcast_to(np.asarray(value, dtype=float), (size,))
+    return replace(cfg, **values)
+
+
+class PlantEnsemble:
+    """N independent `SodiumPlant`s held as parallel arrays."""
+
+    def __init__(self, cfg: PlantConfig, size: int) -> None:
+        """
+        `cfg` is a `PlantConfig` whose leaf fields may be scalars (shared by
+        all plants) or arrays of length `size` (one value per plant).
+        """
+        self.size = int(size)
+        self.cfg = _broadcast_config(cfg, self.size)
+
+        self.time_hours = np.zeros(self.size)
+        self.cumulative_amp_hours = np.zeros(self.size)
+        self.in_maintenance = np.zeros(self.size, dtype=bool)
+        self.cumulative_na_produced_kg = np.zeros(self.size)
+        self.cumulative_naoh_kg = np.zeros(self.size)
+        self.cumulative_cl2_kg = np.zeros(self.size)
+        self.cumulative_h2_kg = np.zeros(self.size)
+        self.cumulative_revenue = np.zeros(self.size)
+        self.cumulative_cost = np.zeros(self.size)
+        self.cell_temp_c = np.array(self.cfg.thermal.initial_temp_c, dtype=float)
+
+    @classmethod
+    def from_configs(cls, configs: Sequence[PlantConfig]) -> "PlantEnsemble":
+        """Build an ensemble with one plant per config."""
+        return cls(stack_configs(configs), len(configs))
+
+    @classmethod
+    def from_parameters(cls, base: PlantConfig, **overrides: np.ndarray) -> "PlantEnsemble":
+        """
+        Build an ensemble by varying selected fields of a base config.
+
+        Keys are dotted field paths, e.g.
+        `PlantEnsemble.from_parameters(PlantConfig(), **{"electrical.cell_resistance_ohm": r})`.
+        All override arrays must have the same length.
+        """
+        arrays = {key: np.asarray(value, dtype=float).ravel() for key, value in overrides.items()}
+        sizes = {a.size for a in arrays.values()}
+        if len(sizes) != 1:
+            raise ValueError("all overrides must have the same length")
+        cfg = base
+        for path, value in arrays.items():
+            cfg = replace_path(cfg, path.split("."), value)
+        return cls(cfg, sizes.pop())
+
+    # ------------------------------------------------------------------ #
+    # Core step logic
+    # ------------------------------------------------------------------ #
+    def step(self, requested_current_a: np.ndarray | float, dt_hours: float) -> Dict[str, np.ndarray]:
+        """
+        Advance every plant by dt_hours at its requested current.
+
+        Returns one array per key reported by `SodiumPlant.step`, plus an
+        `in_maintenance` column. Plants that were in maintenance at the start
+        of the step only advance time; their other fields are NaN.
+        """
+        if dt_hours <= 0:
+            return {}
+
+        cfg = self.cfg
+        requested = np.broadcast_to(np.asarray(requested_current_a, dtype=float), (self.size,))
+        active = ~self.in_maintenance
+
+        # 1) Electrical model with electrode-conditioned resistance
+        resistance_multiplier = effective_resistance_multiplier_array(self.cumulative_amp_hours, cfg.electrodes)
+        elec = compute_electrical_state_array(
+            requested,
+            cfg.electrical,
+            effective_cell_resistance_ohm=cfg.electrical.cell_resistance_ohm * resistance_multiplier,
+        )
+        actual = elec.actual_current_a
+
+        # 2) Electrode wear update (only for producing plants with positive current)
+        wearing = active & (actual > 0)
+        self.cumulative_amp_hours = np.where(
+            wearing, self.cumulative_amp_hours + actual * dt_hours, self.cumulative_amp_hours
+        )
+        life = remaining_life_fraction_array(self.cumulative_amp_hours, cfg.electrodes)
+        self.in_maintenance = self.in_maintenance | (
+            wearing & (life <= cfg.electrodes.min_life_fraction_for_operation)
+        )
+
+        # 3) Faraday-based theoretical Na production
+        eff = effective_efficiency_array(self.cumulative_amp_hours, cfg.electrodes)
+        na_theoretical_kg = calculate_sodium_production(amperes=actual, hours=dt_hours, efficiency=eff)
+
+        rs = cfg.reaction_stoich
+        na_theoretical_mol = np.maximum(0.0, na_theoretical_kg * 1000.0 / rs.molar_mass_na)
+        naoh_kg = na_theoretical_mol * 1.0 * rs.molar_mass_naoh / 1000.0
+        cl2_kg = na_theoretical_mol * 0.5 * rs.molar_mass_cl2 / 1000.0
+        h2_kg = na_theoretical_mol * 0.5 * rs.molar_mass_h2 / 1000.0
+
+        # 4) Losses at each plant's cell temperature at the start of the step
+        f_collected, f_recombined, f_evap = sodium_loss_fractions_array(self.cell_temp_c, cfg.sodium_losses)
+        na_collected_kg = na_theoretical_kg * f_collected
+
+        # 5) Finance over this step
+        revenue, cost, margin = calculate_finances(
+            kg_produced=na_collected_kg,
+            power_kw=elec.dc_power_kw,
+            hours=dt_hours,
+            electricity_cost_per_kwh=cfg.power_cost_per_kwh,
+            sodium_price_per_kg=cfg.sodium_price_per_kg,
+        )
+
+        # 6) Cumulative updates, masked to producing plants
+        naoh_step = naoh_kg * f_collected
+        cl2_step = cl2_kg * f_collected
+        h2_step = h2_kg * f_collected
+        self.time_hours = self.time_hours + dt_hours
+        self.cumulative_na_produced_kg = np.where(active, self.cumulative_na_produced_kg + na_collected_kg, self.cumulative_na_produced_kg)
+        self.cumulative_naoh_kg = np.where(active, self.cumulative_naoh_kg + naoh_step, self.cumulative_naoh_kg)
+        self.cumulative_cl2_kg = np.where(active, self.cumulative_cl2_kg + cl2_step, self.cumulative_cl2_kg)
+        self.cumulative_h2_kg = np.where(active, self.cumulative_h2_kg + h2_step, self.cumulative_h2_kg)
+        self.cumulative_revenue = np.where(active, self.cumulative_revenue + revenue, self.cumulative_revenue)
+        self.cumulative_cost = np.where(active, self.cumulative_cost + cost, self.cumulative_cost)
+        self.cell_temp_c = relax_temperature_array(
+            self.cell_temp_c, np.where(active, elec.dc_power_kw, 0.0), dt_hours, cfg.thermal
+        )
+
+        # 7) Columnar snapshot; plants that were in maintenance report NaN.
+        columns = {
+            "requested_current_a": requested,
+            "actual_current_a": actual,
+            "cell_voltage_v": elec.cell_voltage_v,
+            "dc_power_kw": elec.dc_power_kw,
+            "ac_power_kw": elec.ac_power_kw,
+            "constrained": elec.constrained.astype(float),
+            "na_theoretical_kg": na_theoretical_kg,
+            "na_collected_kg": na_collected_kg,
+            "na_recombined_kg": na_theoretical_kg * f_recombined,
+            "na_evap_kg": na_theoretical_kg * f_evap,
+            "naoh_step_kg": naoh_step,
+            "cl2_step_kg": cl2_step,
+            "h2_step_kg": h2_step,
+            "step_revenue": revenue,
+            "step_cost": cost,
+            "step_margin": margin,
+            "cumulative_na_kg": self.cumulative_na_produced_kg,
+            "cumulative_naoh_kg": self.cumulative_naoh_kg,
+            "cumulative_cl2_kg": self.cumulative_cl2_kg,
+            "cumulative_h2_kg": self.cumulative_h2_kg,
+            "cumulative_revenue": self.cumulative_revenue,
+            "cumulative_cost": self.cumulative_cost,
+            "cell_temp_c": self.cell_temp_c,
+        }
+        result = {"time_hours": self.time_hours}
+        for key in STEP_FIELDS[1:]:
+            result[key] = np.where(active, columns[key], np.nan)
+        result["in_maintenance"] = ~active
+        return result
+
+    # ------------------------------------------------------------------ #
+    # Per-plant access
+    # ------------------------------------------------------------------ #
+    def plant_state(self, index: int) -> PlantState:
+        """Return the state of one plant as a regular `PlantState`."""
+        return PlantState(
+            time_hours=float(self.time_hours[index]),
+            electrode_state=ElectrodeState(
+                cumulative_amp_hours=float(self.cumulative_amp_hours[index]),
+                in_maintenance=bool(self.in_maintenance[index]),
+            ),
+            cumulative_na_produced_kg=float(self.cumulative_na_produced_kg[index]),
+            cumulative_naoh_kg=float(self.cumulative_naoh_kg[index]),
+            cumulative_cl2_kg=float(self.cumulative_cl2_kg[index]),
+            cumulative_h2_kg=float(self.cumulative_h2_kg[index]),
+            cumulative_revenue=float(self.cumulative_revenue[index]),
+            cumulative_cost=float(self.cumulative_cost[index]),
+            cell_temp_c=float(self.cell_temp_c[index]),
+        )
+
+
+def replace_path(cfg: Any, path: Sequence[str], value: Any) -> Any:
+    """Return a copy of a nested config with the field at `path` replaced."""
+    name = path[0]
+    if len(path) == 1:
+        if name not in {f.name for f in fields(cfg)}:
+            raise ValueError(f"unknown config field: {name}")
+        return replace(cfg, **{name: value})
+    return replace(cfg, **{name: replace_path(getattr(cfg, name), path[1:], value)})
+
+
+if __name__ == "__main__":
+    resistances = np.linspace(0.5e-4, 3.0e-4, 10_000)
+    ensemble = PlantEnsemble.from_parameters(PlantConfig(), **{"electrical.cell_resistance_ohm": resistances})
+    for _ in range(24):
+        ensemble.step(requested_current_a=60_000.0, dt_hours=1.0)
+    best = int(np.argmax(ensemble.cumulative_revenue - ensemble.cumulative_cost))
+    print(f"Plants: {ensemble.size}")
+    print(f"Best resistance: {resistances[best]:.2e} ohm")
+    print(f"Best 24 h margin: ${ensemble.cumulative_revenue[best] - ensemble.cumulative_cost[best]:,.2f}")
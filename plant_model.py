@@ -7,14 +7,81 @@ required at runtime; visualisation is handled by the separate web front-end.
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, Tuple
-from electrical_model import ElectricalConfig, ElectricalState, compute_electrical_state
-from electrode_model import ElectrodeConfig, ElectrodeState
-from sodium_logic import calculate_finances, calculate_sodium_production
+import copy
+import hashlib
+import itertools
+import math
+import operator
+import struct
+from dataclasses import dataclass, field, fields, replace
+from typing import TYPE_CHECKING, Callable, Dict, Literal, Tuple
 
+import numpy as np
 
-@dataclass
+from electrical_model import (
+    ElectricalConfig,
+    ElectricalStateArray,
+    REASON_CURRENT_LIMIT,
+    REASON_NONE,
+    REASON_POWER_LIMIT,
+    REASON_VOLTAGE_LIMIT,
+    compute_electrical_state_array,
+    current_for_power,
+)
+from electrode_model import (
+    ElectrodeConfig,
+    ElectrodeState,
+    effective_efficiency_array,
+    effective_resistance_multiplier_array,
+    remaining_life_fraction_array,
+)
+from sodium_logic import (
+    FARADAY_CONSTANT,
+    MOLAR_MASS_SODIUM,
+    VALENCY,
+    calculate_finances,
+    calculate_sodium_production,
+)
+from tariff import DemandMeter, Tariff
+from thermal_model import ThermalConfig, hours_to_temperature, relax_temperature
+from wear_segments import ConstantCurrentSegment, maintenance_amp_hours
+
+if TYPE_CHECKING:
+    from rectifier_dispatch import RectifierFleet
+    from setpoint_schedule import SetpointSchedule
+    from streaming_stats import StreamingStats
+
+
+# Keys reported by `SodiumPlant.step` for a producing step, in order.
+STEP_FIELDS = (
+    "time_hours",
+    "requested_current_a",
+    "actual_current_a",
+    "cell_voltage_v",
+    "dc_power_kw",
+    "ac_power_kw",
+    "constrained",
+    "na_theoretical_kg",
+    "na_collected_kg",
+    "na_recombined_kg",
+    "na_evap_kg",
+    "naoh_step_kg",
+    "cl2_step_kg",
+    "h2_step_kg",
+    "step_revenue",
+    "step_cost",
+    "step_margin",
+    "cumulative_na_kg",
+    "cumulative_naoh_kg",
+    "cumulative_cl2_kg",
+    "cumulative_h2_kg",
+    "cumulative_revenue",
+    "cumulative_cost",
+    "cell_temp_c",
+)
+
+
+@dataclass(frozen=True)
 class SodiumLossConfig:
     """Parameters controlling temperature-dependent sodium losses."""
 
@@ -28,7 +95,7 @@ class SodiumLossConfig:
     high_temp_c: float = 700.0
 
 
-@dataclass
+@dataclass(frozen=True)
 class ReactionStoichConfig:
     """
     Stoichiometry and molar masses for the global chlor-alkali reaction:
@@ -65,21 +132,43 @@ def sodium_loss_fractions(temp_c: float, cfg: SodiumLossConfig) -> Tuple[float,
     return f_collected, f_recombined, f_evap
 
 
-@dataclass
+def sodium_loss_fractions_array(temp_c: np.ndarray, cfg: SodiumLossConfig) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Array counterpart of `sodium_loss_fractions`; config fields may be arrays."""
+    temp_c = np.asarray(temp_c, dtype=float)
+    f_evap = np.where(
+        temp_c <= cfg.low_temp_c,
+        cfg.evap_loss_low_temp_fraction,
+        np.where(temp_c <= cfg.high_temp_c, cfg.evap_loss_mid_temp_fraction, cfg.evap_loss_high_temp_fraction),
+    )
+    f_recombined = np.broadcast_to(np.asarray(cfg.recombined_loss_fraction, dtype=float), f_evap.shape)
+    f_collected = np.maximum(0.0, 1.0 - f_recombined - f_evap)
+    return f_collected, f_recombined, f_evap
+
+
+@dataclass(frozen=True)
 class PlantConfig:
-    """Top-level configuration for the plant."""
+    """
+    Top-level configuration for the plant.
+
+    Frozen, like its sections: derive variants with `dataclasses.replace`.
+    """
 
     electrical: ElectricalConfig = field(default_factory=ElectricalConfig)
     electrodes: ElectrodeConfig = field(default_factory=ElectrodeConfig)
     sodium_losses: SodiumLossConfig = field(default_factory=SodiumLossConfig)
     reaction_stoich: ReactionStoichConfig = field(default_factory=ReactionStoichConfig)
+    thermal: ThermalConfig = field(default_factory=ThermalConfig)
 
     # Economic parameters for finance calculations
     power_cost_per_kwh: float = 0.12
     sodium_price_per_kg: float = 3.50
 
+    def compile(self) -> "PlantKernel":
+        """Validate and freeze this config into a hashable `PlantKernel`."""
+        return PlantKernel.from_config(self)
+
 
-@dataclass
+@dataclass(slots=True)
 class PlantState:
     """Dynamic state of the plant."""
 
@@ -91,6 +180,388 @@ class PlantState:
     cumulative_h2_kg: float = 0.0
     cumulative_revenue: float = 0.0
     cumulative_cost: float = 0.0
+    cell_temp_c: float = 600.0
+
+
+# --------------------------------------------------------------------------- #
+# Compact step results
+# --------------------------------------------------------------------------- #
+STEP_DTYPE = np.dtype([(key, np.float64) for key in STEP_FIELDS] + [("in_maintenance", np.bool_)])
+
+_MAINTENANCE_FIELDS = (np.nan,) * (len(STEP_FIELDS) - 1)
+
+
+class StepRecord:
+    """
+    Reusable, slotted holder for one step's results.
+
+    Written in place by `SodiumPlant.step_into`, so a loop can keep a single
+    record instead of building a dict per step. Besides the step fields it
+    carries `constraint_code`, the index of the step's `constraint_reason`
+    in `CONSTRAINT_REASONS`.
+    """
+
+    __slots__ = STEP_FIELDS + ("in_maintenance", "constraint_code")
+
+    def __init__(self) -> None:
+        for key in STEP_FIELDS:
+            setattr(self, key, np.nan)
+        self.in_maintenance = False
+        self.constraint_code = REASON_NONE
+
+    def load(self, values: Dict[str, float], constraint_code: int = REASON_NONE) -> None:
+        for key in STEP_FIELDS:
+            setattr(self, key, values[key])
+        self.in_maintenance = False
+        self.constraint_code = constraint_code
+
+    def load_row(self, columns: Dict[str, np.ndarray], index: int = -1) -> None:
+        """Load one row of the columns `SodiumPlant.run` returns."""
+        if columns["in_maintenance"][index]:
+            self.time_hours = float(columns["time_hours"][index])
+            self.in_maintenance = True
+        else:
+            self.load({key: float(columns[key][index]) for key in STEP_FIELDS})
+
+    def as_tuple(self) -> Tuple:
+        """Values in `STEP_DTYPE` field order; NaN for maintenance steps."""
+        if self.in_maintenance:
+            return (self.time_hours,) + _MAINTENANCE_FIELDS + (True,)
+        return (
+            self.time_hours,
+            self.requested_current_a,
+            self.actual_current_a,
+            self.cell_voltage_v,
+            self.dc_power_kw,
+            self.ac_power_kw,
+            self.constrained,
+            self.na_theoretical_kg,
+            self.na_collected_kg,
+            self.na_recombined_kg,
+            self.na_evap_kg,
+            self.naoh_step_kg,
+            self.cl2_step_kg,
+            self.h2_step_kg,
+            self.step_revenue,
+            self.step_cost,
+            self.step_margin,
+            self.cumulative_na_kg,
+            self.cumulative_naoh_kg,
+            self.cumulative_cl2_kg,
+            self.cumulative_h2_kg,
+            self.cumulative_revenue,
+            self.cumulative_cost,
+            self.cell_temp_c,
+            False,
+        )
+
+    def as_dict(self) -> Dict[str, float]:
+        """The dict `SodiumPlant.step` returns for this record."""
+        if self.in_maintenance:
+            return {
+                "time_hours": self.time_hours,
+                "status": "maintenance",
+            }
+        return {
+            "time_hours": self.time_hours,
+            "requested_current_a": self.requested_current_a,
+            "actual_current_a": self.actual_current_a,
+            "cell_voltage_v": self.cell_voltage_v,
+            "dc_power_kw": self.dc_power_kw,
+            "ac_power_kw": self.ac_power_kw,
+            "constrained": self.constrained,
+            "na_theoretical_kg": self.na_theoretical_kg,
+            "na_collected_kg": self.na_collected_kg,
+            "na_recombined_kg": self.na_recombined_kg,
+            "na_evap_kg": self.na_evap_kg,
+            "naoh_step_kg": self.naoh_step_kg,
+            "cl2_step_kg": self.cl2_step_kg,
+            "h2_step_kg": self.h2_step_kg,
+            "step_revenue": self.step_revenue,
+            "step_cost": self.step_cost,
+            "step_margin": self.step_margin,
+            "cumulative_na_kg": self.cumulative_na_kg,
+            "cumulative_naoh_kg": self.cumulative_naoh_kg,
+            "cumulative_cl2_kg": self.cumulative_cl2_kg,
+            "cumulative_h2_kg": self.cumulative_h2_kg,
+            "cumulative_revenue": self.cumulative_revenue,
+            "cumulative_cost": self.cumulative_cost,
+            "cell_temp_c": self.cell_temp_c,
+        }
+
+
+class StepBuffer:
+    """Preallocated structured array collecting `StepRecord`s row by row."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.data = np.zeros(max(1, capacity), dtype=STEP_DTYPE)
+        self.size = 0
+
+    def append(self, record: StepRecord) -> None:
+        if self.size == self.data.shape[0]:
+            self.data = np.resize(self.data, 2 * self.size)
+        self.data[self.size] = record.as_tuple()
+        self.size += 1
+
+    def clear(self) -> None:
+        self.size = 0
+
+    def view(self) -> np.ndarray:
+        """Structured array of the rows written so far (no copy)."""
+        return self.data[: self.size]
+
+
+# --------------------------------------------------------------------------- #
+# Compiled configuration
+# --------------------------------------------------------------------------- #
+# (section of PlantConfig, field name) for every config value a kernel holds;
+# kernel fields carry the same names.
+_KERNEL_CONFIG_FIELDS = tuple(
+    (section, f.name)
+    for section, cls in (
+        ("electrical", ElectricalConfig),
+        ("electrodes", ElectrodeConfig),
+        ("reaction_stoich", ReactionStoichConfig),
+        ("sodium_losses", SodiumLossConfig),
+        ("thermal", ThermalConfig),
+    )
+    for f in fields(cls)
+) + ((None, "power_cost_per_kwh"), (None, "sodium_price_per_kg"))
+
+
+@dataclass(frozen=True)
+class PlantKernel:
+    """
+    Frozen, validated snapshot of a `PlantConfig` with derived constants.
+
+    Produced by `PlantConfig.compile()`. Being hashable, it doubles as a
+    cache key for anything computed from a config, and `digest()` gives a
+    stable string form for on-disk caches. `step_into` is the fused
+    per-step kernel used by `SodiumPlant`; it performs the same floating
+    point operations as the individual models, so results are identical,
+    but skips repeated lookups, calls and constant recomputation.
+    """
+
+    # Electrical
+    max_dc_current_a: float
+    max_power_kw: float
+    base_cell_voltage_v: float
+    base_current_a: float
+    cell_resistance_ohm: float
+    min_cell_voltage_v: float
+    max_cell_voltage_v: float
+    rectifier_efficiency: float
+
+    # Electrodes
+    amp_hours_limit: float
+    min_life_fraction_for_operation: float
+    resistance_multiplier_at_end_of_life: float
+    efficiency_at_new: float
+    efficiency_at_end_of_life: float
+
+    # Stoichiometry (g/mol)
+    molar_mass_na: float
+    molar_mass_naoh: float
+    molar_mass_cl2: float
+    molar_mass_h2: float
+
+    # Sodium losses
+    evap_loss_low_temp_fraction: float
+    evap_loss_mid_temp_fraction: float
+    evap_loss_high_temp_fraction: float
+    recombined_loss_fraction: float
+    low_temp_c: float
+    high_temp_c: float
+
+    # Thermal
+    heat_capacity_kj_per_k: float
+    loss_coefficient_kw_per_k: float
+    ambient_temp_c: float
+    heater_power_kw: float
+    joule_heat_fraction: float
+    initial_temp_c: float
+
+    # Economics
+    power_cost_per_kwh: float
+    sodium_price_per_kg: float
+
+    # Derived constants
+    rectifier_divisor: float         # max(rectifier_efficiency, 1e-6)
+    faraday_denominator: float       # VALENCY * FARADAY_CONSTANT
+    f_collected: float               # loss fractions at initial_temp_c
+    f_recombined: float
+    f_evap: float
+
+    @classmethod
+    def from_config(cls, cfg: PlantConfig) -> "PlantKernel":
+        values = {}
+        for section, name in _KERNEL_CONFIG_FIELDS:
+            value = getattr(getattr(cfg, section) if section else cfg, name)
+            if not isinstance(value, (int, float)) or math.isnan(value):
+                raise ValueError(f"{name} must be a number, got {value!r}")
+            values[name] = float(value)
+
+        ecfg, rs = cfg.electrical, cfg.reaction_stoich
+        if ecfg.min_cell_voltage_v > ecfg.max_cell_voltage_v:
+            raise ValueError("min_cell_voltage_v must not exceed max_cell_voltage_v")
+        if cfg.sodium_losses.low_temp_c > cfg.sodium_losses.high_temp_c:
+            raise ValueError("low_temp_c must not exceed high_temp_c")
+        if min(rs.molar_mass_na, rs.molar_mass_naoh, rs.molar_mass_cl2, rs.molar_mass_h2) <= 0:
+            raise ValueError("molar masses must be positive")
+        if cfg.thermal.heat_capacity_kj_per_k <= 0:
+            raise ValueError("heat_capacity_kj_per_k must be positive")
+
+        f_collected, f_recombined, f_evap = sodium_loss_fractions(cfg.thermal.initial_temp_c, cfg.sodium_losses)
+        return cls(
+            **values,
+            rectifier_divisor=max(ecfg.rectifier_efficiency, 1e-6),
+            faraday_denominator=VALENCY * FARADAY_CONSTANT,
+            f_collected=f_collected,
+            f_recombined=f_recombined,
+            f_evap=f_evap,
+        )
+
+    def to_config(self) -> PlantConfig:
+        """Rebuild an equivalent `PlantConfig`."""
+        sections: Dict[str, Dict[str, float]] = {}
+        top: Dict[str, float] = {}
+        for section, name in _KERNEL_CONFIG_FIELDS:
+            (sections.setdefault(section, {}) if section else top)[name] = getattr(self, name)
+        return PlantConfig(
+            electrical=ElectricalConfig(**sections["electrical"]),
+            electrodes=ElectrodeConfig(**sections["electrodes"]),
+            sodium_losses=SodiumLossConfig(**sections["sodium_losses"]),
+            reaction_stoich=ReactionStoichConfig(**sections["reaction_stoich"]),
+            thermal=ThermalConfig(**sections["thermal"]),
+            **top,
+        )
+
+    def digest(self) -> str:
+        """Stable hex digest of all kernel values, for persistent cache keys."""
+        text = ",".join(f"{f.name}={getattr(self, f.name)!r}" for f in fields(self))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def step_into(self, state: PlantState, requested_current_a: float, dt_hours: float, out: StepRecord) -> None:
+        """
+        One producing step of `SodiumPlant.step` (dt_hours > 0, not in
+        maintenance), updating `state` and writing the results into `out`.
+        """
+        es = state.electrode_state
+        limit = self.amp_hours_limit
+
+        # 1) Electrical model with electrode-conditioned resistance
+        if limit <= 0:
+            life = 1.0
+        else:
+            life = max(0.0, min(1.0, 1.0 - (es.cumulative_amp_hours / limit)))
+        resistance_multiplier = 1.0 + (1.0 - life) * (self.resistance_multiplier_at_end_of_life - 1.0)
+        r_cell = self.cell_resistance_ohm * resistance_multiplier
+
+        code = REASON_NONE
+        actual_current = min(requested_current_a, self.max_dc_current_a)
+        if actual_current < requested_current_a:
+            code = REASON_CURRENT_LIMIT
+        scaling = actual_current / self.base_current_a if self.base_current_a > 0 else 1.0
+        v_cell = self.base_cell_voltage_v * scaling + actual_current * r_cell
+        if v_cell < self.min_cell_voltage_v:
+            v_cell = self.min_cell_voltage_v
+            code = REASON_VOLTAGE_LIMIT
+        elif v_cell > self.max_cell_voltage_v:
+            v_cell = self.max_cell_voltage_v
+            code = REASON_VOLTAGE_LIMIT
+        dc_power_kw = (actual_current * v_cell) / 1000.0
+        ac_power_kw = dc_power_kw / self.rectifier_divisor
+        if ac_power_kw > self.max_power_kw:
+            scale = self.max_power_kw / ac_power_kw
+            actual_current *= scale
+            dc_power_kw *= scale
+            ac_power_kw = self.max_power_kw
+            code = REASON_POWER_LIMIT
+
+        # 2) Electrode wear update
+        if actual_current > 0:
+            es.cumulative_amp_hours += actual_current * dt_hours
+            if limit > 0:
+                life = max(0.0, min(1.0, 1.0 - (es.cumulative_amp_hours / limit)))
+            if life <= self.min_life_fraction_for_operation:
+                es.in_maintenance = True
+
+        # 3) Faraday-based theoretical Na production
+        eff = self.efficiency_at_end_of_life + (self.efficiency_at_new - self.efficiency_at_end_of_life) * life
+        mass_grams = (actual_current * (dt_hours * 3600.0) * MOLAR_MASS_SODIUM) / self.faraday_denominator
+        na_theoretical_kg = (mass_grams / 1000.0) * eff
+
+        na_theoretical_mol = max(0.0, na_theoretical_kg * 1000.0 / self.molar_mass_na)
+        # Losses at the cell temperature at the start of the step.
+        temp_c = state.cell_temp_c
+        if temp_c == self.initial_temp_c:
+            f_collected, f_recombined, f_evap = self.f_collected, self.f_recombined, self.f_evap
+        else:
+            f_collected, f_recombined, f_evap = sodium_loss_fractions(temp_c, self)
+        naoh_step = na_theoretical_mol * 1.0 * self.molar_mass_naoh / 1000.0 * f_collected
+        cl2_step = na_theoretical_mol * 0.5 * self.molar_mass_cl2 / 1000.0 * f_collected
+        h2_step = na_theoretical_mol * 0.5 * self.molar_mass_h2 / 1000.0 * f_collected
+        na_collected_kg = na_theoretical_kg * f_collected
+
+        # 4) Finance over this step
+        revenue = na_collected_kg * self.sodium_price_per_kg
+        cost = dc_power_kw * dt_hours * self.power_cost_per_kwh
+        margin = revenue - cost
+
+        # 5) Cumulative updates
+        state.time_hours += dt_hours
+        state.cumulative_na_produced_kg += na_collected_kg
+        state.cumulative_naoh_kg += naoh_step
+        state.cumulative_cl2_kg += cl2_step
+        state.cumulative_h2_kg += h2_step
+        state.cumulative_revenue += revenue
+        state.cumulative_cost += cost
+        if self.heat_capacity_kj_per_k != math.inf:
+            state.cell_temp_c = relax_temperature(temp_c, dc_power_kw, dt_hours, self)
+
+        out.in_maintenance = False
+        out.time_hours = state.time_hours
+        out.requested_current_a = requested_current_a
+        out.actual_current_a = actual_current
+        out.cell_voltage_v = v_cell
+        out.dc_power_kw = dc_power_kw
+        out.ac_power_kw = ac_power_kw
+        out.constrained = float(code != REASON_NONE)
+        out.constraint_code = code
+        out.na_theoretical_kg = na_theoretical_kg
+        out.na_collected_kg = na_collected_kg
+        out.na_recombined_kg = na_theoretical_kg * f_recombined
+        out.na_evap_kg = na_theoretical_kg * f_evap
+        out.naoh_step_kg = naoh_step
+        out.cl2_step_kg = cl2_step
+        out.h2_step_kg = h2_step
+        out.step_revenue = revenue
+        out.step_cost = cost
+        out.step_margin = margin
+        out.cumulative_na_kg = state.cumulative_na_produced_kg
+        out.cumulative_naoh_kg = state.cumulative_naoh_kg
+        out.cumulative_cl2_kg = state.cumulative_cl2_kg
+        out.cumulative_h2_kg = state.cumulative_h2_kg
+        out.cumulative_revenue = state.cumulative_revenue
+        out.cumulative_cost = state.cumulative_cost
+        out.cell_temp_c = state.cell_temp_c
+
+
+# --------------------------------------------------------------------------- #
+# Binary snapshots
+# --------------------------------------------------------------------------- #
+_SNAPSHOT_MAGIC = b"NAPS\x03"
+# time, electrode amp-hours, maintenance flag, six cumulative totals,
+# demand meter billing period and peak, cell temperature
+_STATE_STRUCT = struct.Struct("<dd?6dqdd")
+_KERNEL_FIELD_NAMES = tuple(f.name for f in fields(PlantKernel))
+_KERNEL_STRUCT = struct.Struct("<%dd" % len(_KERNEL_FIELD_NAMES))
+_get_kernel_values = operator.attrgetter(*_KERNEL_FIELD_NAMES)
+
+
+def _running_sum(start: float, values: np.ndarray) -> np.ndarray:
+    """Sequential running total after each value, matching repeated `+=`."""
+    return np.cumsum(np.concatenate(([start], values)))[1:]
 
 
 class SodiumPlant:
@@ -99,123 +570,703 @@ class SodiumPlant:
     def __init__(
         self,
         cfg: PlantConfig | None = None,
+        tariff: Tariff | None = None,
     ) -> None:
+        self._rectifiers: RectifierFleet | None = None
         self.cfg = cfg or PlantConfig()
-        self.state = PlantState()
+        # Energy prices and demand charges; without a tariff the flat
+        # `cfg.power_cost_per_kwh` applies.
+        self.tariff = tariff
+        self.demand = DemandMeter()
+        # Optional `StreamingStats` fed by `step`, `step_into` and `run`.
+        self.stats: StreamingStats | None = None
+        self.state = PlantState(cell_temp_c=self.cfg.thermal.initial_temp_c)
+        self._record = StepRecord()
+
+    @property
+    def cfg(self) -> PlantConfig:
+        self._sync_fleet()
+        return self._cfg
+
+    @cfg.setter
+    def cfg(self, cfg: PlantConfig) -> None:
+        # The step kernel is compiled from the config once, here. Configs are
+        # frozen, so the kernel cannot go stale: change parameters with
+        # `plant.cfg = dataclasses.replace(plant.cfg, ...)`.
+        self._base_cfg = cfg
+        self._compile()
+
+    @property
+    def rectifiers(self) -> RectifierFleet | None:
+        """
+        Optional `RectifierFleet`. When set, reported AC power (and demand
+        charges) come from its optimal dispatch instead of the flat
+        `cfg.electrical.rectifier_efficiency`, and `cfg.electrical.max_power_kw`
+        is capped so the DC power never exceeds the available units' rating.
+        """
+        return self._rectifiers
+
+    @rectifiers.setter
+    def rectifiers(self, fleet: RectifierFleet | None) -> None:
+        self._rectifiers = fleet
+        self._compile()
+
+    def _compile(self) -> None:
+        cfg = self._base_cfg
+        fleet = self._rectifiers
+        self._fleet_rating_kw = None if fleet is None else fleet.rating_kw
+        if fleet is not None:
+            ecfg = cfg.electrical
+            limit_kw = self._fleet_rating_kw / max(ecfg.rectifier_efficiency, 1e-6)
+            if limit_kw < ecfg.max_power_kw:
+                cfg = replace(cfg, electrical=replace(ecfg, max_power_kw=limit_kw))
+        self._cfg = cfg
+        self.kernel = cfg.compile()
+
+    def _sync_fleet(self) -> None:
+        """Recompile if the fleet's available units changed since the last compile."""
+        if self._rectifiers is not None and self._rectifiers.rating_kw != self._fleet_rating_kw:
+            self._compile()
+
+    # ------------------------------------------------------------------ #
+    # Snapshots and forks
+    # ------------------------------------------------------------------ #
+    def snapshot(self) -> bytes:
+        """
+        Compact binary snapshot of the plant state and compiled config.
+        The tariff itself is not included, only the demand meter.
+
+        A few hundred bytes; pass to `restore` or `from_snapshot` to resume
+        from exactly this point.
+        """
+        st = self.state
+        es = st.electrode_state
+        return (
+            _SNAPSHOT_MAGIC
+            + _STATE_STRUCT.pack(
+                st.time_hours,
+                es.cumulative_amp_hours,
+                es.in_maintenance,
+                st.cumulative_na_produced_kg,
+                st.cumulative_naoh_kg,
+                st.cumulative_cl2_kg,
+                st.cumulative_h2_kg,
+                st.cumulative_revenue,
+                st.cumulative_cost,
+                self.demand.period,
+                self.demand.peak_kw,
+                st.cell_temp_c,
+            )
+            + _KERNEL_STRUCT.pack(*_get_kernel_values(self.kernel))
+        )
+
+    def restore(self, snapshot: bytes) -> None:
+        """Return the plant to the state (and config) captured by `snapshot`."""
+        expected = len(_SNAPSHOT_MAGIC) + _STATE_STRUCT.size + _KERNEL_STRUCT.size
+        if not snapshot.startswith(_SNAPSHOT_MAGIC) or len(snapshot) != expected:
+            raise ValueError("not a SodiumPlant snapshot")
+        offset = len(_SNAPSHOT_MAGIC)
+        (time_hours, amp_hours, in_maintenance, na_kg, naoh_kg, cl2_kg, h2_kg, revenue, cost, period, peak_kw, temp_c) = (
+            _STATE_STRUCT.unpack_from(snapshot, offset)
+        )
+        kernel = PlantKernel(*_KERNEL_STRUCT.unpack_from(snapshot, offset + _STATE_STRUCT.size))
+
+        self.state = PlantState(
+            time_hours=time_hours,
+            electrode_state=ElectrodeState(cumulative_amp_hours=amp_hours, in_maintenance=in_maintenance),
+            cumulative_na_produced_kg=na_kg,
+            cumulative_naoh_kg=naoh_kg,
+            cumulative_cl2_kg=cl2_kg,
+            cumulative_h2_kg=h2_kg,
+            cumulative_revenue=revenue,
+            cumulative_cost=cost,
+            cell_temp_c=temp_c,
+        )
+        self.demand = DemandMeter(period, peak_kw)
+        if kernel != self.kernel:
+            self._base_cfg = kernel.to_config()
+            self._compile()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: bytes) -> "SodiumPlant":
+        plant = cls()
+        plant.restore(snapshot)
+        return plant
+
+    def fork(self) -> "SodiumPlant":
+        """
+        Independent copy of the plant at its current state.
+
+        The fork shares the (immutable) kernel, the config object and the
+        tariff; assign a new config to the fork to change its parameters.
+        """
+        child = copy.copy(self)
+        child.state = replace(self.state, electrode_state=replace(self.state.electrode_state))
+        child.demand = replace(self.demand)
+        child._record = StepRecord()
+        child.stats = None
+        return child
 
     # ------------------------------------------------------------------ #
     # Core step logic
     # ------------------------------------------------------------------ #
-    def step(self, requested_current_a: float, dt_hours: float) -> Dict[str, float]:
+    def step(self, requested_current_a: float, dt_hours: float, exact_wear: bool = False) -> Dict[str, float]:
         """
         Advance the plant simulation by dt_hours at the requested current.
 
-        Returns a dict of key values for logging/plotting.
+        By default efficiency and resistance are evaluated once per step, so
+        the result depends on dt_hours. With `exact_wear=True` they are
+        integrated over the amp-hours consumed inside the step instead, and
+        any number of steps covering the same interval give the same totals
+        (a 1-week step equals 168 one-hour steps). Electrical fields are then
+        averages over the step.
+
+        Returns a dict of key values for logging/plotting. This is a view over
+        `step_into`, which tight loops can call directly to avoid building it.
         """
-        if dt_hours <= 0:
+        record = self._record
+        if not self.step_into(requested_current_a, dt_hours, record, exact_wear=exact_wear):
             return {}
+        return record.as_dict()
 
-        # If in maintenance, skip production but advance time.
+    def step_into(
+        self,
+        requested_current_a: float,
+        dt_hours: float,
+        out: StepRecord,
+        exact_wear: bool = False,
+    ) -> bool:
+        """
+        Same as `step`, but write the results into a reusable `StepRecord`.
+
+        Returns False (leaving `out` untouched) if dt_hours <= 0. During
+        maintenance only `out.time_hours` and `out.in_maintenance` are set.
+        """
+        if not self._step_into(requested_current_a, dt_hours, out, exact_wear):
+            return False
+        if self.stats is not None:
+            self.stats.record(out, dt_hours)
+        return True
+
+    def _step_into(self, requested_current_a: float, dt_hours: float, out: StepRecord, exact_wear: bool) -> bool:
+        if dt_hours <= 0:
+            return False
+        self._sync_fleet()
+
+        # If in maintenance, skip production but advance time; the cell cools.
         if self.state.electrode_state.in_maintenance:
+            self.state.cell_temp_c = relax_temperature(self.state.cell_temp_c, 0.0, dt_hours, self.kernel)
             self.state.time_hours += dt_hours
+            out.time_hours = self.state.time_hours
+            out.in_maintenance = True
+            return True
+
+        if exact_wear:
+            segment = ConstantCurrentSegment(self.cfg, requested_current_a, self.state.electrode_state.cumulative_amp_hours)
+            # Without wear nothing changes inside the step and the plain path is exact.
+            if segment.wears:
+                self._exact_wear_step(segment, dt_hours, out)
+                return True
+
+        st = self.state
+        start_hours, cost_before = st.time_hours, st.cumulative_cost
+        self.kernel.step_into(st, requested_current_a, dt_hours, out)
+        if self.rectifiers is not None:
+            out.ac_power_kw = self._ac_power_kw(out.dc_power_kw, out.ac_power_kw)
+        if self.tariff is None:
+            return True
+
+        cost = self.tariff.energy_cost(start_hours, st.time_hours, out.dc_power_kw) + self.tariff.demand_charge(
+            self.demand, start_hours, out.ac_power_kw
+        )
+        st.cumulative_cost = cost_before + cost
+        out.step_cost = cost
+        out.step_margin = out.step_revenue - cost
+        out.cumulative_cost = st.cumulative_cost
+        return True
+
+    def _exact_wear_step(self, segment: ConstantCurrentSegment, dt_hours: float, out: StepRecord) -> None:
+        """Write the `step` result for a segment integrated exactly over the step."""
+        totals = self._integrate_segment(segment, dt_hours)
+        self._load_segment_record(segment, totals, dt_hours, out)
+
+    def _load_segment_record(
+        self, segment: ConstantCurrentSegment, totals: Dict[str, float], hours: float, out: StepRecord
+    ) -> None:
+        """Write integrated segment `totals` into `out`, electrical fields averaged over `hours`."""
+        start_ah = segment.start_amp_hours
+        amp_hours = totals["amp_hours"]
+        energy_kwh = totals["energy_kwh"]
+
+        dc_power_kw = energy_kwh / hours
+        ends = segment.electrical_at(np.array([start_ah, start_ah + amp_hours]))
+        # Amp-hour weighted mean voltage (equals the voltage when it is constant).
+        cell_voltage_v = 1000.0 * energy_kwh / amp_hours if amp_hours > 0 else float(ends.cell_voltage_v[0])
+        # Reason of the first constrained end, as wear only moves one way.
+        codes = np.flatnonzero(ends.constraint_code)
+        code = int(ends.constraint_code[codes[0]]) if codes.size else REASON_NONE
+
+        values = {
+            "time_hours": totals["time_hours"],
+            "requested_current_a": totals["requested_current_a"],
+            "actual_current_a": amp_hours / hours,
+            "cell_voltage_v": cell_voltage_v,
+            "dc_power_kw": dc_power_kw,
+            "ac_power_kw": self._ac_power_kw(dc_power_kw, dc_power_kw / max(self.cfg.electrical.rectifier_efficiency, 1e-6)),
+            "constrained": float(bool(np.any(ends.constrained))),
+            # Production, finance and cumulative fields carry over unchanged.
+            **{key: totals[key] for key in STEP_FIELDS[7:]},
+        }
+        out.load(values, code)
+
+    # ------------------------------------------------------------------ #
+    # Closed-form fast-forward at constant current
+    # ------------------------------------------------------------------ #
+    def advance(self, hours: float, current_a: float) -> Dict[str, float]:
+        """
+        Jump the plant forward by `hours` at a constant requested current.
+
+        Instead of stepping, wear, energy and production are integrated
+        analytically over the segment (see `wear_segments`). If the electrode
+        reaches `min_life_fraction_for_operation` on the way, production stops
+        at that exact moment and the rest of the interval is spent in
+        maintenance. Results are the small-dt limit of repeated `step` calls.
+
+        An attached `stats` receives the segment as one step over its
+        producing hours (electrical fields averaged), plus the hours spent in
+        maintenance.
+        """
+        if hours <= 0:
+            return {}
+
+        st = self.state
+        es = st.electrode_state
+        if es.in_maintenance:
+            st.cell_temp_c = relax_temperature(st.cell_temp_c, 0.0, hours, self.kernel)
+            st.time_hours += hours
+            if self.stats is not None:
+                self.stats.maintenance_hours += hours
             return {
-                "time_hours": self.state.time_hours,
+                "time_hours": st.time_hours,
                 "status": "maintenance",
             }
 
-        # 1) Electrical model with electrode-conditioned resistance
-        resistance_multiplier = self.state.electrode_state.effective_resistance_multiplier(self.cfg.electrodes)
-        effective_resistance = self.cfg.electrical.cell_resistance_ohm * resistance_multiplier
+        segment = ConstantCurrentSegment(self.cfg, current_a, es.cumulative_amp_hours)
+        if not segment.wears:
+            # Nothing evolves without positive current: one step is exact.
+            return self.step(requested_current_a=current_a, dt_hours=hours)
+        totals = self._integrate_segment(segment, hours)
+        if self.stats is not None:
+            producing_hours = totals["producing_hours"]
+            if producing_hours > 0:
+                record = StepRecord()
+                self._load_segment_record(segment, totals, producing_hours, record)
+                self.stats.record(record, producing_hours)
+            self.stats.maintenance_hours += hours - producing_hours
+        return totals
 
-        elec_state: ElectricalState = compute_electrical_state(
-            requested_current_a=requested_current_a,
-            config=self.cfg.electrical,
-            effective_cell_resistance_ohm=effective_resistance,
-        )
+    def _integrate_segment(self, segment: ConstantCurrentSegment, hours: float) -> Dict[str, float]:
+        """Apply `hours` of an analytically integrated segment to the state."""
+        st = self.state
+        es = st.electrode_state
 
-        # 2) Electrode wear update
-        self.state.electrode_state.step(self.cfg.electrodes, elec_state.actual_current_a, dt_hours)
-
-        # 3) Faraday-based theoretical Na production (adjusted for electrode efficiency)
-        eff = self.state.electrode_state.effective_efficiency(self.cfg.electrodes)
-        na_theoretical_kg = calculate_sodium_production(
-            amperes=elec_state.actual_current_a,
-            hours=dt_hours,
-            efficiency=eff,
-        )
+        # 1) Where does the segment end: after `hours` or at maintenance?
+        end_ah = float(segment.amp_hours_after(hours))
+        maintenance_ah = maintenance_amp_hours(self.cfg)
+        reached_maintenance = end_ah >= maintenance_ah
+        if reached_maintenance:
+            end_ah = max(maintenance_ah, es.cumulative_amp_hours)
+            producing_hours = min(hours, float(segment.hours_to(end_ah)))
+        else:
+            producing_hours = hours
+
+        # 2) Integrated production and energy over the producing part
+        na_theoretical_kg = float(segment.na_theoretical_kg_to(end_ah))
+        energy_kwh = float(segment.energy_kwh_to(end_ah))
+        avg_power_kw = energy_kwh / producing_hours if producing_hours > 0 else 0.0
 
-        # Map sodium equivalents to NaOH / Cl2 / H2 using the global reaction:
-        # 2 NaCl + 2 H2O -> Cl2 + H2 + 2 NaOH
-        # Moles of Na participating equals moles of Na in NaOH produced.
         rs = self.cfg.reaction_stoich
         na_theoretical_mol = max(0.0, na_theoretical_kg * 1000.0 / rs.molar_mass_na)
-        # For every 2 Na (2 Na+), stoichiometry produces:
-        #   2 NaOH, 1 Cl2, 1 H2
-        # So per mole Na: 1 NaOH, 0.5 Cl2, 0.5 H2.
-        naoh_mol = na_theoretical_mol * 1.0
-        cl2_mol = na_theoretical_mol * 0.5
-        h2_mol = na_theoretical_mol * 0.5
-
-        naoh_kg = naoh_mol * rs.molar_mass_naoh / 1000.0
-        cl2_kg = cl2_mol * rs.molar_mass_cl2 / 1000.0
-        h2_kg = h2_mol * rs.molar_mass_h2 / 1000.0
-
-        # 4) Approximate cell temperature.
-        # For now we use a fixed representative value; a future version could
-        # couple this to a detailed thermal model.
-        cell_temp_c = 600.0
-
-        f_collected, f_recombined, f_evap = sodium_loss_fractions(cell_temp_c, self.cfg.sodium_losses)
+        naoh_kg = na_theoretical_mol * 1.0 * rs.molar_mass_naoh / 1000.0
+        cl2_kg = na_theoretical_mol * 0.5 * rs.molar_mass_cl2 / 1000.0
+        h2_kg = na_theoretical_mol * 0.5 * rs.molar_mass_h2 / 1000.0
+
+        f_collected, f_recombined, f_evap = self._segment_loss_fractions(segment, producing_hours, end_ah, avg_power_kw)
         na_collected_kg = na_theoretical_kg * f_collected
-        na_recombined_kg = na_theoretical_kg * f_recombined
-        na_evap_kg = na_theoretical_kg * f_evap
-
-        # 5) Finance over this step
-        # Power is DC power from the electrical model; assume hours=dt_hours
-        revenue, cost, margin = calculate_finances(
-            kg_produced=na_collected_kg,
-            power_kw=elec_state.dc_power_kw,
-            hours=dt_hours,
-            electricity_cost_per_kwh=self.cfg.power_cost_per_kwh,
-            sodium_price_per_kg=self.cfg.sodium_price_per_kg,
-        )
 
-        # 6) Cumulative updates
-        self.state.time_hours += dt_hours
-        self.state.cumulative_na_produced_kg += na_collected_kg
-        self.state.cumulative_naoh_kg += naoh_kg * f_collected
-        self.state.cumulative_cl2_kg += cl2_kg * f_collected
-        self.state.cumulative_h2_kg += h2_kg * f_collected
-        self.state.cumulative_revenue += revenue
-        self.state.cumulative_cost += cost
+        # 3) Finance, using the average DC power over the producing time
+        if self.tariff is None:
+            revenue, cost, margin = calculate_finances(
+                kg_produced=na_collected_kg,
+                power_kw=avg_power_kw,
+                hours=producing_hours,
+                electricity_cost_per_kwh=self.cfg.power_cost_per_kwh,
+                sodium_price_per_kg=self.cfg.sodium_price_per_kg,
+            )
+        else:
+            revenue = na_collected_kg * self.cfg.sodium_price_per_kg
+            cost = self._segment_tariff_cost(segment, producing_hours, end_ah)
+            margin = revenue - cost
+
+        # 4) State updates
+        amp_hours = end_ah - es.cumulative_amp_hours
+        es.cumulative_amp_hours = end_ah
+        es.in_maintenance = reached_maintenance
+        st.time_hours += hours
+        st.cumulative_na_produced_kg += na_collected_kg
+        st.cumulative_naoh_kg += naoh_kg * f_collected
+        st.cumulative_cl2_kg += cl2_kg * f_collected
+        st.cumulative_h2_kg += h2_kg * f_collected
+        st.cumulative_revenue += revenue
+        st.cumulative_cost += cost
+        # Heat at the average DC power while producing, then cooling.
+        st.cell_temp_c = relax_temperature(st.cell_temp_c, avg_power_kw, producing_hours, self.kernel)
+        if hours > producing_hours:
+            st.cell_temp_c = relax_temperature(st.cell_temp_c, 0.0, hours - producing_hours, self.kernel)
 
-        # 7) Return a rich snapshot of the current step.
         return {
-            "time_hours": self.state.time_hours,
-            "requested_current_a": requested_current_a,
-            "actual_current_a": elec_state.actual_current_a,
-            "cell_voltage_v": elec_state.cell_voltage_v,
-            "dc_power_kw": elec_state.dc_power_kw,
-            "ac_power_kw": elec_state.ac_power_kw,
-            "constrained": float(elec_state.constrained),
+            "time_hours": st.time_hours,
+            "requested_current_a": segment.requested_current_a,
+            "hours": hours,
+            "producing_hours": producing_hours,
+            "amp_hours": amp_hours,
+            "average_current_a": amp_hours / producing_hours if producing_hours > 0 else 0.0,
+            "average_dc_power_kw": avg_power_kw,
+            "energy_kwh": energy_kwh,
+            "in_maintenance": float(reached_maintenance),
             "na_theoretical_kg": na_theoretical_kg,
             "na_collected_kg": na_collected_kg,
-            "na_recombined_kg": na_recombined_kg,
-            "na_evap_kg": na_evap_kg,
+            "na_recombined_kg": na_theoretical_kg * f_recombined,
+            "na_evap_kg": na_theoretical_kg * f_evap,
             "naoh_step_kg": naoh_kg * f_collected,
             "cl2_step_kg": cl2_kg * f_collected,
             "h2_step_kg": h2_kg * f_collected,
             "step_revenue": revenue,
             "step_cost": cost,
             "step_margin": margin,
-            "cumulative_na_kg": self.state.cumulative_na_produced_kg,
-            "cumulative_naoh_kg": self.state.cumulative_naoh_kg,
-            "cumulative_cl2_kg": self.state.cumulative_cl2_kg,
-            "cumulative_h2_kg": self.state.cumulative_h2_kg,
-            "cumulative_revenue": self.state.cumulative_revenue,
-            "cumulative_cost": self.state.cumulative_cost,
+            "cumulative_na_kg": st.cumulative_na_produced_kg,
+            "cumulative_naoh_kg": st.cumulative_naoh_kg,
+            "cumulative_cl2_kg": st.cumulative_cl2_kg,
+            "cumulative_h2_kg": st.cumulative_h2_kg,
+            "cumulative_revenue": st.cumulative_revenue,
+            "cumulative_cost": st.cumulative_cost,
+            "cell_temp_c": st.cell_temp_c,
         }
 
+    def _segment_loss_fractions(
+        self,
+        segment: ConstantCurrentSegment,
+        hours: float,
+        end_ah: float,
+        avg_power_kw: float,
+    ) -> Tuple[float, float, float]:
+        """
+        Sodium loss fractions over the first `hours` of a segment.
+
+        The loss regime depends on the cell temperature, which follows the
+        heat balance at the segment's average DC power. The segment is split
+        where the temperature crosses a regime threshold, and the fractions
+        of the pieces are weighted by the sodium produced in each.
+        """
+        losses = self.cfg.sodium_losses
+        temp_c = self.state.cell_temp_c
+        cuts = [
+            crossing
+            for crossing in (
+                hours_to_temperature(temp_c, avg_power_kw, threshold, self.kernel)
+                for threshold in (losses.low_temp_c, losses.high_temp_c)
+            )
+            if 0.0 < crossing < hours
+        ]
+        if not cuts:
+            return sodium_loss_fractions(temp_c, losses)
+
+        edges = np.array([0.0, *sorted(cuts), hours])
+        mid_temps = [relax_temperature(temp_c, avg_power_kw, t, self.kernel) for t in 0.5 * (edges[:-1] + edges[1:])]
+        ah = segment.amp_hours_after(edges)
+        ah[-1] = end_ah
+        na_kg = np.diff(segment.na_theoretical_kg_to(ah))
+        total = float(na_kg.sum())
+        if total <= 0:
+            return sodium_loss_fractions(temp_c, losses)
+        f_collected, f_recombined, f_evap = sodium_loss_fractions_array(mid_temps, losses)
+        return (
+            float(np.dot(na_kg, f_collected)) / total,
+            float(np.dot(na_kg, f_recombined)) / total,
+            float(np.dot(na_kg, f_evap)) / total,
+        )
+
+    def _segment_tariff_cost(self, segment: ConstantCurrentSegment, hours: float, end_ah: float) -> float:
+        """Energy and demand charges of the first `hours` of a segment under `self.tariff`."""
+        tariff = self.tariff
+        start = self.state.time_hours
+
+        # Energy: split where the price changes; energy between the pieces
+        # comes from the segment's closed-form integral.
+        edges, prices = tariff.pieces(start, start + hours)
+        ah = segment.amp_hours_after(edges - start)
+        ah[-1] = end_ah
+        cost = float(np.dot(np.diff(segment.energy_kwh_to(ah)), prices))
+
+        # Demand: AC power is piecewise linear in amp-hours, so each billing
+        # period's peak is at a segment breakpoint, a period boundary or an end.
+        breakpoints = segment.hours_to(segment.amp_hours)
+        period = tariff.billing_period_hours
+        boundaries = period * np.arange(math.floor(start / period) + 1, math.floor((start + hours) / period) + 1)
+        times = np.sort(
+            np.concatenate(
+                (
+                    [start, start + hours],
+                    start + breakpoints[(breakpoints > 0) & (breakpoints < hours)],
+                    boundaries,
+                    # The power at a boundary also counts for the period it closes.
+                    np.nextafter(boundaries, -np.inf),
+                )
+            )
+        )
+        # The end point is drawn only up to, not at, a period boundary.
+        end = start + hours
+        closes_period = tariff.billing_period(end) != tariff.billing_period(float(np.nextafter(end, -np.inf)))
+        times = times[(times < end) if closes_period else (times <= end)]
+        elec = segment.electrical_at(segment.amp_hours_after(times - start))
+        ac_power_kw = self._ac_power_kw(elec.dc_power_kw, elec.ac_power_kw)
+        return cost + float(tariff.demand_charges(self.demand, times, ac_power_kw).sum())
+
+    # ------------------------------------------------------------------ #
+    # Vectorised multi-step run
+    # ------------------------------------------------------------------ #
+    def run(self, current_profile: np.ndarray, dt_hours: float) -> Dict[str, np.ndarray]:
+        """
+        Advance the plant by len(current_profile) steps of dt_hours each.
+
+        Equivalent to calling `step` once per entry of `current_profile`, but
+        evaluated with NumPy. Returns one array per key reported by `step`
+        (same numbers), plus a boolean `in_maintenance` column; fields other
+        than `time_hours` are NaN for steps spent in maintenance. The plant
+        state is updated to the end of the run.
+        """
+        requested = np.asarray(current_profile, dtype=float).ravel()
+        n = requested.size
+        if dt_hours <= 0 or n == 0:
+            columns = {key: np.empty(0) for key in STEP_FIELDS}
+            columns["in_maintenance"] = np.empty(0, dtype=bool)
+            return columns
+
+        st = self.state
+        es = st.electrode_state
+        electrode_cfg = self.cfg.electrodes
+
+        time_hours = _running_sum(st.time_hours, np.full(n, dt_hours))
+
+        # Number of producing steps before the electrodes enter maintenance.
+        producing = 0
+        if not es.in_maintenance:
+            ah_before = self._amp_hour_trajectory(
+                lambda lo, ah: self._electrical_for(requested[lo:], ah), n, dt_hours, es.cumulative_amp_hours
+            )
+            elec = self._electrical_for(requested, ah_before)
+            actual = elec.actual_current_a
+            wear = np.where(actual > 0, actual * dt_hours, 0.0)
+            ah_after = _running_sum(es.cumulative_amp_hours, wear)
+            life_after = remaining_life_fraction_array(ah_after, electrode_cfg)
+            trips = np.flatnonzero((wear > 0) & (life_after <= electrode_cfg.min_life_fraction_for_operation))
+            producing = int(trips[0]) + 1 if trips.size else n
+
+        columns: Dict[str, np.ndarray] = {"time_hours": time_hours}
+
+        if producing:
+            req = requested[:producing]
+            actual = actual[:producing]
+            dc_power_kw = elec.dc_power_kw[:producing]
+            ah_after = ah_after[:producing]
+            eff = effective_efficiency_array(ah_after, electrode_cfg)
+            na_theoretical_kg = calculate_sodium_production(
+                amperes=actual,
+                hours=dt_hours,
+                efficiency=eff,
+            )
+
+            rs = self.cfg.reaction_stoich
+            na_theoretical_mol = np.maximum(0.0, na_theoretical_kg * 1000.0 / rs.molar_mass_na)
+            naoh_kg = na_theoretical_mol * 1.0 * rs.molar_mass_naoh / 1000.0
+            cl2_kg = na_theoretical_mol * 0.5 * rs.molar_mass_cl2 / 1000.0
+            h2_kg = na_theoretical_mol * 0.5 * rs.molar_mass_h2 / 1000.0
+
+            # Cell temperature at the end of each step: the heat balance is a
+            # scalar recurrence, but one exponential per step.
+            relax = self.kernel
+            temps = list(
+                itertools.accumulate(
+                    dc_power_kw.tolist(),
+                    lambda temp, power: relax_temperature(temp, power, dt_hours, relax),
+                    initial=st.cell_temp_c,
+                )
+            )
+            cell_temp_c = np.array(temps[1:])
+            ac_power_kw = self._ac_power_kw(dc_power_kw, elec.ac_power_kw[:producing])
+            if math.isinf(self.cfg.thermal.heat_capacity_kj_per_k):
+                f_collected, f_recombined, f_evap = sodium_loss_fractions(st.cell_temp_c, self.cfg.sodium_losses)
+            else:
+                f_collected, f_recombined, f_evap = sodium_loss_fractions_array(temps[:-1], self.cfg.sodium_losses)
+            na_collected_kg = na_theoretical_kg * f_collected
+
+            if self.tariff is None:
+                revenue, cost, margin = calculate_finances(
+                    kg_produced=na_collected_kg,
+                    power_kw=dc_power_kw,
+                    hours=dt_hours,
+                    electricity_cost_per_kwh=self.cfg.power_cost_per_kwh,
+                    sodium_price_per_kg=self.cfg.sodium_price_per_kg,
+                )
+            else:
+                start_hours = np.concatenate(([st.time_hours], time_hours[: producing - 1]))
+                revenue = na_collected_kg * self.cfg.sodium_price_per_kg
+                cost = self.tariff.energy_costs(start_hours, time_hours[:producing], dc_power_kw)
+                cost = cost + self.tariff.demand_charges(self.demand, start_hours, ac_power_kw)
+                margin = revenue - cost
+
+            naoh_step = naoh_kg * f_collected
+            cl2_step = cl2_kg * f_collected
+            h2_step = h2_kg * f_collected
+            produced = {
+                "requested_current_a": req,
+                "actual_current_a": actual,
+                "cell_voltage_v": elec.cell_voltage_v[:producing],
+                "dc_power_kw": dc_power_kw,
+                "ac_power_kw": ac_power_kw,
+                "constrained": elec.constrained[:producing].astype(float),
+                "na_theoretical_kg": na_theoretical_kg,
+                "na_collected_kg": na_collected_kg,
+                "na_recombined_kg": na_theoretical_kg * f_recombined,
+                "na_evap_kg": na_theoretical_kg * f_evap,
+                "naoh_step_kg": naoh_step,
+                "cl2_step_kg": cl2_step,
+                "h2_step_kg": h2_step,
+                "step_revenue": revenue,
+                "step_cost": cost,
+                "step_margin": margin,
+                "cumulative_na_kg": _running_sum(st.cumulative_na_produced_kg, na_collected_kg),
+                "cumulative_naoh_kg": _running_sum(st.cumulative_naoh_kg, naoh_step),
+                "cumulative_cl2_kg": _running_sum(st.cumulative_cl2_kg, cl2_step),
+                "cumulative_h2_kg": _running_sum(st.cumulative_h2_kg, h2_step),
+                "cumulative_revenue": _running_sum(st.cumulative_revenue, revenue),
+                "cumulative_cost": _running_sum(st.cumulative_cost, cost),
+                "cell_temp_c": cell_temp_c,
+            }
+            for key, values in produced.items():
+                if producing < n:
+                    padded = np.full(n, np.nan)
+                    padded[:producing] = values
+                    values = padded
+                columns[key] = values
+
+            st.cumulative_na_produced_kg = float(produced["cumulative_na_kg"][-1])
+            st.cumulative_naoh_kg = float(produced["cumulative_naoh_kg"][-1])
+            st.cumulative_cl2_kg = float(produced["cumulative_cl2_kg"][-1])
+            st.cumulative_h2_kg = float(produced["cumulative_h2_kg"][-1])
+            st.cumulative_revenue = float(produced["cumulative_revenue"][-1])
+            st.cumulative_cost = float(produced["cumulative_cost"][-1])
+            st.cell_temp_c = temps[-1]
+            es.cumulative_amp_hours = float(ah_after[-1])
+            es.in_maintenance = bool(trips.size)
+        else:
+            for key in STEP_FIELDS[1:]:
+                columns[key] = np.full(n, np.nan)
+        columns["in_maintenance"] = np.arange(n) >= producing
+        if self.stats is not None:
+            codes = np.zeros(n, dtype=np.int64)
+            if producing:
+                codes[:producing] = elec.constraint_code[:producing]
+            self.stats.record_columns(columns, dt_hours, codes)
+
+        if producing < n and not math.isinf(self.cfg.thermal.heat_capacity_kj_per_k):
+            # Cooling during maintenance, step by step as `step` would.
+            for _ in range(n - producing):
+                st.cell_temp_c = relax_temperature(st.cell_temp_c, 0.0, dt_hours, self.kernel)
+        st.time_hours = float(time_hours[-1])
+        return columns
+
+    def run_schedule(self, schedule: "SetpointSchedule", dt_hours: float, steps: int) -> Dict[str, np.ndarray]:
+        """`run` over the step-average currents of `schedule`, from the current time."""
+        return self.run(schedule.step_currents(self.state.time_hours, dt_hours, steps), dt_hours)
+
+    def _ac_power_kw(self, dc_power_kw: np.ndarray | float, flat_ac_power_kw: np.ndarray | float) -> np.ndarray | float:
+        """AC draw from the rectifier fleet's dispatch if one is attached."""
+        if self.rectifiers is None:
+            return flat_ac_power_kw
+        ac_power_kw = self.rectifiers.ac_power_kw(dc_power_kw)
+        return float(ac_power_kw) if ac_power_kw.ndim == 0 else ac_power_kw
+
+    def run_power(
+        self,
+        power_profile_kw: np.ndarray,
+        dt_hours: float,
+        basis: Literal["dc", "ac"] = "dc",
+    ) -> Dict[str, np.ndarray]:
+        """
+        `run` in power mode: each step requests the current that draws its
+        entry of `power_profile_kw` (DC cell power or AC grid power) at the
+        electrode wear of that step's start, as `current_for_power` solves it.
+        Targets beyond the limits are clamped to what the limits allow.
+        """
+        targets = np.asarray(power_profile_kw, dtype=float).ravel()
+        ecfg = self.cfg.electrical
+
+        def solve(lo: int, amp_hours_before: np.ndarray) -> ElectricalStateArray:
+            multiplier = effective_resistance_multiplier_array(amp_hours_before, self.cfg.electrodes)
+            return current_for_power(targets[lo:], ecfg, ecfg.cell_resistance_ohm * multiplier, basis)
+
+        # The requested currents depend on the wear, which depends on them;
+        # solve that first, then `run` reproduces the same trajectory.
+        if targets.size and dt_hours > 0:
+            ah_before = self._amp_hour_trajectory(
+                solve, targets.size, dt_hours, self.state.electrode_state.cumulative_amp_hours
+            )
+            requested = solve(0, ah_before).requested_current_a
+        else:
+            requested = targets
+        return self.run(requested, dt_hours)
+
+    def _electrical_for(self, requested: np.ndarray, amp_hours_before: np.ndarray) -> ElectricalStateArray:
+        """Electrical state for each step given the electrode wear at its start."""
+        multiplier = effective_resistance_multiplier_array(amp_hours_before, self.cfg.electrodes)
+        return compute_electrical_state_array(
+            requested,
+            self.cfg.electrical,
+            effective_cell_resistance_ohm=self.cfg.electrical.cell_resistance_ohm * multiplier,
+        )
+
+    def _amp_hour_trajectory(
+        self,
+        electrical: Callable[[int, np.ndarray], ElectricalStateArray],
+        n: int,
+        dt_hours: float,
+        start_ah: float,
+    ) -> np.ndarray:
+        """
+        Cumulative amp-hours at the start of each of `n` steps, where
+        `electrical(lo, ah_before)` gives the electrical state of steps lo..n-1.
+
+        Wear feeds back into the current only through the power limit (and,
+        in power mode, the solved request), so we solve the recurrence by
+        fixed-point iteration: evaluate every step from a guessed trajectory,
+        re-accumulate, and keep the prefix that no longer changes. Each pass
+        fixes at least one more step exactly, and in practice the whole
+        trajectory settles after two or three passes.
+        """
+        guess = np.full(n, start_ah)
+        lo = 0
+        while lo < n:
+            actual = electrical(lo, guess[lo:]).actual_current_a
+            wear = np.where(actual > 0, actual * dt_hours, 0.0)
+            updated = _running_sum(guess[lo], wear[:-1])
+            mismatch = np.flatnonzero(updated != guess[lo + 1:])
+            guess[lo + 1:] = updated
+            if not mismatch.size:
+                break
+            lo += int(mismatch[0]) + 1
+        return guess
+
 
 if __name__ == "__main__":
     plant = SodiumPlant()
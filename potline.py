@@ -0,0 +1,310 @@
+"""Potline: a string of cells in series on one transformer-rectifier.
+
+Every cell in the line carries the same current and the cell voltages add.
+Cells share the electrical model of `ElectricalConfig` (linear voltage plus
+ohmic term, clipped to [`min_cell_voltage_v`, `max_cell_voltage_v`] at
+constant current, as in `compute_electrical_state`) but wear and heat up on
+their own: each has an `ElectrodeState` and a temperature, held here as
+arrays, and its resistance, efficiency and sodium losses follow them. Cells
+in maintenance are bypassed.
+
+The line current is the requested current reduced, in turn, by
+
+- the rectifier current rating,
+- the rectifier DC voltage rating (sum of cell voltages),
+- the rectifier power rating.
+
+A cell clipped at its voltage limits is reported as `cell_voltage_limit`
+but does not cut the line current. The rectifier ratings are line limits:
+unlike the single-cell power limit of `compute_electrical_state`, which
+scales the current down at a fixed voltage, the current is solved so that
+the string voltage at that current meets the rating.
+
+The string voltage is a piecewise-linear function of the current, with up
+to two breakpoints per cell where it leaves the floor and reaches the cap.
+With the breakpoints sorted, the voltage and power limits are solved exactly
+(a linear and a quadratic equation on one piece) in O(N log N) per step.
+
+A one-cell line with the rectifier ratings of its `ElectricalConfig`
+reproduces `SodiumPlant.step` as long as the power rating does not bind.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from electrode_model import (
+    ElectrodeConfig,
+    ElectrodeState,
+    effective_efficiency_array,
+    effective_resistance_multiplier_array,
+    remaining_life_fraction_array,
+)
+from plant_model import PlantConfig, sodium_loss_fractions_array
+from sodium_logic import calculate_sodium_production
+from thermal_model import relax_temperature_array
+
+# Reasons the line current can be below the request, in the order applied.
+LINE_REASONS = ("none", "current_limit", "cell_voltage_limit", "voltage_limit", "power_limit")
+
+
+@dataclass
+class RectifierConfig:
+    """Ratings of the transformer-rectifier feeding the line."""
+
+    max_dc_current_a: float = 100_000.0
+    max_dc_voltage_v: float = 1_500.0
+    max_power_kw: float = 60_000.0
+    efficiency: float = 0.96
+
+
+@dataclass
+class PotlineConfig:
+    """
+    A line of `n_cells` identical cells.
+
+    `cell` supplies the per-cell voltage model and cell voltage limits
+    (`cell.electrical`), electrode wear, losses and prices; the current and
+    power ratings of `cell.electrical` are replaced by `rectifier`.
+    """
+
+    n_cells: int = 200
+    cell: PlantConfig = field(default_factory=PlantConfig)
+    rectifier: RectifierConfig = field(default_factory=RectifierConfig)
+    # Hours a cell is bypassed for electrode replacement; None keeps it out
+    # until `replace_electrodes` is called.
+    maintenance_outage_hours: float | None = 72.0
+
+
+@dataclass
+class LineState:
+    """Line-level state; per-cell wear lives in `Potline`."""
+
+    time_hours: float = 0.0
+    cumulative_na_kg: float = 0.0
+    cumulative_energy_kwh: float = 0.0
+    cumulative_revenue: float = 0.0
+    cumulative_cost: float = 0.0
+
+
+class Potline:
+    """Series string of cells with per-cell wear and a shared-current solve."""
+
+    def __init__(self, cfg: PotlineConfig | None = None, amp_hours: np.ndarray | None = None) -> None:
+        """`amp_hours` optionally staggers the initial electrode wear per cell."""
+        self.cfg = cfg or PotlineConfig()
+        n = self.cfg.n_cells
+        self.amp_hours = np.zeros(n) if amp_hours is None else np.array(amp_hours, dtype=float)
+        if self.amp_hours.shape != (n,):
+            raise ValueError(f"amp_hours must have {n} entries")
+        self.in_maintenance = np.zeros(n, dtype=bool)
+        self.outage_left_hours = np.zeros(n)
+        self.cell_temp_c = np.full(n, self.cfg.cell.thermal.initial_temp_c)
+        self.state = LineState()
+
+    # ------------------------------------------------------------------ #
+    # Per-cell access
+    # ------------------------------------------------------------------ #
+    def electrode_state(self, index: int) -> ElectrodeState:
+        """Electrode state of one cell as a regular `ElectrodeState` (a copy)."""
+        return ElectrodeState(float(self.amp_hours[index]), bool(self.in_maintenance[index]))
+
+    def remaining_life(self) -> np.ndarray:
+        return remaining_life_fraction_array(self.amp_hours, self.cfg.cell.electrodes)
+
+    def replace_electrodes(self, cells: np.ndarray | List[int]) -> None:
+        """Fit new electrodes to the given cells and put them back in the line."""
+        self.amp_hours[cells] = 0.0
+        self.in_maintenance[cells] = False
+        self.outage_left_hours[cells] = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Electrical solve
+    # ------------------------------------------------------------------ #
+    def _cell_coefficients(self) -> tuple[np.ndarray, np.ndarray]:
+        """Unclipped cell voltage c + s * I of each cell in the line."""
+        ecfg = self.cfg.cell.electrical
+        r_cell = ecfg.cell_resistance_ohm * effective_resistance_multiplier_array(
+            self.amp_hours[~self.in_maintenance], self.cfg.cell.electrodes
+        )
+        if ecfg.base_current_a > 0:
+            return np.zeros(r_cell.size), ecfg.base_cell_voltage_v / ecfg.base_current_a + r_cell
+        return np.full(r_cell.size, ecfg.base_cell_voltage_v), r_cell
+
+    def solve_current(self, requested_current_a: float) -> tuple[float, int, np.ndarray]:
+        """
+        Line current for a requested current, the `LINE_REASONS` index of the
+        binding limit, and the voltage of each cell in the line.
+        """
+        ecfg = self.cfg.cell.electrical
+        rect = self.cfg.rectifier
+        floor, cap = ecfg.min_cell_voltage_v, ecfg.max_cell_voltage_v
+        c, s = self._cell_coefficients()
+        if c.size == 0:
+            return 0.0, 0, c
+
+        current, reason = requested_current_a, 0
+        if current > rect.max_dc_current_a:
+            current, reason = rect.max_dc_current_a, 1
+        # Cell voltage limits clip the voltage at this current.
+        unclipped = c + s * current
+        if np.any((unclipped < floor) | (unclipped > cap)):
+            reason = 2
+
+        if current > 0:
+            line = _StringVoltage(c, s, floor, cap)
+            if line.voltage(current) > rect.max_dc_voltage_v:
+                current, reason = line.current_for_voltage(rect.max_dc_voltage_v), 3
+            max_dc_kw = rect.max_power_kw * rect.efficiency
+            if current * line.voltage(current) / 1000.0 > max_dc_kw:
+                current, reason = line.current_for_power(max_dc_kw * 1000.0), 4
+        return current, reason, np.clip(c + s * max(current, 0.0), floor, cap)
+
+    # ------------------------------------------------------------------ #
+    # Time stepping
+    # ------------------------------------------------------------------ #
+    def step(self, requested_current_a: float, dt_hours: float) -> Dict[str, float]:
+        """Advance the line by dt_hours at the requested current."""
+        if dt_hours <= 0:
+            return {}
+        cfg = self.cfg
+        ecfg = cfg.cell.electrodes
+        st = self.state
+
+        active = ~self.in_maintenance
+        current, reason, cell_voltage = self.solve_current(requested_current_a)
+        line_voltage = float(cell_voltage.sum())
+        dc_power_kw = current * line_voltage / 1000.0
+        ac_power_kw = dc_power_kw / max(cfg.rectifier.efficiency, 1e-6)
+
+        # Wear, then efficiency at the end of the step, as in `SodiumPlant.step`.
+        if current > 0:
+            self.amp_hours[active] += current * dt_hours
+        life = remaining_life_fraction_array(self.amp_hours, ecfg)
+        tripped = active & (current > 0) & (life <= ecfg.min_life_fraction_for_operation)
+        eff = effective_efficiency_array(self.amp_hours[active], ecfg)
+        na_theoretical_kg = calculate_sodium_production(amperes=max(current, 0.0), hours=dt_hours, efficiency=eff)
+        # Losses at each cell's temperature at the start of the step.
+        f_collected = sodium_loss_fractions_array(self.cell_temp_c[active], cfg.cell.sodium_losses)[0]
+        na_collected_kg = float(np.sum(na_theoretical_kg * f_collected))
+        cell_power_kw = np.zeros(cfg.n_cells)
+        cell_power_kw[active] = max(current, 0.0) * cell_voltage / 1000.0
+        self.cell_temp_c = relax_temperature_array(self.cell_temp_c, cell_power_kw, dt_hours, cfg.cell.thermal)
+
+        energy_kwh = dc_power_kw * dt_hours
+        revenue = na_collected_kg * cfg.cell.sodium_price_per_kg
+        cost = energy_kwh * cfg.cell.power_cost_per_kwh
+
+        # Maintenance: bypassed cells count their outage down.
+        if cfg.maintenance_outage_hours is not None:
+            waiting = self.in_maintenance.copy()
+            self.outage_left_hours[waiting] -= dt_hours
+            self.replace_electrodes(np.flatnonzero(waiting & (self.outage_left_hours <= 0)))
+            self.outage_left_hours[tripped] = cfg.maintenance_outage_hours
+        self.in_maintenance |= tripped
+
+        st.time_hours += dt_hours
+        st.cumulative_na_kg += na_collected_kg
+        st.cumulative_energy_kwh += energy_kwh
+        st.cumulative_revenue += revenue
+        st.cumulative_cost += cost
+
+        return {
+            "time_hours": st.time_hours,
+            "requested_current_a": requested_current_a,
+            "line_current_a": current,
+            "line_voltage_v": line_voltage,
+            "dc_power_kw": dc_power_kw,
+            "ac_power_kw": ac_power_kw,
+            "constraint_reason": LINE_REASONS[reason],
+            "active_cells": int(active.sum()),
+            "max_cell_voltage_v": float(cell_voltage.max()) if cell_voltage.size else 0.0,
+            "max_cell_temp_c": float(self.cell_temp_c.max()),
+            "cells_entering_maintenance": int(tripped.sum()),
+            "na_collected_kg": na_collected_kg,
+            "step_revenue": revenue,
+            "step_cost": cost,
+            "step_margin": revenue - cost,
+            "cumulative_na_kg": st.cumulative_na_kg,
+            "cumulative_revenue": st.cumulative_revenue,
+            "cumulative_cost": st.cumulative_cost,
+        }
+
+
+class _StringVoltage:
+    """Sum over cells of clip(c + s * I, floor, cap), as a piecewise-linear function of I."""
+
+    def __init__(self, c: np.ndarray, s: np.ndarray, floor: float, cap: float) -> None:
+        rising = s > 0
+        # Below every breakpoint rising cells sit at the floor; flat ones are constant.
+        base = floor * np.count_nonzero(rising) + float(np.sum(np.clip(c[~rising], floor, cap)))
+        c, s = c[rising], s[rising]
+        # Each rising cell leaves the floor (gaining c - floor and slope s) and
+        # reaches the cap (gaining cap - c and losing slope s).
+        knees = np.concatenate(((floor - c) / s, (cap - c) / s))
+        d_offset = np.concatenate((c - floor, cap - c))
+        d_slope = np.concatenate((s, -s))
+        order = np.argsort(knees, kind="stable")
+        self.knees = knees[order]
+        # After the first m breakpoints: V = offset[m] + slope[m] * I.
+        self.offset = base + np.concatenate(([0.0], np.cumsum(d_offset[order])))
+        self.slope = np.concatenate(([0.0], np.cumsum(d_slope[order])))
+
+    def _piece(self, current: float) -> int:
+        return int(np.searchsorted(self.knees, current, side="right"))
+
+    def voltage(self, current: float) -> float:
+        m = self._piece(current)
+        return float(self.offset[m] + self.slope[m] * current)
+
+    def _solve(self, target: float, power: bool) -> float:
+        """Current at which the voltage (or the power, I * V) reaches `target`."""
+        # The function at every knee; the root lies on the piece after the
+        # last knee still at or below the target.
+        knees = np.unique(np.maximum(self.knees[np.isfinite(self.knees)], 0.0))
+        pieces = np.searchsorted(self.knees, knees, side="right")
+        values = self.offset[pieces] + self.slope[pieces] * knees
+        if power:
+            values = values * knees
+        below = np.flatnonzero(values <= target)
+        m = int(pieces[below[-1]]) if below.size else self._piece(0.0)
+        a, b = self.offset[m], self.slope[m]
+        if power:
+            # b * I**2 + a * I = target (stable root)
+            return float(2.0 * target / (a + math.sqrt(a * a + 4.0 * b * target)))
+        return float((target - a) / b) if b > 0 else 0.0
+
+    def current_for_voltage(self, voltage: float) -> float:
+        return max(0.0, self._solve(voltage, power=False))
+
+    def current_for_power(self, watts: float) -> float:
+        return max(0.0, self._solve(watts, power=True))
+
+
+if __name__ == "__main__":
+    import time
+
+    cell = PlantConfig(electrodes=ElectrodeConfig(amp_hours_limit=2.0e8))  # roughly a year at 25 kA
+    cfg = PotlineConfig(n_cells=300, cell=cell)
+    rng = np.random.default_rng(0)
+    # Cells relined at different times: staggered wear along the line.
+    line = Potline(cfg, amp_hours=rng.uniform(0.0, 0.85, cfg.n_cells) * cfg.cell.electrodes.amp_hours_limit)
+
+    start = time.perf_counter()
+    steps = 24 * 90
+    for _ in range(steps):
+        result = line.step(requested_current_a=30_000.0, dt_hours=1.0)
+    elapsed = time.perf_counter() - start
+
+    print(f"{cfg.n_cells} cells, {steps} h in {elapsed * 1e3:.0f} ms ({elapsed / steps * 1e6:.0f} us/step)")
+    print(
+        f"Line: {result['line_current_a']:,.0f} A ({result['constraint_reason']}), "
+        f"{result['line_voltage_v']:,.0f} V, {result['ac_power_kw']:,.0f} kW AC, "
+        f"{result['active_cells']} cells in line"
+    )
+    print(f"Na: {line.state.cumulative_na_kg:,.0f} kg, margin ${line.state.cumulative_revenue - line.state.cumulative_cost:,.0f}")
+    print(f"Remaining life: min {line.remaining_life().min():.2f}, max {line.remaining_life().max():.2f}")
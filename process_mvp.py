@@ -14,7 +14,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from plant_model import PlantConfig, SodiumPlant
+from plant_model import PlantConfig, SodiumPlant, StepRecord
+from setpoint_schedule import SetpointSchedule
+from streaming_stats import StreamingStats
 
 
 @dataclass
@@ -24,6 +26,10 @@ class Scenario:
     current_a: float = 10_000.0
     total_hours: float = 24.0
     dt_hours: float = 1.0
+    # Integrate electrode wear within each step, so coarse steps stay accurate.
+    exact_wear: bool = False
+    # Optional setpoint schedule; overrides `current_a` when given.
+    schedule: SetpointSchedule | None = None
 
 
 def run_mvp(scenario: Scenario | None = None) -> None:
@@ -31,29 +37,42 @@ def run_mvp(scenario: Scenario | None = None) -> None:
     scenario = scenario or Scenario()
 
     plant = SodiumPlant(PlantConfig())
+    plant.stats = StreamingStats()
 
     steps = int(scenario.total_hours / scenario.dt_hours)
+    if scenario.schedule is None:
+        schedule = SetpointSchedule.constant(scenario.current_a)
+        current_text = f"{scenario.current_a:,.0f} A"
+    else:
+        schedule = scenario.schedule
+        current_text = "scheduled"
     print("=== Sodium Plant MVP Simulation ===")
     print(
-        f"Requested current: {scenario.current_a:,.0f} A, "
+        f"Requested current: {current_text}, "
         f"duration: {scenario.total_hours:.1f} h, "
         f"step: {scenario.dt_hours:.2f} h"
     )
 
-    for i in range(steps):
-        result = plant.step(
-            requested_current_a=scenario.current_a,
+    record = StepRecord()
+    currents = schedule.iter_step_currents(plant.state.time_hours, scenario.dt_hours)
+    for _, current_a in zip(range(steps), currents):
+        if not plant.step_into(
+            requested_current_a=current_a,
             dt_hours=scenario.dt_hours,
-        )
-        if not result:
+            out=record,
+            exact_wear=scenario.exact_wear,
+        ):
+            continue
+        if record.in_maintenance:
+            print(f"t={record.time_hours:.1f} h | electrodes in maintenance")
             continue
 
         print(
-            f"t={result['time_hours']:.1f} h | "
-            f"I={result['actual_current_a']:,.0f} A | "
-            f"V={result['cell_voltage_v']:.2f} V | "
-            f"Na step={result['na_collected_kg']:.3f} kg | "
-            f"Na cum={result['cumulative_na_kg']:.2f} kg"
+            f"t={record.time_hours:.1f} h | "
+            f"I={record.actual_current_a:,.0f} A | "
+            f"V={record.cell_voltage_v:.2f} V | "
+            f"Na step={record.na_collected_kg:.3f} kg | "
+            f"Na cum={record.cumulative_na_kg:.2f} kg"
         )
 
     print("\n=== Summary ===")
@@ -62,6 +81,12 @@ def run_mvp(scenario: Scenario | None = None) -> None:
     print(f"Total revenue:    ${plant.state.cumulative_revenue:,.2f}")
     print(f"Total power cost: ${plant.state.cumulative_cost:,.2f}")
 
+    kpis = plant.stats.summary()
+    limited = {reason: hours for reason, hours in kpis["constraint_hours"].items() if reason != "none" and hours > 0}
+    print(f"Specific energy:  {kpis['specific_energy_kwh_per_kg']:.2f} kWh/kg Na")
+    print(f"Peak AC power:    {kpis['fields']['ac_power_kw']['max']:,.1f} kW")
+    print(f"Limited hours:    {limited or 'none'}, maintenance {kpis['maintenance_hours']:.1f} h")
+
 
 if __name__ == "__main__":
     run_mvp()
@@ -0,0 +1,206 @@
+"""Inverse estimates: how long, and at what cost, to reach a production target.
+
+`time_hours_for_naoh_mass` in `sodium_logic` answers this with Faraday's law
+at a fixed efficiency. `estimate_production` answers it for an actual
+`SodiumPlant` from its current state: electrode wear, electrical limits, loss
+fractions, the tariff and maintenance outages all count.
+
+Each electrode cycle is a `ConstantCurrentSegment`. Sodium produced is the
+integral of the (piecewise-linear) faradaic efficiency over amp-hours, so the
+amp-hours, and from them the hours, at which a target is met follow from a
+quadratic root on one piece, for a whole vector of targets at once. Cycles
+that end before a target is met are run to the maintenance threshold,
+followed by the outage, and the remainder carries over to the next cycle.
+The end state of each target is then reached from a fork of the plant with
+the closed-form `SodiumPlant.advance`, which also gives the exact cost.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from plant_model import PlantState, SodiumPlant, sodium_loss_fractions
+from wear_segments import ConstantCurrentSegment, maintenance_amp_hours
+
+
+@dataclass
+class ProductionEstimate:
+    """Per-target results of `estimate_production`, in target order."""
+
+    na_kg: np.ndarray                 # collected Na to produce
+    hours: np.ndarray                 # wall-clock hours, outages included (inf if unreachable)
+    producing_hours: np.ndarray
+    energy_kwh: np.ndarray            # DC energy
+    cost: np.ndarray                  # energy (and demand) cost, tariff included
+    revenue: np.ndarray
+    maintenance_events: np.ndarray    # electrode replacements on the way
+    end_states: List[PlantState | None]
+
+
+def estimate_production(
+    plant: SodiumPlant,
+    current_a: float,
+    na_kg: np.ndarray | float | None = None,
+    naoh_kg: np.ndarray | float | None = None,
+    maintenance_outage_hours: float = 72.0,
+    max_cycles: int = 1_000,
+    rtol: float = 1e-10,
+) -> ProductionEstimate:
+    """
+    Time, energy, cost and end state to produce `na_kg` of collected sodium
+    (or to consume `naoh_kg` of NaOH) from the plant's current state at a
+    constant requested current. Targets are amounts on top of the current
+    totals and may be arrays. The plant itself is not modified.
+
+    Electrodes reaching `min_life_fraction_for_operation` are replaced after
+    `maintenance_outage_hours`; a plant already in maintenance is taken to
+    start a full outage now. Targets not met within `max_cycles` electrode
+    cycles (or never, at zero current) get inf hours and no end state.
+    """
+    if (na_kg is None) == (naoh_kg is None):
+        raise ValueError("give exactly one of na_kg and naoh_kg")
+    rs = plant.cfg.reaction_stoich
+    if na_kg is None:
+        # NaOH is accounted per mole of collected Na.
+        na_kg = np.asarray(naoh_kg, dtype=float) * rs.molar_mass_na / rs.molar_mass_naoh
+    targets = np.atleast_1d(np.asarray(na_kg, dtype=float))
+    if np.any(targets < 0):
+        raise ValueError("targets must be non-negative")
+
+    n = targets.size
+    hours = np.full(n, math.inf)
+    producing_hours = np.full(n, math.inf)
+    energy_kwh = np.full(n, math.inf)
+    cost = np.full(n, math.inf)
+    revenue = np.full(n, math.inf)
+    events = np.zeros(n, dtype=np.int64)
+    end_states: List[PlantState | None] = [None] * n
+
+    cursor = plant.fork()
+    start = cursor.state
+    start_hours, start_na, start_cost, start_revenue = (
+        start.time_hours,
+        start.cumulative_na_produced_kg,
+        start.cumulative_cost,
+        start.cumulative_revenue,
+    )
+    produced = 0.0                 # collected Na before the current cycle
+    producing_before = 0.0
+    energy_before = 0.0
+    cycles = 0
+    pending = np.argsort(targets, kind="stable")
+    limit_ah = maintenance_amp_hours(plant.cfg)
+
+    while pending.size and cycles <= max_cycles:
+        es = cursor.state.electrode_state
+        if es.in_maintenance:
+            cursor.advance(hours=maintenance_outage_hours, current_a=current_a)
+            es.reset_after_maintenance()
+            cycles += 1
+            continue
+
+        segment = ConstantCurrentSegment(cursor.cfg, current_a, es.cumulative_amp_hours)
+        if not segment.wears:
+            break
+        f_collected = sodium_loss_fractions(cursor.state.cell_temp_c, cursor.cfg.sodium_losses)[0]
+        end_ah = max(limit_ah, es.cumulative_amp_hours)
+        capacity = f_collected * float(segment.na_theoretical_kg_to(end_ah)) if math.isfinite(end_ah) else math.inf
+
+        remaining = targets[pending] - produced
+        inside = remaining <= capacity
+        if inside.any():
+            met = pending[inside]
+            if f_collected > 0:
+                ah = segment.amp_hours_for_na(remaining[inside] / f_collected)
+            else:
+                ah = np.full(met.size, es.cumulative_amp_hours)
+            run_hours = segment.hours_to(np.minimum(ah, end_ah))
+            for index, guess in zip(met.tolist(), run_hours.tolist()):
+                branch = _advance_to_target(cursor, current_a, guess, start_na + float(targets[index]), rtol)
+                st = branch.state
+                run = st.time_hours - cursor.state.time_hours
+                hours[index] = st.time_hours - start_hours
+                producing_hours[index] = producing_before + run
+                energy_kwh[index] = energy_before + float(segment.energy_kwh_to(segment.amp_hours_after(run)))
+                cost[index] = st.cumulative_cost - start_cost
+                revenue[index] = st.cumulative_revenue - start_revenue
+                events[index] = cycles
+                end_states[index] = st
+            pending = pending[~inside]
+        if not pending.size or not math.isfinite(end_ah):
+            break
+
+        # Run the cycle to the maintenance threshold.
+        run = float(segment.hours_to(end_ah))
+        cursor.advance(hours=run, current_a=current_a)
+        es.in_maintenance = True
+        produced = cursor.state.cumulative_na_produced_kg - start_na
+        producing_before += run
+        energy_before += float(segment.energy_kwh_to(end_ah))
+
+    return ProductionEstimate(
+        na_kg=targets,
+        hours=hours,
+        producing_hours=producing_hours,
+        energy_kwh=energy_kwh,
+        cost=cost,
+        revenue=revenue,
+        maintenance_events=events,
+        end_states=end_states,
+    )
+
+
+def _advance_to_target(
+    plant: SodiumPlant,
+    current_a: float,
+    hours: float,
+    target_na_kg: float,
+    rtol: float,
+    max_iterations: int = 20,
+) -> SodiumPlant:
+    """
+    Fork of `plant` advanced until cumulative Na reaches `target_na_kg`.
+
+    `hours` is the analytic estimate. It is exact unless the cell temperature
+    moves the loss fractions during the run, in which case it is polished by
+    a secant iteration on the closed-form `advance`.
+    """
+
+    def attempt(run: float) -> SodiumPlant:
+        branch = plant.fork()
+        if run > 0:
+            branch.advance(hours=run, current_a=current_a)
+        return branch
+
+    branch = attempt(hours)
+    error = branch.state.cumulative_na_produced_kg - target_na_kg
+    tolerance = rtol * max(abs(target_na_kg), 1.0)
+    prev_hours, prev_error = 0.0, plant.state.cumulative_na_produced_kg - target_na_kg
+    for _ in range(max_iterations):
+        if abs(error) <= tolerance or error == prev_error:
+            break
+        hours, prev_hours = hours - error * (hours - prev_hours) / (error - prev_error), hours
+        prev_error = error
+        branch = attempt(max(hours, 0.0))
+        error = branch.state.cumulative_na_produced_kg - target_na_kg
+    return branch
+
+
+if __name__ == "__main__":
+    from sodium_logic import time_hours_for_naoh_mass
+
+    plant = SodiumPlant()
+    batches = np.array([100.0, 1_000.0, 10_000.0, 50_000.0])
+    estimate = estimate_production(plant, current_a=10_000.0, naoh_kg=batches, maintenance_outage_hours=48.0)
+    for naoh, h, kwh, cost, events in zip(
+        batches, estimate.hours, estimate.energy_kwh, estimate.cost, estimate.maintenance_events
+    ):
+        faraday = time_hours_for_naoh_mass(current_a=10_000.0, naoh_mass_kg=naoh)
+        print(
+            f"{naoh:>8,.0f} kg NaOH: {h:9,.1f} h (fixed-efficiency estimate {faraday:9,.1f} h), "
+            f"{kwh:11,.0f} kWh, ${cost:10,.2f}, {events} electrode changes"
+        )
@@ -0,0 +1,185 @@
+"""Real-time pacing: advance a `SodiumPlant` against the wall clock.
+
+A `PacedSimulation` runs as an asyncio task. Every tick it works out how much
+simulated time is due at the current speed-up factor (1x, 60x, 3600x, ...)
+and advances the plant by that many steps of `dt_hours` in one vectorised
+`SodiumPlant.run` call. A slow tick therefore catches up in a larger batch
+instead of drifting, and the simulation clock does not depend on how often
+clients poll it. Pause, resume and speed changes re-anchor the clock, so
+simulated time never jumps. Each tick holds `lock`, so code that changes the
+plant off the event loop can exclude the pacer by holding it too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from typing import Any, Dict
+
+import numpy as np
+
+from plant_model import SodiumPlant, StepRecord
+from setpoint_schedule import SetpointSchedule
+
+
+class PacedSimulation:
+    """Asyncio task stepping a plant at `speed` simulated seconds per wall-clock second."""
+
+    def __init__(
+        self,
+        plant: SodiumPlant,
+        current_a: float,
+        dt_hours: float,
+        speed: float = 1.0,
+        schedule: SetpointSchedule | None = None,
+        tick_seconds: float = 0.05,
+        max_batch_steps: int = 100_000,
+        lock: asyncio.Lock | None = None,
+    ) -> None:
+        if dt_hours <= 0:
+            raise ValueError("dt_hours must be positive")
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.plant = plant
+        self.current_a = current_a
+        self.dt_hours = dt_hours
+        self.schedule = schedule
+        self.tick_seconds = tick_seconds
+        # Upper bound on one batch, so a long stall cannot block the loop.
+        self.max_batch_steps = max_batch_steps
+        self.lock = lock or asyncio.Lock()
+
+        self._speed = float(speed)
+        self._paused = False
+        self._task: asyncio.Task | None = None
+        # Wall-clock time and simulated hours the clock is anchored at.
+        self._anchor_wall = 0.0
+        self._anchor_hours = 0.0
+        self.steps_done = 0
+        self.batches = 0
+        # Last step, in the form `SodiumPlant.step` returns.
+        self.last: Dict[str, Any] = {}
+        self._record = StepRecord()
+
+    # ------------------------------------------------------------------ #
+    # Control
+    # ------------------------------------------------------------------ #
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def speed(self) -> float:
+        return self._speed
+
+    def start(self) -> None:
+        """Start the pacing task on the running event loop."""
+        if self.running:
+            return
+        self._reanchor()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def pause(self) -> None:
+        self._catch_up()
+        self._paused = True
+
+    def resume(self) -> None:
+        if self._paused:
+            self._paused = False
+            self._reanchor()
+
+    def set_speed(self, speed: float) -> None:
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self._catch_up()
+        self._speed = float(speed)
+        self._reanchor()
+
+    # ------------------------------------------------------------------ #
+    # Clock
+    # ------------------------------------------------------------------ #
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _reanchor(self) -> None:
+        self._anchor_wall = self._now()
+        self._anchor_hours = self.plant.state.time_hours
+
+    def lag_hours(self) -> float:
+        """Simulated hours the plant is behind the paced clock."""
+        if self._paused or not self.running:
+            return 0.0
+        target = self._anchor_hours + (self._now() - self._anchor_wall) * self._speed / 3600.0
+        return max(0.0, target - self.plant.state.time_hours)
+
+    def _catch_up(self) -> None:
+        """Advance by every whole step that is due now (at most one batch)."""
+        if self._paused or not self.running:
+            return
+        due = min(math.floor(self.lag_hours() / self.dt_hours), self.max_batch_steps)
+        if due > 0:
+            self._advance(due)
+
+    def _advance(self, steps: int) -> None:
+        plant = self.plant
+        if self.schedule is None:
+            columns = plant.run(np.full(steps, self.current_a), self.dt_hours)
+        else:
+            columns = plant.run_schedule(self.schedule, self.dt_hours, steps)
+        self._record.load_row(columns)
+        self.last = self._record.as_dict()
+        self.steps_done += steps
+        self.batches += 1
+
+    async def _run(self) -> None:
+        # Wake every tick rather than sleeping until the next step is due,
+        # so control calls take effect within one tick.
+        while True:
+            async with self.lock:
+                self._catch_up()
+            await asyncio.sleep(self.tick_seconds)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "paused": self._paused,
+            "speed": self._speed,
+            "time_hours": self.plant.state.time_hours,
+            "lag_hours": self.lag_hours(),
+            "steps_done": self.steps_done,
+            "batches": self.batches,
+            "last": self.last,
+        }
+
+
+if __name__ == "__main__":
+
+    async def demo() -> None:
+        pacer = PacedSimulation(SodiumPlant(), current_a=10_000.0, dt_hours=1.0 / 60.0, speed=3600.0)
+        pacer.start()
+        await asyncio.sleep(2.0)
+        print(f"After 2 s at 3600x: t={pacer.plant.state.time_hours:.3f} h, {pacer.batches} batches")
+        pacer.pause()
+        await asyncio.sleep(0.5)
+        print(f"Paused 0.5 s:       t={pacer.plant.state.time_hours:.3f} h")
+        pacer.resume()
+        pacer.set_speed(36_000.0)
+        await asyncio.sleep(1.0)
+        await pacer.stop()
+        print(f"1 s at 36000x:      t={pacer.plant.state.time_hours:.3f} h, {pacer.steps_done} steps")
+
+    asyncio.run(demo())
@@ -0,0 +1,176 @@
+"""Dispatch of parallel rectifier units for minimum AC draw.
+
+Each `RectifierUnit` has a DC rating and a tabulated efficiency curve over
+its load fraction. For a DC load P the fleet chooses which units run and how
+much each carries so that the AC draw, sum of p_i / eta_i(p_i), is minimal.
+
+The optimum is precomputed once per set of available units by dynamic
+programming over a grid of load levels (0 to the combined rating), giving a
+lookup table of unit loads per level. A load between two levels uses the
+commitment of the level above, scaled down, which is always feasible.
+Lookups are vectorised, so whole `SodiumPlant.run` batches are dispatched in
+one call; tables are rebuilt only when the set of available units changes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RectifierUnit:
+    """One transformer-rectifier: DC rating and efficiency vs. load fraction."""
+
+    name: str
+    rating_kw: float
+    load_fractions: Tuple[float, ...] = (0.1, 0.25, 0.5, 0.75, 1.0)
+    efficiencies: Tuple[float, ...] = (0.90, 0.945, 0.962, 0.966, 0.964)
+
+    def __post_init__(self) -> None:
+        if self.rating_kw <= 0:
+            raise ValueError(f"{self.name}: rating_kw must be positive")
+        if len(self.load_fractions) != len(self.efficiencies) or not self.load_fractions:
+            raise ValueError(f"{self.name}: efficiency curve needs matching, non-empty tables")
+        if np.any(np.diff(self.load_fractions) <= 0):
+            raise ValueError(f"{self.name}: load_fractions must be increasing")
+        if min(self.efficiencies) <= 0 or max(self.efficiencies) > 1:
+            raise ValueError(f"{self.name}: efficiencies must lie in (0, 1]")
+
+    def efficiency(self, dc_kw: np.ndarray) -> np.ndarray:
+        """Efficiency at a DC output, interpolated (held flat beyond the table)."""
+        return np.interp(np.asarray(dc_kw, dtype=float) / self.rating_kw, self.load_fractions, self.efficiencies)
+
+    def ac_power_kw(self, dc_kw: np.ndarray) -> np.ndarray:
+        dc_kw = np.asarray(dc_kw, dtype=float)
+        return np.where(dc_kw > 0, dc_kw / self.efficiency(dc_kw), 0.0)
+
+
+@dataclass
+class DispatchTable:
+    """Optimal unit loads at evenly spaced DC load levels."""
+
+    levels_kw: np.ndarray      # (L,)
+    loads_kw: np.ndarray       # (L, N) DC load per unit; unavailable units stay 0
+    ac_kw: np.ndarray          # (L,)
+
+
+class RectifierFleet:
+    """Parallel rectifier units with a cached optimal dispatch."""
+
+    def __init__(self, units: Sequence[RectifierUnit], n_levels: int = 2001) -> None:
+        if not units:
+            raise ValueError("a fleet needs at least one unit")
+        self.units = tuple(units)
+        self.n_levels = int(n_levels)
+        self._available: FrozenSet[int] = frozenset(range(len(self.units)))
+        self._tables: Dict[FrozenSet[int], DispatchTable] = {}
+
+    # ------------------------------------------------------------------ #
+    # Unit set
+    # ------------------------------------------------------------------ #
+    @property
+    def available(self) -> Tuple[str, ...]:
+        return tuple(self.units[i].name for i in sorted(self._available))
+
+    def set_available(self, names: Sequence[str]) -> None:
+        """Restrict dispatch to the named units (e.g. during an outage)."""
+        index = {unit.name: i for i, unit in enumerate(self.units)}
+        unknown = set(names) - index.keys()
+        if unknown:
+            raise ValueError(f"unknown rectifier units: {sorted(unknown)}")
+        self._available = frozenset(index[name] for name in names)
+
+    @property
+    def rating_kw(self) -> float:
+        return float(sum(self.units[i].rating_kw for i in self._available))
+
+    @property
+    def table(self) -> DispatchTable:
+        """Dispatch table of the current unit set, built on first use."""
+        table = self._tables.get(self._available)
+        if table is None:
+            table = self._tables[self._available] = self._build(sorted(self._available))
+        return table
+
+    def _build(self, available: Sequence[int]) -> DispatchTable:
+        n_units = len(self.units)
+        total = sum(self.units[i].rating_kw for i in available)
+        levels = np.linspace(0.0, total, self.n_levels) if total > 0 else np.zeros(1)
+        step = levels[1] - levels[0] if levels.size > 1 else 0.0
+        loads = np.zeros((levels.size, n_units))
+        if step == 0.0:
+            return DispatchTable(levels, loads, np.zeros(levels.size))
+
+        # cost[j]: least AC draw to supply level j with the units so far.
+        cost = np.full(levels.size, np.inf)
+        cost[0] = 0.0
+        choices = []
+        j = np.arange(levels.size)
+        for i in available:
+            unit = self.units[i]
+            k = np.arange(int(np.floor(unit.rating_kw / step * (1.0 + 1e-12))) + 1)
+            unit_ac = unit.ac_power_kw(k * step)
+            previous = j[:, None] - k[None, :]
+            candidates = np.where(previous >= 0, cost[np.maximum(previous, 0)], np.inf) + unit_ac[None, :]
+            best = np.argmin(candidates, axis=1)
+            cost = candidates[j, best]
+            choices.append((i, best))
+
+        # Walk the choices back from every level at once.
+        remaining = j.copy()
+        for i, best in reversed(choices):
+            k = best[remaining]
+            loads[:, i] = k * step
+            remaining = remaining - k
+        return DispatchTable(levels, loads, cost)
+
+    # ------------------------------------------------------------------ #
+    # Dispatch
+    # ------------------------------------------------------------------ #
+    def dispatch(self, dc_kw: np.ndarray | float) -> np.ndarray:
+        """
+        DC load per unit (shape (..., N)) for each requested DC load.
+
+        Loads above the fleet rating are capped at the rating.
+        """
+        table = self.table
+        dc = np.clip(np.asarray(dc_kw, dtype=float), 0.0, table.levels_kw[-1])
+        if table.levels_kw.size == 1:
+            return np.zeros(dc.shape + (len(self.units),))
+        step = table.levels_kw[1]
+        upper = np.minimum(np.ceil(dc / step).astype(np.int64), table.levels_kw.size - 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.where(upper > 0, dc / table.levels_kw[upper], 0.0)
+        return table.loads_kw[upper] * scale[..., None]
+
+    def ac_power_kw(self, dc_kw: np.ndarray | float) -> np.ndarray:
+        """AC draw of the optimal dispatch; inf where the load exceeds the rating."""
+        dc = np.asarray(dc_kw, dtype=float)
+        loads = self.dispatch(dc)
+        ac = sum(unit.ac_power_kw(loads[..., i]) for i, unit in enumerate(self.units))
+        return np.where(dc > self.table.levels_kw[-1] * (1.0 + 1e-12), np.inf, ac)
+
+    def efficiency(self, dc_kw: np.ndarray | float) -> np.ndarray:
+        """Overall DC/AC efficiency of the optimal dispatch (NaN at zero load)."""
+        dc = np.asarray(dc_kw, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(dc > 0, dc / self.ac_power_kw(dc), np.nan)
+
+
+if __name__ == "__main__":
+    fleet = RectifierFleet(
+        [
+            RectifierUnit("TR1", 20_000.0),
+            RectifierUnit("TR2", 20_000.0),
+            RectifierUnit("TR3", 10_000.0, efficiencies=(0.88, 0.93, 0.955, 0.96, 0.958)),
+        ]
+    )
+    loads = np.array([3_000.0, 12_000.0, 25_000.0, 42_000.0])
+    for dc, units, eff in zip(loads, fleet.dispatch(loads), fleet.efficiency(loads)):
+        shares = ", ".join(f"{u.name}={p:,.0f}" for u, p in zip(fleet.units, units))
+        print(f"{dc:>8,.0f} kW DC -> {shares} kW, efficiency {eff:.4f} (flat 0.96 would be {dc / 0.96:,.0f} kW AC)")
+    fleet.set_available(["TR1", "TR3"])
+    print(f"TR2 out: 25,000 kW DC at efficiency {float(fleet.efficiency(25_000.0)):.4f}")
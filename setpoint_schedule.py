@@ -0,0 +1,277 @@
+"""Current setpoint schedules: shift plans, ramps and curtailment windows.
+
+A `SetpointSchedule` is a list of segments, each either constant or a linear
+ramp between two currents, compiled into parallel arrays. Outside the
+segments the schedule falls back to `default_current_a` (e.g. 0 A for a
+curtailment gap); with `repeat_hours` set it repeats, so a daily shift plan
+is written once.
+
+The schedule is evaluated either pointwise (`current_at`, `currents_at`) or as
+per-step averages over fixed steps (`step_currents`, or lazily with
+`iter_step_currents`). Step averages integrate the schedule exactly, so the
+amp-hours delivered by a stepped run match the schedule even when a step
+straddles a boundary. `boundaries` lists the times where the schedule
+changes level or slope, for integrators that step exactly between them.
+
+JSON format::
+
+    {"default_current_a": 0, "repeat_hours": 24,
+     "segments": [{"start_hours": 0, "end_hours": 6, "current_a": 20000},
+                  {"start_hours": 6, "end_hours": 7, "from_current_a": 20000, "to_current_a": 50000}]}
+
+CSV format: columns ``start_hours, end_hours, start_current_a[, end_current_a]``
+with a header row; a missing end current means a constant segment.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class ScheduleSegment:
+    """Linear current from `start_current_a` to `end_current_a` over [start, end)."""
+
+    start_hours: float
+    end_hours: float
+    start_current_a: float
+    end_current_a: float
+
+    @classmethod
+    def constant(cls, start_hours: float, end_hours: float, current_a: float) -> "ScheduleSegment":
+        return cls(start_hours, end_hours, current_a, current_a)
+
+    @property
+    def is_ramp(self) -> bool:
+        return self.start_current_a != self.end_current_a
+
+
+class SetpointSchedule:
+    """Piecewise-constant / piecewise-linear current schedule, compiled to arrays."""
+
+    def __init__(
+        self,
+        segments: Sequence[ScheduleSegment],
+        default_current_a: float = 0.0,
+        repeat_hours: float | None = None,
+    ) -> None:
+        ordered = sorted(segments, key=lambda s: s.start_hours)
+        for seg in ordered:
+            if seg.end_hours <= seg.start_hours:
+                raise ValueError(f"segment ends before it starts: {seg}")
+        for prev, seg in zip(ordered, ordered[1:]):
+            if seg.start_hours < prev.end_hours:
+                raise ValueError(f"segments overlap at {seg.start_hours} h")
+        if repeat_hours is not None:
+            if repeat_hours <= 0:
+                raise ValueError("repeat_hours must be positive")
+            if ordered and (ordered[0].start_hours < 0 or ordered[-1].end_hours > repeat_hours):
+                raise ValueError("segments of a repeating schedule must lie within [0, repeat_hours]")
+
+        self.segments = ordered
+        self.default_current_a = float(default_current_a)
+        self.repeat_hours = repeat_hours
+
+        # Knots of the piecewise-linear current, including the default-current
+        # gaps, as (time, current just after) pairs plus a slope per piece.
+        knots: List[float] = []
+        values: List[float] = []
+        slopes: List[float] = []
+        cursor = 0.0 if repeat_hours is not None else -math.inf
+        for seg in ordered:
+            if seg.start_hours > cursor:
+                knots.append(cursor)
+                values.append(self.default_current_a)
+                slopes.append(0.0)
+            knots.append(seg.start_hours)
+            values.append(seg.start_current_a)
+            slopes.append((seg.end_current_a - seg.start_current_a) / (seg.end_hours - seg.start_hours))
+            cursor = seg.end_hours
+        end = repeat_hours if repeat_hours is not None else math.inf
+        if cursor < end or not knots:
+            knots.append(cursor)
+            values.append(self.default_current_a)
+            slopes.append(0.0)
+
+        self.knots = np.array(knots)
+        self.values = np.array(values)
+        self.slopes = np.array(slopes)
+        # Amp-hours from the first finite knot to each knot.
+        finite = np.where(np.isfinite(self.knots), self.knots, self.knots[1] if self.knots.size > 1 else 0.0)
+        widths = np.diff(finite)
+        pieces = self.values[:-1] * widths + 0.5 * self.slopes[:-1] * widths * widths
+        self._cumulative = np.concatenate(([0.0], np.cumsum(pieces)))
+        self._piece_ends = np.append(self.knots[1:], repeat_hours if repeat_hours is not None else math.inf)
+        self._cycle_amp_hours = None
+        if repeat_hours is not None:
+            self._cycle_amp_hours = float(self._integral_in_cycle(np.array([repeat_hours]))[0])
+
+    # ------------------------------------------------------------------ #
+    # Loading
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SetpointSchedule":
+        segments = []
+        for item in data.get("segments", []):
+            if "current_a" in item:
+                start_i = end_i = item["current_a"]
+            else:
+                start_i, end_i = item["from_current_a"], item["to_current_a"]
+            segments.append(ScheduleSegment(item["start_hours"], item["end_hours"], float(start_i), float(end_i)))
+        return cls(segments, data.get("default_current_a", 0.0), data.get("repeat_hours"))
+
+    @classmethod
+    def from_json(cls, path: str | Path) -> "SetpointSchedule":
+        with open(path) as fh:
+            return cls.from_dict(json.load(fh))
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: str | Path,
+        default_current_a: float = 0.0,
+        repeat_hours: float | None = None,
+    ) -> "SetpointSchedule":
+        segments = []
+        with open(path, newline="") as fh:
+            reader = csv.reader(fh)
+            next(reader, None)  # header
+            for row in reader:
+                if not row:
+                    continue
+                start, end, start_i = (float(v) for v in row[:3])
+                end_i = float(row[3]) if len(row) > 3 and row[3].strip() else start_i
+                segments.append(ScheduleSegment(start, end, start_i, end_i))
+        return cls(segments, default_current_a, repeat_hours)
+
+    @classmethod
+    def constant(cls, current_a: float) -> "SetpointSchedule":
+        return cls([], default_current_a=current_a)
+
+    # ------------------------------------------------------------------ #
+    # Evaluation
+    # ------------------------------------------------------------------ #
+    def _local(self, time_hours: np.ndarray) -> np.ndarray:
+        if self.repeat_hours is None:
+            return time_hours
+        return np.mod(time_hours, self.repeat_hours)
+
+    def _piece(self, local: np.ndarray) -> np.ndarray:
+        return np.clip(np.searchsorted(self.knots, local, side="right") - 1, 0, self.knots.size - 1)
+
+    def currents_at(self, time_hours: np.ndarray) -> np.ndarray:
+        """Requested current at each time."""
+        local = self._local(np.asarray(time_hours, dtype=float))
+        k = self._piece(local)
+        offset = np.where(self.slopes[k] != 0.0, local - self.knots[k], 0.0)
+        return self.values[k] + self.slopes[k] * offset
+
+    def current_at(self, time_hours: float) -> float:
+        return float(self.currents_at(np.array([time_hours]))[0])
+
+    def _integral_in_cycle(self, local: np.ndarray) -> np.ndarray:
+        k = self._piece(local)
+        start = self.knots[k]
+        # Before the first segment of a non-repeating schedule the current is
+        # the default; measure from the first finite knot (negative there).
+        start = np.where(np.isfinite(start), start, self.knots[1] if self.knots.size > 1 else 0.0)
+        width = local - start
+        return self._cumulative[k] + self.values[k] * width + 0.5 * self.slopes[k] * width * width
+
+    def amp_hours_between(self, t0: np.ndarray, t1: np.ndarray) -> np.ndarray:
+        """Integral of the schedule over [t0, t1], in amp-hours."""
+        return self._integral(np.asarray(t1, dtype=float)) - self._integral(np.asarray(t0, dtype=float))
+
+    def _integral(self, time_hours: np.ndarray) -> np.ndarray:
+        if self.repeat_hours is None:
+            return self._integral_in_cycle(time_hours)
+        cycles = np.floor(time_hours / self.repeat_hours)
+        return cycles * self._cycle_amp_hours + self._integral_in_cycle(time_hours - cycles * self.repeat_hours)
+
+    def step_currents(self, start_hours: float, dt_hours: float, steps: int) -> np.ndarray:
+        """Average current over each of `steps` consecutive steps of `dt_hours`."""
+        edges = start_hours + dt_hours * np.arange(steps + 1)
+        return self._averages(edges[:-1], edges[1:])
+
+    def _averages(self, t0: np.ndarray, t1: np.ndarray) -> np.ndarray:
+        """Average current over each interval [t0, t1]."""
+        average = self.amp_hours_between(t0, t1) / (t1 - t0)
+        # Intervals inside one constant piece get its value exactly rather
+        # than the round-off of a difference of integrals.
+        if self.repeat_hours is not None:
+            cycle_start = np.floor(t0 / self.repeat_hours) * self.repeat_hours
+            t0, t1 = t0 - cycle_start, t1 - cycle_start
+        k = self._piece(t0)
+        inside = (self.slopes[k] == 0.0) & (t1 <= self._piece_ends[k])
+        return np.where(inside, self.values[k], average)
+
+    def iter_step_currents(self, start_hours: float, dt_hours: float, chunk: int = 4096) -> Iterator[float]:
+        """Endless generator of step-average currents, evaluated `chunk` steps at a time."""
+        index = 0
+        while True:
+            for value in self.step_currents(start_hours + index * dt_hours, dt_hours, chunk):
+                yield float(value)
+            index += chunk
+
+    # ------------------------------------------------------------------ #
+    # Events
+    # ------------------------------------------------------------------ #
+    def boundaries(self, t0: float, t1: float) -> np.ndarray:
+        """Times in (t0, t1] where the schedule changes level or slope."""
+        knots = self.knots[np.isfinite(self.knots)]
+        if self.repeat_hours is None:
+            return knots[(knots > t0) & (knots <= t1)]
+        first = math.floor(t0 / self.repeat_hours)
+        last = math.floor(t1 / self.repeat_hours)
+        cycle = np.unique(np.concatenate((knots, [self.repeat_hours])))
+        times = (np.arange(first, last + 1)[:, None] * self.repeat_hours + cycle[None, :]).ravel()
+        return np.unique(times[(times > t0) & (times <= t1)])
+
+    def piecewise_constant(self, t0: float, t1: float, ramp_pieces: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate [t0, t1] by constant-current pieces.
+
+        Constant parts of the schedule map to one piece each; ramps are split
+        into `ramp_pieces` pieces at their average current, so the amp-hours
+        of every piece are exact. Returns the piece edges and currents, with
+        consecutive equal currents merged. An empty window (t1 <= t0) has
+        no pieces.
+        """
+        if t1 <= t0:
+            return np.array([t0], dtype=float), np.empty(0)
+        cuts = np.concatenate(([t0], self.boundaries(t0, t1)))
+        if cuts[-1] < t1:
+            cuts = np.append(cuts, t1)
+        fractions = np.linspace(0.0, 1.0, ramp_pieces + 1)[:-1]
+        edges = np.append((cuts[:-1, None] + np.diff(cuts)[:, None] * fractions[None, :]).ravel(), t1)
+        currents = self._averages(edges[:-1], edges[1:])
+        # Constant pieces come out as `ramp_pieces` equal values: merge them.
+        keep = np.concatenate(([True], currents[1:] != currents[:-1]))
+        return np.append(edges[:-1][keep], t1), currents[keep]
+
+
+if __name__ == "__main__":
+    plan = SetpointSchedule.from_dict(
+        {
+            "default_current_a": 0.0,
+            "repeat_hours": 24.0,
+            "segments": [
+                {"start_hours": 0.0, "end_hours": 6.0, "current_a": 60_000.0},
+                {"start_hours": 6.0, "end_hours": 8.0, "from_current_a": 60_000.0, "to_current_a": 20_000.0},
+                {"start_hours": 8.0, "end_hours": 14.0, "current_a": 20_000.0},
+                # 14:00-20:00 curtailed (default 0 A)
+                {"start_hours": 20.0, "end_hours": 24.0, "current_a": 40_000.0},
+            ],
+        }
+    )
+    print(f"Current at 07:00: {plan.current_at(7.0):,.0f} A, at 15:00: {plan.current_at(15.0):,.0f} A")
+    print(f"Amp-hours per day: {float(plan.amp_hours_between(0.0, 24.0)):,.0f} Ah")
+    print(f"Boundaries on day 2: {plan.boundaries(24.0, 48.0)}")
+    print(f"Hourly step averages: {np.round(plan.step_currents(0.0, 1.0, 24) / 1000.0, 1)} kA")
@@ -4,6 +4,10 @@ This module is intentionally kept free of any DWSIM/FreeCAD logic so it can be
 used as the mathematical "brain" from different front-ends (CLI, GUI, etc.).
 """
 
+FARADAY_CONSTANT = 96485.0  # Coulombs/mol
+MOLAR_MASS_SODIUM = 22.99   # g/mol
+VALENCY = 1.0               # n
+
 
 def calculate_sodium_production(amperes: float, hours: float, efficiency: float = 0.90) -> float:
     """
@@ -11,10 +15,6 @@ def calculate_sodium_production(amperes: float, hours: float, efficiency: float
 
     m = (I * t * M) / (n * F)
     """
-    FARADAY_CONSTANT = 96485.0  # Coulombs/mol
-    MOLAR_MASS_SODIUM = 22.99   # g/mol
-    VALENCY = 1.0               # n
-
     seconds = hours * 3600.0
     mass_grams = (amperes * seconds * MOLAR_MASS_SODIUM) / (VALENCY * FARADAY_CONSTANT)
     return (mass_grams / 1000.0) * efficiency
@@ -52,7 +52,6 @@ def time_hours_for_naoh_mass(
     if current_a <= 0 or naoh_mass_kg <= 0:
         return 0.0
 
-    FARADAY_CONSTANT = 96485.0  # C/mol
     MOLAR_MASS_NAOH = 40.0      # g/mol
 
     total_grams = naoh_mass_kg * 1000.0
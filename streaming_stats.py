@@ -0,0 +1,246 @@
+"""Streaming KPI statistics for long simulations, in constant memory.
+
+`StreamingStats` attaches to a `SodiumPlant` (``plant.stats = StreamingStats()``)
+and is fed every step by `step`/`step_into`, every batch by `run` and every
+closed-form segment by `advance` (as one step over its producing hours). Per
+tracked step field it keeps the count, mean and variance (Welford, merged a
+batch at a time), min and max, the time-weighted mean and quantiles from a
+t-digest. It also accumulates hours per `constraint_reason` and in
+maintenance, and the energy and sodium totals behind the specific energy.
+
+Steps are written into a fixed-size buffer and folded into the running
+statistics with NumPy when it fills, so the per-step cost is a single row
+write and memory does not grow with the run length.
+"""
+
+from __future__ import annotations
+
+import math
+import operator
+from typing import TYPE_CHECKING, Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from electrical_model import CONSTRAINT_REASONS
+
+if TYPE_CHECKING:
+    from plant_model import StepRecord
+
+
+DEFAULT_FIELDS = (
+    "actual_current_a",
+    "cell_voltage_v",
+    "dc_power_kw",
+    "ac_power_kw",
+    "na_collected_kg",
+    "step_margin",
+    "cell_temp_c",
+)
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+# Fields the totals (energy, sodium) are computed from.
+_REQUIRED_FIELDS = ("dc_power_kw", "na_collected_kg")
+
+
+class TDigest:
+    """
+    Merging t-digest: a sorted set of weighted centroids approximating a
+    distribution, accurate in the tails, with about `compression / 2`
+    centroids however many values are added.
+    """
+
+    def __init__(self, compression: float = 200.0) -> None:
+        self.compression = float(compression)
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> None:
+        """Merge a batch of values into the digest."""
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        means = np.concatenate((self.means, values))
+        weights = np.concatenate((self.weights, np.ones(values.size)))
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # k1 scale function: clusters span at most one unit of k, so they are
+        # small near q = 0 and q = 1 and large around the median.
+        cumulative = np.cumsum(weights)
+        q_mid = (cumulative - 0.5 * weights) / cumulative[-1]
+        k = np.floor(self.compression / (2.0 * math.pi) * np.arcsin(2.0 * q_mid - 1.0))
+        starts = np.flatnonzero(np.concatenate(([True], k[1:] != k[:-1])))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float | np.ndarray) -> np.ndarray:
+        """Approximate quantile(s) `q` in [0, 1]; NaN while empty."""
+        q = np.asarray(q, dtype=float)
+        if self.weights.size == 0:
+            return np.full(q.shape, np.nan)
+        total = self.weights.sum()
+        centres = np.cumsum(self.weights) - 0.5 * self.weights
+        return np.interp(
+            q * total,
+            np.concatenate(([0.0], centres, [total])),
+            np.concatenate(([self.min], self.means, [self.max])),
+        )
+
+
+class StreamingStats:
+    """Constant-memory running statistics over the steps of a plant run."""
+
+    def __init__(
+        self,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        compression: float = 200.0,
+        buffer_steps: int = 4096,
+    ) -> None:
+        self.fields: Tuple[str, ...] = tuple(fields) + tuple(f for f in _REQUIRED_FIELDS if f not in fields)
+        self.quantiles = tuple(quantiles)
+        width = len(self.fields)
+
+        self.count = 0
+        self.mean = np.zeros(width)
+        self._m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self._weighted_sum = np.zeros(width)
+        self.digests = [TDigest(compression) for _ in self.fields]
+
+        self.producing_hours = 0.0
+        self.maintenance_hours = 0.0
+        self.reason_hours = np.zeros(len(CONSTRAINT_REASONS))
+        self.energy_kwh = 0.0
+        self.na_kg = 0.0
+
+        self._get = operator.attrgetter(*self.fields)
+        self._power = self.fields.index("dc_power_kw")
+        self._na = self.fields.index("na_collected_kg")
+        self._values = np.empty((buffer_steps, width))
+        self._dt = np.empty(buffer_steps)
+        self._codes = np.empty(buffer_steps, dtype=np.int64)
+        self._used = 0
+
+    # ------------------------------------------------------------------ #
+    # Feeding
+    # ------------------------------------------------------------------ #
+    def record(self, out: "StepRecord", dt_hours: float) -> None:
+        """Add one step, as written by `SodiumPlant.step_into`."""
+        if out.in_maintenance:
+            self.maintenance_hours += dt_hours
+            return
+        i = self._used
+        values = self._get(out)
+        self._values[i] = values if len(self.fields) > 1 else (values,)
+        self._dt[i] = dt_hours
+        self._codes[i] = out.constraint_code
+        self._used = i + 1
+        if self._used == self._dt.size:
+            self.flush()
+
+    def record_columns(self, columns: Dict[str, np.ndarray], dt_hours: float, constraint_code: np.ndarray) -> None:
+        """Add a batch of steps as returned by `SodiumPlant.run`."""
+        producing = ~np.asarray(columns["in_maintenance"], dtype=bool)
+        self.maintenance_hours += float(np.count_nonzero(~producing)) * dt_hours
+        if not producing.any():
+            return
+        self.flush()
+        values = np.column_stack([np.asarray(columns[key])[producing] for key in self.fields])
+        self._merge(values, np.full(values.shape[0], float(dt_hours)), np.asarray(constraint_code)[producing])
+
+    def flush(self) -> None:
+        """Fold the buffered steps into the running statistics."""
+        used = self._used
+        if used:
+            self._used = 0
+            self._merge(self._values[:used], self._dt[:used], self._codes[:used])
+
+    def _merge(self, values: np.ndarray, dt: np.ndarray, codes: np.ndarray) -> None:
+        n = values.shape[0]
+        batch_mean = values.mean(axis=0)
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+        # Chan et al. pairwise update of Welford's running mean and M2.
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self._m2 = self._m2 + batch_m2 + delta * delta * (self.count * n / total)
+        self.count = total
+
+        self.min = np.minimum(self.min, values.min(axis=0))
+        self.max = np.maximum(self.max, values.max(axis=0))
+        self._weighted_sum += dt @ values
+        for column, digest in enumerate(self.digests):
+            digest.update(values[:, column])
+
+        self.producing_hours += float(dt.sum())
+        self.reason_hours += np.bincount(codes, weights=dt, minlength=len(CONSTRAINT_REASONS))
+        self.energy_kwh += float(dt @ values[:, self._power])
+        self.na_kg += float(values[:, self._na].sum())
+
+    # ------------------------------------------------------------------ #
+    # Results
+    # ------------------------------------------------------------------ #
+    @property
+    def variance(self) -> np.ndarray:
+        self.flush()
+        return self._m2 / (self.count - 1) if self.count > 1 else np.full(len(self.fields), np.nan)
+
+    @property
+    def specific_energy_kwh_per_kg(self) -> float:
+        self.flush()
+        return self.energy_kwh / self.na_kg if self.na_kg > 0 else math.nan
+
+    def summary(self) -> Dict[str, Any]:
+        """KPIs so far: totals, hours per constraint reason and per-field statistics."""
+        self.flush()
+        std = np.sqrt(self.variance)
+        time_weighted = self._weighted_sum / self.producing_hours if self.producing_hours > 0 else self.mean * np.nan
+        per_field = {}
+        for column, key in enumerate(self.fields):
+            stats = {
+                "mean": float(self.mean[column]) if self.count else math.nan,
+                "std": float(std[column]),
+                "min": float(self.min[column]) if self.count else math.nan,
+                "max": float(self.max[column]) if self.count else math.nan,
+                "time_weighted_mean": float(time_weighted[column]),
+            }
+            for q, value in zip(self.quantiles, self.digests[column].quantile(self.quantiles)):
+                stats[f"p{100 * q:g}"] = float(value)
+            per_field[key] = stats
+        return {
+            "steps": self.count,
+            "producing_hours": self.producing_hours,
+            "maintenance_hours": self.maintenance_hours,
+            "constraint_hours": dict(zip(CONSTRAINT_REASONS, self.reason_hours.tolist())),
+            "energy_kwh": self.energy_kwh,
+            "na_kg": self.na_kg,
+            "specific_energy_kwh_per_kg": self.specific_energy_kwh_per_kg,
+            "fields": per_field,
+        }
+
+
+if __name__ == "__main__":
+    from plant_model import SodiumPlant
+
+    plant = SodiumPlant()
+    plant.stats = StreamingStats()
+    rng = np.random.default_rng(0)
+    for current_a in rng.uniform(5_000.0, 40_000.0, 100_000):
+        plant.step(requested_current_a=float(current_a), dt_hours=0.1)
+
+    summary = plant.stats.summary()
+    print(f"Specific energy: {summary['specific_energy_kwh_per_kg']:.2f} kWh/kg Na")
+    print(f"Peak AC power:   {summary['fields']['ac_power_kw']['max']:,.0f} kW")
+    print(f"Hours per constraint: {summary['constraint_hours']}, maintenance {summary['maintenance_hours']:.1f} h")
+    margin = summary["fields"]["step_margin"]
+    print(f"Step margin p5/p50/p95: {margin['p5']:.2f} / {margin['p50']:.2f} / {margin['p95']:.2f}")
@@ -0,0 +1,261 @@
+"""Electricity tariffs: time-varying energy prices and demand charges.
+
+A `Tariff` is a piecewise-constant price series (price i applies from
+`start_hours[i]` until the next start; the first and last prices extend to
+-inf / +inf) plus an optional demand charge per kW of peak AC power in each
+billing period. `SodiumPlant` consults it instead of
+`PlantConfig.power_cost_per_kwh` when one is attached.
+
+Lookups are O(1) for regularly spaced series (hourly, 15-minute, ...) and
+O(log n) otherwise. The price integral is precomputed as a running sum, so
+the cost of any interval, or of a whole batch of step intervals, is a couple
+of lookups. Billing periods have a fixed length (730 h, about one month, by
+default); running peaks are tracked incrementally in a `DemandMeter`.
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class DemandMeter:
+    """Peak AC power seen so far in the current billing period."""
+
+    period: int = -1
+    peak_kw: float = 0.0
+
+
+class Tariff:
+    """Piecewise-constant energy price series with an optional demand charge."""
+
+    def __init__(
+        self,
+        start_hours: np.ndarray,
+        price_per_kwh: np.ndarray,
+        demand_charge_per_kw: float = 0.0,
+        billing_period_hours: float = 730.0,
+    ) -> None:
+        starts = np.asarray(start_hours, dtype=float)
+        prices = np.asarray(price_per_kwh, dtype=float)
+        if starts.ndim != 1 or starts.shape != prices.shape or starts.size == 0:
+            raise ValueError("start_hours and price_per_kwh must be equally long, non-empty 1-D arrays")
+        steps = np.diff(starts)
+        if np.any(steps <= 0):
+            raise ValueError("start_hours must be strictly increasing")
+        if billing_period_hours <= 0:
+            raise ValueError("billing_period_hours must be positive")
+
+        self.start_hours = starts
+        self.price_per_kwh = prices
+        self.demand_charge_per_kw = float(demand_charge_per_kw)
+        self.billing_period_hours = float(billing_period_hours)
+
+        # Price-hours accumulated from start_hours[0] to each start.
+        self._cumulative = np.concatenate(([0.0], np.cumsum(prices[:-1] * steps)))
+        # Constant spacing allows index arithmetic instead of a search.
+        self._spacing = float(steps[0]) if steps.size and np.all(steps == steps[0]) else None
+        self._origin = float(starts[0])
+        self._last = starts.size - 1
+
+    # ------------------------------------------------------------------ #
+    # Construction
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def flat(cls, price_per_kwh: float, demand_charge_per_kw: float = 0.0) -> "Tariff":
+        return cls(np.zeros(1), np.array([price_per_kwh]), demand_charge_per_kw)
+
+    def with_price_from(self, time_hours: float, price_per_kwh: float) -> "Tariff":
+        """Copy whose price is `price_per_kwh` from `time_hours` on, replacing later pieces."""
+        keep = self.start_hours < time_hours
+        return Tariff(
+            np.append(self.start_hours[keep], time_hours),
+            np.append(self.price_per_kwh[keep], price_per_kwh),
+            self.demand_charge_per_kw,
+            self.billing_period_hours,
+        )
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: str | Path,
+        time_column: int = 0,
+        price_column: int = 1,
+        chunk_rows: int = 65_536,
+        demand_charge_per_kw: float = 0.0,
+        billing_period_hours: float = 730.0,
+    ) -> "Tariff":
+        """
+        Load a price series from a CSV file, reading `chunk_rows` rows at a time.
+
+        The time column holds either hours (numbers) or ISO timestamps, which
+        are converted to hours since the first row. A header row is skipped.
+        """
+        times: List[np.ndarray] = []
+        prices: List[np.ndarray] = []
+        origin: datetime | None = None
+        with open(path, newline="") as fh:
+            reader = csv.reader(fh)
+            chunk_t: List[float] = []
+            chunk_p: List[float] = []
+            for row in reader:
+                if not row:
+                    continue
+                raw_t, raw_p = row[time_column].strip(), row[price_column].strip()
+                try:
+                    price = float(raw_p)
+                except ValueError:
+                    if not times and not chunk_t:
+                        continue  # header
+                    raise
+                try:
+                    t = float(raw_t)
+                except ValueError:
+                    stamp = datetime.fromisoformat(raw_t)
+                    origin = origin or stamp
+                    t = (stamp - origin).total_seconds() / 3600.0
+                chunk_t.append(t)
+                chunk_p.append(price)
+                if len(chunk_t) >= chunk_rows:
+                    times.append(np.array(chunk_t))
+                    prices.append(np.array(chunk_p))
+                    chunk_t, chunk_p = [], []
+            if chunk_t:
+                times.append(np.array(chunk_t))
+                prices.append(np.array(chunk_p))
+        if not times:
+            raise ValueError(f"no prices found in {path}")
+        return cls(np.concatenate(times), np.concatenate(prices), demand_charge_per_kw, billing_period_hours)
+
+    @classmethod
+    def from_npy(
+        cls,
+        path: str | Path,
+        demand_charge_per_kw: float = 0.0,
+        billing_period_hours: float = 730.0,
+    ) -> "Tariff":
+        """Memory-map a (n, 2) array of (start_hours, price) written by `save_npy`."""
+        table = np.load(path, mmap_mode="r")
+        return cls(table[:, 0], table[:, 1], demand_charge_per_kw, billing_period_hours)
+
+    def save_npy(self, path: str | Path) -> None:
+        np.save(path, np.column_stack((self.start_hours, self.price_per_kwh)))
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+    def _index(self, time_hours: float) -> int:
+        if self._spacing is not None:
+            k = math.floor((time_hours - self._origin) / self._spacing)
+        else:
+            k = int(np.searchsorted(self.start_hours, time_hours, side="right")) - 1
+        return min(max(k, 0), self._last)
+
+    def _indices(self, time_hours: np.ndarray) -> np.ndarray:
+        if self._spacing is not None:
+            k = np.floor((time_hours - self._origin) / self._spacing).astype(np.int64)
+        else:
+            k = np.searchsorted(self.start_hours, time_hours, side="right") - 1
+        return np.clip(k, 0, self._last)
+
+    def price_at(self, time_hours: float) -> float:
+        return float(self.price_per_kwh[self._index(time_hours)])
+
+    def prices_at(self, time_hours: np.ndarray) -> np.ndarray:
+        return self.price_per_kwh[self._indices(np.asarray(time_hours, dtype=float))]
+
+    def _price_hours(self, time_hours: float) -> float:
+        k = self._index(time_hours)
+        return float(self._cumulative[k] + self.price_per_kwh[k] * (time_hours - self.start_hours[k]))
+
+    def _price_hours_array(self, time_hours: np.ndarray) -> np.ndarray:
+        k = self._indices(time_hours)
+        return self._cumulative[k] + self.price_per_kwh[k] * (time_hours - self.start_hours[k])
+
+    # ------------------------------------------------------------------ #
+    # Energy cost
+    # ------------------------------------------------------------------ #
+    def energy_cost(self, t0: float, t1: float, power_kw: float) -> float:
+        """Cost of drawing a constant `power_kw` from t0 to t1."""
+        if t1 - t0 <= 0:
+            return 0.0
+        return power_kw * (self._price_hours(t1) - self._price_hours(t0))
+
+    def energy_costs(self, t0: np.ndarray, t1: np.ndarray, power_kw: np.ndarray) -> np.ndarray:
+        """`energy_cost` for a batch of intervals in one call."""
+        t0 = np.asarray(t0, dtype=float)
+        t1 = np.asarray(t1, dtype=float)
+        return power_kw * (self._price_hours_array(t1) - self._price_hours_array(t0))
+
+    def pieces(self, t0: float, t1: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Split [t0, t1] where the price changes.
+
+        Returns the piece boundaries (t0, interior starts..., t1) and the
+        price on each piece.
+        """
+        lo = int(np.searchsorted(self.start_hours, t0, side="right"))
+        hi = int(np.searchsorted(self.start_hours, t1, side="left"))
+        edges = np.concatenate(([t0], self.start_hours[lo:hi], [t1]))
+        return edges, self.price_per_kwh[self._indices(edges[:-1])]
+
+    # ------------------------------------------------------------------ #
+    # Demand charges
+    # ------------------------------------------------------------------ #
+    def billing_period(self, time_hours: float) -> int:
+        return math.floor(time_hours / self.billing_period_hours)
+
+    def demand_charge(self, meter: DemandMeter, time_hours: float, power_kw: float) -> float:
+        """
+        Record `power_kw` drawn at `time_hours` and return the demand charge it
+        adds: the rate times the rise of this billing period's peak.
+        """
+        period = self.billing_period(time_hours)
+        if period != meter.period:
+            meter.period = period
+            meter.peak_kw = 0.0
+        if power_kw <= meter.peak_kw:
+            return 0.0
+        added = self.demand_charge_per_kw * (power_kw - meter.peak_kw)
+        meter.peak_kw = power_kw
+        return added
+
+    def demand_charges(self, meter: DemandMeter, time_hours: np.ndarray, power_kw: np.ndarray) -> np.ndarray:
+        """`demand_charge` for a time-ordered batch of samples, in one call."""
+        time_hours = np.asarray(time_hours, dtype=float)
+        power_kw = np.asarray(power_kw, dtype=float)
+        charges = np.zeros(power_kw.shape)
+        if power_kw.size == 0:
+            return charges
+        periods = np.floor(time_hours / self.billing_period_hours).astype(np.int64)
+        # Periods are contiguous runs because time only moves forward.
+        bounds = np.flatnonzero(np.diff(periods)) + 1
+        for lo, hi in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [periods.size]))):
+            period = int(periods[lo])
+            start_peak = meter.peak_kw if period == meter.period else 0.0
+            running = np.maximum.accumulate(np.concatenate(([start_peak], power_kw[lo:hi])))
+            charges[lo:hi] = self.demand_charge_per_kw * np.diff(running)
+            meter.period = period
+            meter.peak_kw = float(running[-1])
+        return charges
+
+
+if __name__ == "__main__":
+    # A year of 15-minute prices: cheap nights, expensive afternoons.
+    starts = np.arange(0.0, 8760.0, 0.25)
+    hour_of_day = starts % 24.0
+    prices = np.where((hour_of_day >= 14) & (hour_of_day < 20), 0.22, np.where(hour_of_day < 6, 0.06, 0.11))
+    tariff = Tariff(starts, prices, demand_charge_per_kw=12.0)
+
+    print(f"Price at 03:00: {tariff.price_at(3.0):.2f} $/kWh, at 15:00: {tariff.price_at(15.0):.2f} $/kWh")
+    print(f"1 MW for a day: ${tariff.energy_cost(0.0, 24.0, 1_000.0):,.2f}")
+    meter = DemandMeter()
+    charges = tariff.demand_charges(meter, starts[:96], np.linspace(500.0, 900.0, 96))
+    print(f"Demand charge for a rising day: ${charges.sum():,.2f} (peak {meter.peak_kw:.0f} kW)")
@@ -0,0 +1,44 @@
+import dataclasses
+
+from parameter_sweep import cache_key, evaluate_point
+from plant_model import PlantConfig, SodiumPlant
+from process_mvp import Scenario
+from setpoint_schedule import SetpointSchedule
+
+
+def _schedule(ramp_to_a: float = 12_000.0) -> SetpointSchedule:
+    return SetpointSchedule.from_dict(
+        {
+            "repeat_hours": 24,
+            "segments": [
+                {"start_hours": 0, "end_hours": 12, "current_a": 8_000},
+                {"start_hours": 12, "end_hours": 24, "from_current_a": 8_000, "to_current_a": ramp_to_a},
+            ],
+        }
+    )
+
+
+def test_cache_key_depends_on_scenario_and_compiled_config_only():
+    cfg = PlantConfig()
+    key = cache_key(Scenario(), cfg)
+    assert cache_key(Scenario(), PlantConfig()) == key
+    assert cache_key(Scenario(current_a=12_000.0), cfg) != key
+    assert cache_key(Scenario(), dataclasses.replace(cfg, power_cost_per_kwh=0.2)) != key
+
+
+def test_cache_key_covers_the_schedule():
+    cfg = PlantConfig()
+    key = cache_key(Scenario(schedule=_schedule()), cfg)
+    assert cache_key(Scenario(schedule=_schedule()), cfg) == key
+    assert cache_key(Scenario(schedule=_schedule(ramp_to_a=14_000.0)), cfg) != key
+    assert cache_key(Scenario(), cfg) != key
+
+
+def test_evaluate_point_runs_the_schedule():
+    scenario = Scenario(schedule=_schedule(), total_hours=48.0)
+    summary = evaluate_point(scenario, PlantConfig())
+
+    plant = SodiumPlant(PlantConfig())
+    plant.run_schedule(scenario.schedule, scenario.dt_hours, 48)
+    assert summary["total_na_kg"] == plant.state.cumulative_na_produced_kg
+    assert summary["total_na_kg"] != evaluate_point(Scenario(total_hours=48.0), PlantConfig())["total_na_kg"]
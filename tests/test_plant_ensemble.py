@@ -0,0 +1,21 @@
+import numpy as np
+
+from plant_ensemble import PlantEnsemble, stack_configs
+from plant_model import PlantConfig, SodiumPlant
+from thermal_model import ThermalConfig
+
+
+def test_ensemble_temperatures_match_step_exactly():
+    capacities = np.linspace(1.0e5, 3.0e5, 16)
+    configs = [
+        PlantConfig(thermal=ThermalConfig(heat_capacity_kj_per_k=c, loss_coefficient_kw_per_k=0.1, heater_power_kw=20.0))
+        for c in capacities
+    ]
+    ensemble = PlantEnsemble(stack_configs(configs), len(configs))
+    plants = [SodiumPlant(cfg) for cfg in configs]
+    for dt_hours in np.linspace(0.1, 3.0, 50):
+        ensemble.step(np.full(len(plants), 10_000.0), dt_hours)
+        for plant in plants:
+            plant.step(10_000.0, dt_hours)
+
+    assert np.array_equal(ensemble.cell_temp_c, [plant.state.cell_temp_c for plant in plants])
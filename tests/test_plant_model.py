@@ -0,0 +1,128 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from electrode_model import ElectrodeConfig
+from plant_model import STEP_FIELDS, PlantConfig, SodiumPlant
+from rectifier_dispatch import RectifierFleet, RectifierUnit
+from tariff import Tariff
+from thermal_model import ThermalConfig
+
+
+def _demand_plant(amp_hours_limit: float = 1.0e12) -> SodiumPlant:
+    cfg = PlantConfig(electrodes=ElectrodeConfig(amp_hours_limit=amp_hours_limit))
+    return SodiumPlant(cfg, tariff=Tariff([0.0], [0.0], demand_charge_per_kw=10.0))
+
+
+def test_advance_to_billing_boundary_bills_closing_period_only():
+    advanced, stepped = _demand_plant(), _demand_plant()
+    advanced.advance(hours=730.0, current_a=10_000.0)
+    stepped.run(np.array([10_000.0]), 730.0)
+    assert advanced.state.cumulative_cost == pytest.approx(stepped.state.cumulative_cost)
+    assert advanced.demand.period == stepped.demand.period == 0
+
+    # The next period bills its own peak once.
+    advanced.advance(hours=10.0, current_a=10_000.0)
+    stepped.run(np.array([10_000.0]), 10.0)
+    assert advanced.state.cumulative_cost == pytest.approx(stepped.state.cumulative_cost)
+
+
+def test_exact_wear_step_to_billing_boundary_matches_run():
+    exact, stepped = _demand_plant(), _demand_plant()
+    exact.step(10_000.0, 730.0, exact_wear=True)
+    stepped.run(np.array([10_000.0]), 730.0)
+    assert exact.state.cumulative_cost == pytest.approx(stepped.state.cumulative_cost)
+
+
+def test_maintenance_on_billing_boundary_bills_closing_period_only():
+    # Electrodes reach maintenance exactly at the end of the first period.
+    limit = 10_000.0 * 730.0 / 0.9
+    advanced, stepped = _demand_plant(limit), _demand_plant(limit)
+    advanced.advance(hours=1_000.0, current_a=10_000.0)
+    stepped.run(np.full(1_000, 10_000.0), 1.0)
+    assert advanced.state.electrode_state.in_maintenance
+    assert advanced.demand.period == 0
+    assert advanced.state.cumulative_cost == pytest.approx(stepped.state.cumulative_cost)
+
+
+def test_config_is_frozen_and_replace_recompiles_the_kernel():
+    plant = SodiumPlant()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        plant.cfg.electrical.max_dc_current_a = 32_000.0
+
+    plant.cfg = dataclasses.replace(
+        plant.cfg, electrical=dataclasses.replace(plant.cfg.electrical, max_dc_current_a=32_000.0)
+    )
+    twin = plant.fork()
+    assert plant.step(80_000.0, 1.0)["actual_current_a"] == 32_000.0
+    assert twin.run(np.array([80_000.0]), 1.0)["actual_current_a"][0] == 32_000.0
+
+
+def test_rectifier_fleet_caps_the_power_limit_at_its_rating():
+    fleet = RectifierFleet([RectifierUnit("A", 300.0), RectifierUnit("B", 300.0)])
+    plant = SodiumPlant(PlantConfig(electrodes=ElectrodeConfig(amp_hours_limit=1e12)))
+    plant.rectifiers = fleet
+
+    columns = plant.run(np.full(4, 90_000.0), 1.0)
+    assert np.allclose(columns["dc_power_kw"], 600.0)
+    assert np.all(np.isfinite(columns["ac_power_kw"]))
+    assert np.isfinite(plant.state.cumulative_cost)
+
+    fleet.set_available(["A"])
+    assert plant.step(90_000.0, 1.0)["dc_power_kw"] == pytest.approx(300.0)
+
+
+def _wearing_config() -> PlantConfig:
+    return PlantConfig(
+        electrodes=ElectrodeConfig(amp_hours_limit=4.0e6),
+        thermal=ThermalConfig(heat_capacity_kj_per_k=2.0e5, loss_coefficient_kw_per_k=0.1, heater_power_kw=20.0),
+    )
+
+
+def test_run_matches_step_including_maintenance():
+    profile = np.random.default_rng(1).uniform(5_000.0, 30_000.0, 300)
+    ran, stepped = SodiumPlant(_wearing_config()), SodiumPlant(_wearing_config())
+    columns = ran.run(profile, 1.0)
+    rows = [stepped.step(current_a, 1.0) for current_a in profile]
+
+    assert 0 < columns["in_maintenance"].sum() < profile.size
+    for k, row in enumerate(rows):
+        assert columns["in_maintenance"][k] == ("status" in row)
+        if "status" not in row:
+            assert {key: columns[key][k] for key in STEP_FIELDS} == row
+    assert ran.state == stepped.state
+
+
+@pytest.mark.parametrize(("steps", "exact_wear", "rel"), [(300, True, 1e-9), (30_000, False, 1e-4)])
+def test_advance_matches_fine_steps(steps, exact_wear, rel):
+    advanced, stepped = SodiumPlant(_wearing_config()), SodiumPlant(_wearing_config())
+    advanced.advance(hours=300.0, current_a=15_000.0)
+    for _ in range(steps):
+        stepped.step(15_000.0, 300.0 / steps, exact_wear=exact_wear)
+
+    a, s = advanced.state, stepped.state
+    assert a.electrode_state.in_maintenance and s.electrode_state.in_maintenance
+    assert a.time_hours == pytest.approx(s.time_hours)
+    assert a.electrode_state.cumulative_amp_hours == pytest.approx(s.electrode_state.cumulative_amp_hours, rel=rel)
+    assert a.cumulative_na_produced_kg == pytest.approx(s.cumulative_na_produced_kg, rel=rel)
+    assert a.cumulative_revenue == pytest.approx(s.cumulative_revenue, rel=rel)
+    assert a.cumulative_cost == pytest.approx(s.cumulative_cost, rel=rel)
+
+
+def test_snapshot_restore_and_fork_replay_the_same_future():
+    profile = np.random.default_rng(2).uniform(5_000.0, 30_000.0, 200)
+    plant = SodiumPlant(_wearing_config())
+    plant.run(profile[:50], 1.0)
+    snapshot = plant.snapshot()
+    twin = plant.fork()
+
+    first = plant.run(profile, 1.0)
+    end_state = dataclasses.replace(plant.state)
+    plant.restore(snapshot)
+    replays = [plant.run(profile, 1.0), twin.run(profile, 1.0), SodiumPlant.from_snapshot(snapshot).run(profile, 1.0)]
+
+    for columns in replays:
+        for key in first:
+            np.testing.assert_array_equal(columns[key], first[key])
+    assert plant.state == twin.state == end_state
@@ -0,0 +1,99 @@
+"""Lumped thermal model of the cell.
+
+The cell and its melt are one thermal mass C (kJ/K) heated by the Joule heat
+of the DC power and an external heater, and cooled to ambient through a
+loss coefficient UA (kW/K):
+
+    C dT/dt = joule_heat_fraction * P_dc + P_heater - UA * (T - T_ambient)
+
+With the heating held constant over a step this is linear, and the update
+
+    T_eq = T_ambient + (joule_heat_fraction * P_dc + P_heater) / UA
+    T(t + dt) = T_eq + (T(t) - T_eq) * exp(-UA * dt / C)
+
+is exact for any dt, so large steps stay stable. The default heat capacity is
+infinite: the temperature then stays at `initial_temp_c` (600 °C), the fixed
+temperature the plant model used before the thermal model existed.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ThermalConfig:
+    """Parameters of the lumped cell heat balance."""
+
+    heat_capacity_kj_per_k: float = math.inf  # inf: temperature held at initial_temp_c
+    loss_coefficient_kw_per_k: float = 0.1    # UA to ambient
+    ambient_temp_c: float = 25.0
+    heater_power_kw: float = 0.0
+    joule_heat_fraction: float = 1.0          # share of DC power released as heat in the cell
+    initial_temp_c: float = 600.0
+
+
+def relax_temperature(temp_c: float, dc_power_kw: float, dt_hours: float, cfg: ThermalConfig) -> float:
+    """Cell temperature after `dt_hours` at constant `dc_power_kw`."""
+    capacity = cfg.heat_capacity_kj_per_k
+    if math.isinf(capacity):
+        return temp_c
+    heat_kw = cfg.joule_heat_fraction * dc_power_kw + cfg.heater_power_kw
+    ua = cfg.loss_coefficient_kw_per_k
+    if ua <= 0:
+        return temp_c + heat_kw * dt_hours * 3600.0 / capacity
+    t_eq = cfg.ambient_temp_c + heat_kw / ua
+    return t_eq + (temp_c - t_eq) * math.exp(-ua * dt_hours * 3600.0 / capacity)
+
+
+def hours_to_temperature(temp_c: float, dc_power_kw: float, target_c: float, cfg: ThermalConfig) -> float:
+    """Hours at constant `dc_power_kw` until the cell reaches `target_c` (inf if never)."""
+    capacity = cfg.heat_capacity_kj_per_k
+    if math.isinf(capacity) or temp_c == target_c:
+        return math.inf if temp_c != target_c else 0.0
+    heat_kw = cfg.joule_heat_fraction * dc_power_kw + cfg.heater_power_kw
+    ua = cfg.loss_coefficient_kw_per_k
+    if ua <= 0:
+        hours = (target_c - temp_c) * capacity / (heat_kw * 3600.0) if heat_kw != 0 else math.inf
+        return hours if hours > 0 else math.inf
+    t_eq = cfg.ambient_temp_c + heat_kw / ua
+    ratio = (target_c - t_eq) / (temp_c - t_eq) if temp_c != t_eq else 0.0
+    if not 0.0 < ratio < 1.0:
+        return math.inf
+    return -math.log(ratio) * capacity / (ua * 3600.0)
+
+
+def _decay(exponent: np.ndarray) -> np.ndarray:
+    """`exp(exponent)` with `math.exp`, as `relax_temperature` computes it (np.exp can differ by an ulp)."""
+    rates, inverse = np.unique(exponent, return_inverse=True)
+    return np.array([math.exp(r) for r in rates])[inverse].reshape(exponent.shape)
+
+
+def relax_temperature_array(
+    temp_c: np.ndarray,
+    dc_power_kw: np.ndarray,
+    dt_hours: float,
+    cfg: ThermalConfig,
+) -> np.ndarray:
+    """Array counterpart of `relax_temperature`; config fields may be arrays."""
+    temp_c = np.asarray(temp_c, dtype=float)
+    capacity = np.asarray(cfg.heat_capacity_kj_per_k, dtype=float)
+    ua = np.asarray(cfg.loss_coefficient_kw_per_k, dtype=float)
+    heat_kw = cfg.joule_heat_fraction * dc_power_kw + cfg.heater_power_kw
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_eq = cfg.ambient_temp_c + heat_kw / ua
+        relaxed = t_eq + (temp_c - t_eq) * _decay(np.where(ua > 0, -ua * dt_hours * 3600.0 / capacity, 0.0))
+        heated = temp_c + heat_kw * dt_hours * 3600.0 / capacity
+    return np.where(np.isinf(capacity), temp_c, np.where(ua <= 0, heated, relaxed))
+
+
+if __name__ == "__main__":
+    cfg = ThermalConfig(heat_capacity_kj_per_k=2.0e5, loss_coefficient_kw_per_k=0.1, heater_power_kw=20.0)
+    temp = cfg.initial_temp_c
+    for day in range(1, 8):
+        temp = relax_temperature(temp, dc_power_kw=60.0, dt_hours=24.0, cfg=cfg)
+        print(f"day {day}: {temp:.1f} °C")
+    print(f"Steady state: {cfg.ambient_temp_c + (60.0 + cfg.heater_power_kw) / cfg.loss_coefficient_kw_per_k:.1f} °C")
@@ -0,0 +1,171 @@
+"""Analytic integration of plant operation at a constant requested current.
+
+At a fixed requested current the only evolving state is the electrode's
+cumulative amp-hours (Ah). Remaining life, and with it the resistance
+multiplier and faradaic efficiency, are linear in Ah, so the cell voltage is
+a clipped linear function of Ah. That makes every quantity we need piecewise
+linear *in Ah*:
+
+- cell voltage v(Ah), and hence DC energy = integral of v dAh / 1000,
+- faradaic efficiency eff(Ah), and hence Na = k * integral of eff dAh,
+- time per amp-hour 1 / I(Ah): constant while the current is set by the
+  request or the current limit, and proportional to v(Ah) while the power
+  limit binds (I = P_dc / v).
+
+We locate the breakpoints (voltage limits, power limit, end of life,
+maintenance threshold), evaluate the electrical model exactly at them, and
+integrate with the trapezoid rule, which is exact for piecewise linear
+integrands. Inverting time -> Ah reduces to a quadratic on one piece.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from electrical_model import ElectricalStateArray, compute_electrical_state_array
+from electrode_model import effective_efficiency_array, effective_resistance_multiplier_array
+from sodium_logic import calculate_sodium_production
+
+if TYPE_CHECKING:
+    from plant_model import PlantConfig
+
+
+def maintenance_amp_hours(cfg: "PlantConfig") -> float:
+    """Cumulative Ah at which `ElectrodeState.step` forces maintenance (inf if never)."""
+    ecfg = cfg.electrodes
+    if ecfg.amp_hours_limit <= 0:
+        return 0.0 if 1.0 <= ecfg.min_life_fraction_for_operation else math.inf
+    if ecfg.min_life_fraction_for_operation < 0:
+        return math.inf
+    return ecfg.amp_hours_limit * (1.0 - min(1.0, ecfg.min_life_fraction_for_operation))
+
+
+class ConstantCurrentSegment:
+    """
+    Piecewise-linear description of operation at one requested current.
+
+    Only meaningful when the resulting current is positive (the electrode
+    wears); with zero or negative current nothing evolves and a single
+    `SodiumPlant.step` over the whole duration is already exact.
+    """
+
+    def __init__(self, cfg: "PlantConfig", requested_current_a: float, start_amp_hours: float) -> None:
+        self.cfg = cfg
+        self.requested_current_a = float(requested_current_a)
+        self.start_amp_hours = float(start_amp_hours)
+
+        ah = self._breakpoints()
+        elec = self.electrical_at(ah)
+        self.amp_hours = ah
+        self.actual_current_a = elec.actual_current_a
+        self.cell_voltage_v = elec.cell_voltage_v
+        self.efficiency = effective_efficiency_array(ah, cfg.electrodes)
+        with np.errstate(divide="ignore"):
+            self.hours_per_ah = 1.0 / self.actual_current_a
+
+        # Cumulative integrals from the start to each breakpoint.
+        self._hours = _trapezoid_cumulative(ah, self.hours_per_ah)
+        self._volt_ah = _trapezoid_cumulative(ah, self.cell_voltage_v)
+        self._eff_ah = _trapezoid_cumulative(ah, self.efficiency)
+
+    @property
+    def wears(self) -> bool:
+        return bool(self.actual_current_a[0] > 0)
+
+    # ------------------------------------------------------------------ #
+    # Breakpoints
+    # ------------------------------------------------------------------ #
+    def electrical_at(self, ah: np.ndarray) -> ElectricalStateArray:
+        """Electrical state at the given cumulative amp-hours."""
+        ecfg = self.cfg.electrical
+        multiplier = effective_resistance_multiplier_array(ah, self.cfg.electrodes)
+        return compute_electrical_state_array(
+            np.full(ah.shape, self.requested_current_a),
+            ecfg,
+            effective_cell_resistance_ohm=ecfg.cell_resistance_ohm * multiplier,
+        )
+
+    def _breakpoints(self) -> np.ndarray:
+        ecfg = self.cfg.electrical
+        limit = self.cfg.electrodes.amp_hours_limit
+        start = self.start_amp_hours
+        if limit <= 0 or start >= limit:
+            # Life is pinned (at 1 or 0): everything is constant.
+            return np.array([start, start + 1.0])
+
+        points = [start, limit, maintenance_amp_hours(self.cfg)]
+
+        # Unclipped cell voltage is linear in Ah: v = c0 + c1 * Ah.
+        v_start, v_end = self._unclipped_voltage(np.array([0.0, limit]))
+        c0, c1 = v_start, (v_end - v_start) / limit
+        if c1 != 0.0:
+            current = min(self.requested_current_a, ecfg.max_dc_current_a)
+            targets = [ecfg.min_cell_voltage_v, ecfg.max_cell_voltage_v]
+            if current > 0:
+                # Voltage at which the AC power reaches the rating.
+                targets.append(ecfg.max_power_kw * max(ecfg.rectifier_efficiency, 1e-6) * 1000.0 / current)
+            points.extend((v - c0) / c1 for v in targets)
+
+        ah = np.unique(np.asarray(points, dtype=float))
+        return ah[(ah >= start) & (ah <= limit)]
+
+    def _unclipped_voltage(self, ah: np.ndarray) -> np.ndarray:
+        ecfg = self.cfg.electrical
+        current = min(self.requested_current_a, ecfg.max_dc_current_a)
+        scaling = current / ecfg.base_current_a if ecfg.base_current_a > 0 else 1.0
+        multiplier = effective_resistance_multiplier_array(ah, self.cfg.electrodes)
+        return ecfg.base_cell_voltage_v * scaling + current * (ecfg.cell_resistance_ohm * multiplier)
+
+    # ------------------------------------------------------------------ #
+    # Integrals from the segment start
+    # ------------------------------------------------------------------ #
+    def hours_to(self, amp_hours: np.ndarray | float) -> np.ndarray:
+        """Operating hours needed to reach the given cumulative Ah."""
+        return self._integral(amp_hours, self.hours_per_ah, self._hours)
+
+    def energy_kwh_to(self, amp_hours: np.ndarray | float) -> np.ndarray:
+        """DC energy (kWh) consumed up to the given cumulative Ah."""
+        return self._integral(amp_hours, self.cell_voltage_v, self._volt_ah) / 1000.0
+
+    def na_theoretical_kg_to(self, amp_hours: np.ndarray | float) -> np.ndarray:
+        """Theoretical Na (kg, before losses) produced up to the given cumulative Ah."""
+        kg_per_ah = calculate_sodium_production(amperes=1.0, hours=1.0, efficiency=1.0)
+        return kg_per_ah * self._integral(amp_hours, self.efficiency, self._eff_ah)
+
+    def amp_hours_after(self, hours: np.ndarray | float) -> np.ndarray:
+        """Cumulative Ah reached after operating for `hours` (inverse of `hours_to`)."""
+        return self._inverse(hours, self.hours_per_ah, self._hours)
+
+    def amp_hours_for_na(self, na_theoretical_kg: np.ndarray | float) -> np.ndarray:
+        """Cumulative Ah at which `na_theoretical_kg` has been produced (inverse of `na_theoretical_kg_to`)."""
+        kg_per_ah = calculate_sodium_production(amperes=1.0, hours=1.0, efficiency=1.0)
+        return self._inverse(np.asarray(na_theoretical_kg, dtype=float) / kg_per_ah, self.efficiency, self._eff_ah)
+
+    def _inverse(self, integral: np.ndarray | float, density: np.ndarray, cum: np.ndarray) -> np.ndarray:
+        """Ah at which the integral of the piecewise-linear `density` reaches `integral`."""
+        tau = np.asarray(integral, dtype=float)
+        ah = self.amp_hours
+        k = np.clip(np.searchsorted(cum, tau, side="right") - 1, 0, ah.size - 1)
+        remaining = tau - cum[k]
+        last = k == ah.size - 1
+        k1 = np.minimum(k + 1, ah.size - 1)
+        length = np.where(last, 1.0, ah[k1] - ah[k])
+        slope = np.where(last, 0.0, (density[k1] - density[k]) / np.where(length > 0, length, 1.0))
+        d0 = density[k]
+        # Solve d0 * x + slope * x**2 / 2 = remaining (stable root).
+        x = 2.0 * remaining / (d0 + np.sqrt(np.maximum(d0 * d0 + 2.0 * slope * remaining, 0.0)))
+        return ah[k] + x
+
+    def _integral(self, amp_hours: np.ndarray | float, values: np.ndarray, cum: np.ndarray) -> np.ndarray:
+        x = np.asarray(amp_hours, dtype=float)
+        ah = self.amp_hours
+        k = np.clip(np.searchsorted(ah, x, side="right") - 1, 0, ah.size - 1)
+        value_x = np.interp(x, ah, values)
+        return cum[k] + 0.5 * (values[k] + value_x) * (x - ah[k])
+
+
+def _trapezoid_cumulative(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.concatenate(([0.0], np.cumsum(0.5 * (y[1:] + y[:-1]) * np.diff(x))))